@@ -0,0 +1,185 @@
+import os
+import time
+import threading
+from datetime import date, timedelta
+
+from local_store import cache_path, load_json, save_json_atomic
+from fixture_store import normalize_team_name
+
+# Yapay zeka (smart_agent) cevaplarının kalıcı önbelleği.
+# Anahtar: normalize edilmiş takım çifti + tarih penceresi. CLI ve backend aynı
+# dosyayı kullanır; dosya başka süreçte değişmişse okumadan önce yeniden yüklenir.
+ANSWERS_PATH = cache_path("ai_answers.json")
+
+DATE_WINDOW_DAYS = 14             # aynı çift bu pencere içinde tekrar sorulursa cevap yeniden kullanılır
+NEGATIVE_TTL = 6 * 3600           # "bulunamadı" cevapları bu kadar saklanır
+UNDATED_TTL = 3 * 24 * 3600       # tarihi ayrıştırılamayan cevaplar
+MAX_SNIPPETS = 5
+
+_TR_MONTHS = ["ocak", "subat", "mart", "nisan", "mayis", "haziran",
+              "temmuz", "agustos", "eylul", "ekim", "kasim", "aralik"]
+
+def parse_tr_date(text, today=None):
+    """
+    Parses an answer date like "10 OCAK" into the next such date on or
+    after `today` (minus a day, so late-night matches are not dropped
+    early). Returns None when the text is not in that form.
+    """
+    today = today or date.today()
+    parts = normalize_team_name(text or "").split()
+    if len(parts) < 2 or not parts[0].isdigit() or parts[1] not in _TR_MONTHS:
+        return None
+    day, month = int(parts[0]), _TR_MONTHS.index(parts[1]) + 1
+    for year in (today.year, today.year + 1):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            return None
+        if candidate >= today - timedelta(days=1):
+            return candidate
+    return None
+
+def pair_key(home, away):
+    return f"{normalize_team_name(home)}|{normalize_team_name(away)}"
+
+def _window_start(day):
+    return date.fromordinal(day.toordinal() - day.toordinal() % DATE_WINDOW_DAYS)
+
+class AnswerCache:
+    """
+    entries: "home|away|window_start" -> {
+        "date", "time", "reason", "confidence", "source",
+        "snippets": [{"title", "body", "href"}], "match_date", "saved_at"
+    }
+    """
+
+    def __init__(self, path=ANSWERS_PATH):
+        self.path = path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._mtime = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._reload_if_changed()
+
+    def _disk_mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        mtime = self._disk_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+        data = load_json(self.path, default={}) or {}
+        disk = data.get("entries", {})
+        # Kaydedilmemiş yerel cevaplar diskteki sürümü ezer
+        for key in self._dirty:
+            if key in self.entries:
+                disk[key] = self.entries[key]
+        self.entries = disk
+        self._mtime = mtime
+
+    def _expired(self, entry, today, now):
+        if not entry.get("date") or not entry.get("time"):
+            return now - entry.get("saved_at", 0) > NEGATIVE_TTL
+        if entry.get("match_date"):
+            return date.fromisoformat(entry["match_date"]) < today
+        return now - entry.get("saved_at", 0) > UNDATED_TTL
+
+    def get(self, home, away, today=None):
+        """
+        Returns the cached answer dict for the pair, or None. Looks at the
+        current and the previous date window, since an answer stored near
+        the end of a window may still describe an upcoming match.
+        """
+        today = today or date.today()
+        now = time.time()
+        start = _window_start(today)
+        pair = pair_key(home, away)
+        with self._lock:
+            self._reload_if_changed()
+            for window in (start, start - timedelta(days=DATE_WINDOW_DAYS)):
+                entry = self.entries.get(f"{pair}|{window.isoformat()}")
+                if entry and not self._expired(entry, today, now):
+                    self.hits += 1
+                    return entry
+            self.misses += 1
+            return None
+
+    def put(self, home, away, answer, today=None):
+        """
+        Stores an answer dict (date, time, reason, confidence, source, snippets).
+        """
+        today = today or date.today()
+        match_date = parse_tr_date(answer.get("date"), today)
+        entry = {
+            "date": answer.get("date") or None,
+            "time": answer.get("time") or None,
+            "reason": answer.get("reason") or "",
+            "confidence": round(float(answer.get("confidence") or 0.0), 3),
+            "source": answer.get("source") or "",
+            "snippets": [
+                {k: (r.get(k) or "")[:500] for k in ("title", "body", "href")}
+                for r in (answer.get("snippets") or [])[:MAX_SNIPPETS]
+            ],
+            "match_date": match_date.isoformat() if match_date else None,
+            "saved_at": time.time(),
+        }
+        key = f"{pair_key(home, away)}|{_window_start(today).isoformat()}"
+        with self._lock:
+            self.entries[key] = entry
+            self._dirty.add(key)
+        return entry
+
+    def prune(self, today=None):
+        today = today or date.today()
+        now = time.time()
+        with self._lock:
+            for key in [k for k, e in self.entries.items() if self._expired(e, today, now)]:
+                del self.entries[key]
+                self._dirty.discard(key)
+
+    def save(self):
+        """
+        Merges unsaved answers into the file written by other processes,
+        drops expired entries and writes atomically.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._mtime = None
+            self._reload_if_changed()
+            self._dirty.clear()
+        self.prune()
+        with self._lock:
+            entries = dict(self.entries)
+        save_json_atomic(self.path, {"version": 1, "entries": entries})
+        with self._lock:
+            self._mtime = self._disk_mtime()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_answer_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache()
+    return _cache
+
+def stats():
+    return get_answer_cache().stats()
@@ -0,0 +1,423 @@
+import os
+import sys
+import mmap
+import time
+import shutil
+import gzip
+import hashlib
+import argparse
+import tempfile
+import threading
+import mimetypes
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from lazy_imports import lazy
+from local_store import BASE_DIR, cache_path, load_json, save_json_atomic
+
+brotli = lazy("brotli", optional=True)
+
+# İçerik adresli varlık deposu: logolar, render'lar ve sıkıştırılmış kopyalar SHA-256
+# özetiyle adlandırılmış blob'lar olarak bir kez saklanır (assets/ab/abcd….png).
+# Mantıksal adlar ("logos/x.png", "renders/mac-1.png") indekste blob özetine bağlanır;
+# aynı içerikli dosyalar tek blob paylaşır. Blob'lar hiç değişmez, bu yüzden okumalar
+# mmap üzerinden kopyasız yapılabilir ve klasör doğrudan statik olarak sunulabilir.
+ASSET_ROOT = os.getenv("MACBOT_ASSETS") or os.path.join(BASE_DIR, "assets")
+INDEX_PATH = cache_path("asset_index.json")
+
+HASH_CHUNK = 1 << 20
+MAPPED_BLOBS = 64           # açık tutulan mmap sayısı (LRU)
+
+# Hiçbir ada bağlı kalmayan blob'lar (silinen ya da yeniden render edilen çıktıların
+# eski sürümleri) "orphaned" zamanıyla işaretlenir ve bu süre dolunca kayıt sırasında
+# otomatik silinir. Süre, eski URL'yi hâlâ tutan istemcilerin ve başka süreçlerin
+# yarışta kalan yazmalarının 404 almaması içindir.
+ORPHAN_GRACE_SECONDS = 3600
+SWEEP_INTERVAL = 600        # otomatik taramalar arası en kısa süre
+
+# Metin tabanlı blob'ların yanına önceden sıkıştırılmış kopyalar yazılır (x.svg.gz / .br).
+# PNG/JPEG zaten sıkıştırılmış olduğundan onlar için üretilmez.
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "image/svg+xml")
+VARIANTS = ((".br", "br"), (".gz", "gzip"))     # dosya eki, Content-Encoding
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _signature(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+def _precompress(path, mime):
+    if not mime.startswith(COMPRESSIBLE_TYPES):
+        return
+    with open(path, "rb") as f:
+        data = f.read()
+    variants = {".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli:
+        variants[".br"] = brotli.compress(data)
+    for suffix, payload in variants.items():
+        # Kazanç yoksa varyant yazılmaz; sunucu asıl blob'u gönderir
+        if len(payload) < len(data):
+            with open(path + suffix + ".tmp", "wb") as f:
+                f.write(payload)
+            os.replace(path + suffix + ".tmp", path + suffix)
+
+def _copy_into(path, dest):
+    with open(path, "rb") as src:
+        shutil.copyfileobj(src, dest, HASH_CHUNK)
+
+class AssetStore:
+    """
+    blobs : sha256 -> {"size", "ext", "mime", "created", "orphaned"?}
+    names : logical name -> {"hash", "source", "signature": [mtime_ns, size]}
+    """
+
+    def __init__(self, root=ASSET_ROOT, index_path=INDEX_PATH):
+        self.root = root
+        self.index_path = index_path
+        self.blobs = {}
+        self.names = {}
+        self.stored = 0
+        self.deduplicated = 0
+        self.unchanged = 0
+        self._mtime = None
+        self._dirty_blobs = set()
+        self._dirty_names = set()
+        self._removed_blobs = set()
+        self._removed_names = set()
+        self._batching = 0
+        self._swept = 0.0
+        self._maps = OrderedDict()      # sha256 -> mmap
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        self._reload_if_changed()
+
+    # --- Kalıcılık ---
+    def _disk_mtime(self):
+        try:
+            return os.path.getmtime(self.index_path)
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        mtime = self._disk_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+        data = load_json(self.index_path, default={}) or {}
+        blobs, names = data.get("blobs", {}), data.get("names", {})
+        # Kaydedilmemiş yerel kayıtlar diskteki sürümü ezer
+        for digest in self._dirty_blobs:
+            if digest in self.blobs:
+                blobs[digest] = self.blobs[digest]
+        for name in self._dirty_names:
+            if name in self.names:
+                names[name] = self.names[name]
+        for digest in self._removed_blobs:
+            blobs.pop(digest, None)
+        for name in self._removed_names:
+            names.pop(name, None)
+        self.blobs, self.names = blobs, names
+        self._mtime = mtime
+
+    def _dirty(self):
+        return self._dirty_blobs or self._dirty_names or self._removed_blobs or self._removed_names
+
+    def save(self):
+        """Writes pending changes (inside batch(): once, when the batch ends)."""
+        with self._lock:
+            if self._batching:
+                return
+            self._reload_if_changed()
+            if time.time() - self._swept >= SWEEP_INTERVAL:
+                self._sweep(ORPHAN_GRACE_SECONDS)
+            if not self._dirty():
+                return
+            self._mtime = None
+            self._reload_if_changed()
+            self._dirty_blobs.clear()
+            self._dirty_names.clear()
+            self._removed_blobs.clear()
+            self._removed_names.clear()
+            data = {"version": 1, "blobs": dict(self.blobs), "names": dict(self.names)}
+        try:
+            save_json_atomic(self.index_path, data)
+        except OSError as e:
+            print(f"⚠️ Varlık indeksi kaydedilemedi: {e}")
+            return
+        with self._lock:
+            self._mtime = self._disk_mtime()
+
+    @contextmanager
+    def batch(self):
+        """Groups several put/unbind calls into a single index write."""
+        with self._lock:
+            self._batching += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batching -= 1
+            self.save()
+
+    # --- Yazma ---
+    def blob_path(self, digest, ext=None):
+        if ext is None:
+            ext = self.blobs.get(digest, {}).get("ext", "")
+        return os.path.join(self.root, digest[:2], digest + ext)
+
+    def _store_blob(self, digest, ext, write):
+        path = self.blob_path(digest, ext)
+        self._removed_blobs.discard(digest)
+        if os.path.exists(path):
+            self.deduplicated += 1
+        else:
+            # Başka bir süreç blob'u silmiş olabilir: kayıt da yeniden yazılır
+            self.blobs.pop(digest, None)
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    write(f)
+                os.replace(tmp_path, path)
+            except Exception:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+                raise
+            self.stored += 1
+        if digest not in self.blobs:
+            mime = mimetypes.guess_type("x" + ext)[0] or "application/octet-stream"
+            _precompress(path, mime)
+            self.blobs[digest] = {
+                "size": os.path.getsize(path),
+                "ext": ext,
+                "mime": mime,
+                "created": time.time(),
+            }
+            self._dirty_blobs.add(digest)
+
+    def _orphan(self, digest):
+        meta = self.blobs.get(digest)
+        if meta is not None and "orphaned" not in meta:
+            # Başka adlar hâlâ bağlı olabilir; tarama silmeden önce yeniden kontrol eder
+            self.blobs[digest] = {**meta, "orphaned": time.time()}
+            self._dirty_blobs.add(digest)
+
+    def _bind(self, name, digest, source=None, signature=None):
+        meta = self.blobs.get(digest)
+        if meta is not None and "orphaned" in meta:
+            self.blobs[digest] = {k: v for k, v in meta.items() if k != "orphaned"}
+            self._dirty_blobs.add(digest)
+        entry = {"hash": digest, "source": source, "signature": signature}
+        previous = self.names.get(name)
+        if previous != entry:
+            if previous and previous["hash"] != digest:
+                self._orphan(previous["hash"])
+            self.names[name] = entry
+            self._dirty_names.add(name)
+            self._removed_names.discard(name)
+
+    def put_file(self, path, name=None):
+        """
+        Stores a file and binds `name` (default: its base name) to it.
+        The source is copied, never linked, because producers rewrite their
+        outputs in place. Returns the sha256, or None if the file is missing.
+        """
+        name = name or os.path.basename(path)
+        try:
+            signature = _signature(path)
+        except OSError:
+            return None
+        with self._lock:
+            self._reload_if_changed()
+            entry = self.names.get(name)
+            # Kaynak dosya değişmediyse yeniden özetlenmez
+            if entry and entry.get("signature") == signature and entry["hash"] in self.blobs:
+                self.unchanged += 1
+                return entry["hash"]
+        digest = file_sha256(path)
+        ext = os.path.splitext(path)[1].lower()
+        with self._lock:
+            self._reload_if_changed()
+            self._store_blob(digest, ext, lambda f: _copy_into(path, f))
+            self._bind(name, digest, os.path.abspath(path), signature)
+        self.save()
+        return digest
+
+    def put_bytes(self, data, name, ext=""):
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            self._reload_if_changed()
+            self._store_blob(digest, ext, lambda f: f.write(data))
+            self._bind(name, digest)
+        self.save()
+        return digest
+
+    def unbind(self, name):
+        """
+        Drops a logical name. Its blob is removed automatically once it has
+        been unreferenced for ORPHAN_GRACE_SECONDS (or by gc()).
+        """
+        with self._lock:
+            self._reload_if_changed()
+            entry = self.names.pop(name, None)
+            if entry is None:
+                return False
+            self._dirty_names.discard(name)
+            self._removed_names.add(name)
+            self._orphan(entry["hash"])
+        self.save()
+        return True
+
+    # --- Okuma ---
+    def resolve(self, name):
+        """Returns the sha256 bound to a logical name, or None."""
+        with self._lock:
+            self._reload_if_changed()
+            entry = self.names.get(name)
+            return entry["hash"] if entry else None
+
+    def info(self, digest):
+        with self._lock:
+            meta = self.blobs.get(digest)
+            return {"hash": digest, **meta, "path": self.blob_path(digest)} if meta else None
+
+    def variants(self, digest):
+        """Returns [(path, content_encoding)] of precompressed copies, best first."""
+        path = self.blob_path(digest)
+        return [(path + suffix, encoding) for suffix, encoding in VARIANTS if os.path.exists(path + suffix)]
+
+    def view(self, digest):
+        """
+        Zero-copy read-only memoryview of a blob, backed by a shared mmap.
+        Returns None for unknown or empty blobs.
+        """
+        with self._lock:
+            mapped = self._maps.get(digest)
+            if mapped is not None:
+                self._maps.move_to_end(digest)
+                return memoryview(mapped)
+            meta = self.blobs.get(digest)
+            if not meta or not meta["size"]:
+                return None
+            try:
+                with open(self.blob_path(digest), "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return None
+            self._maps[digest] = mapped
+            # Eski eşlemeler bırakılır; dışarıda tutulan view'lar bitince kapanır
+            while len(self._maps) > MAPPED_BLOBS:
+                self._maps.popitem(last=False)
+            return memoryview(mapped)
+
+    def open(self, digest):
+        """
+        File-like, read-only mmap of a blob with its own position (e.g. for
+        PIL.Image.open). The caller closes it.
+        """
+        with open(self.blob_path(digest), "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    # --- Bakım ---
+    def _sweep(self, grace):
+        # Kilit altında çağrılır. İşaretsiz yetimler (örn. eski indekslerden) şimdi
+        # işaretlenir; süresi dolanlar silinir, yeniden bağlananların işareti kalkar.
+        now = time.time()
+        self._swept = now
+        live = {entry["hash"] for entry in self.names.values()}
+        dead = []
+        for digest, meta in list(self.blobs.items()):
+            orphaned = meta.get("orphaned")
+            if digest in live:
+                if orphaned is not None:
+                    self.blobs[digest] = {k: v for k, v in meta.items() if k != "orphaned"}
+                    self._dirty_blobs.add(digest)
+            elif orphaned is None and grace:
+                self._orphan(digest)
+            elif orphaned is None or now - orphaned >= grace:
+                dead.append(digest)
+        for digest in dead:
+            path = self.blob_path(digest)
+            for suffix in ("",) + tuple(v[0] for v in VARIANTS):
+                try:
+                    os.remove(path + suffix)
+                except OSError:
+                    pass
+            self._maps.pop(digest, None)
+            del self.blobs[digest]
+            self._dirty_blobs.discard(digest)
+            self._removed_blobs.add(digest)
+        return len(dead)
+
+    def gc(self, grace=0):
+        """
+        Deletes blobs no name points to (with grace > 0: only those
+        unreferenced for at least that many seconds). Returns the number removed.
+        """
+        with self._lock:
+            self._reload_if_changed()
+            removed = self._sweep(grace)
+        self.save()
+        return removed
+
+    def stats(self):
+        with self._lock:
+            logical = sum(self.blobs[e["hash"]]["size"] for e in self.names.values() if e["hash"] in self.blobs)
+            physical = sum(meta["size"] for meta in self.blobs.values())
+            return {
+                "names": len(self.names),
+                "blobs": len(self.blobs),
+                "logical_bytes": logical,
+                "stored_bytes": physical,
+                "stored": self.stored,
+                "deduplicated": self.deduplicated,
+                "unchanged": self.unchanged,
+                "mapped": len(self._maps),
+            }
+
+_store = None
+_store_lock = threading.Lock()
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = AssetStore()
+    return _store
+
+def stats():
+    return get_store().stats()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="İçerik adresli varlık deposu")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest", help="Dosyaları depoya ekle")
+    ingest.add_argument("paths", nargs="+")
+    ingest.add_argument("--prefix", default="", help="Mantıksal ad öneki (örn. logos/)")
+    sub.add_parser("gc", help="Hiçbir ada bağlı olmayan blob'ları sil")
+    sub.add_parser("stats", help="Depo istatistikleri")
+    args = parser.parse_args(argv)
+
+    store = get_store()
+    if args.command == "ingest":
+        with store.batch():
+            for path in args.paths:
+                digest = store.put_file(path, args.prefix + os.path.basename(path))
+                print(f"{digest or '❌ bulunamadı'}  {path}")
+    elif args.command == "gc":
+        print(f"🧹 {store.gc()} blob silindi.")
+    elif args.command == "stats":
+        for key, value in store.stats().items():
+            print(f"{key}: {value}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
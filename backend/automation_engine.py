@@ -1,17 +1,30 @@
 import os
 import sys
 import asyncio
+import bisect
+import datetime
 import json
+import uuid
 
 # Add parent dir to path to import local modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import sports_cli
-import smart_agent
+import rate_limiter
+import event_bus
+import fixture_store
+import league_catalogue
+import tracer
+from lazy_imports import lazy
 
-async def process_match(home_team: str, away_team: str, subtract_day: bool = False, manual_datetime: str = None):
+# AI (duckduckgo/openai/gemini) ve Photoshop/PIL tarafı ilk kullanımda yüklenir
+smart_agent = lazy("smart_agent")
+mac_duzenleyici = lazy("mac_duzenleyici")
+
+async def process_match(home_team: str, away_team: str, subtract_day: bool = False, manual_datetime: str = None, use_ai: bool = True):
     """
     Search for match details using sports_cli (API) and smart_agent (AI) as fallback.
+    With use_ai=False only the API is tried (run_automation_flow batches the AI step).
     """
     # 0. If manual datetime is provided, we still want badges but we override the time later
     api_data = {}
@@ -34,11 +47,11 @@ async def process_match(home_team: str, away_team: str, subtract_day: bool = Fal
         print(f"API Error for {home_team} vs {away_team}: {e}")
 
     # 2. Try AI fallback if API failed for time/date and no manual override
-    if not api_data and not manual_datetime:
+    if use_ai and not api_data and not manual_datetime:
         gemini_key = os.getenv("GEMINI_API_KEY")
         if gemini_key:
             try:
-                date_ai, time_ai = smart_agent.ask_gemini_for_match_time(home_team, away_team, gemini_key)
+                date_ai, time_ai = await smart_agent.ask_gemini_for_match_time_async(home_team, away_team, gemini_key)
                 if date_ai and time_ai:
                     api_data = {
                         "time": time_ai,
@@ -65,41 +78,95 @@ async def process_match(home_team: str, away_team: str, subtract_day: bool = Fal
 
     return api_data if api_data else None
 
-async def run_automation_flow(matches: list, boost: bool = False, subtract_day: bool = False):
+def _publish_match(run_id, index, match, data):
+    event_bus.publish(
+        "match_resolved", run_id=run_id, index=index, home_team=match['home_team'], away_team=match['away_team'],
+        found=bool(data), **(data or {}),
+    )
+
+async def run_automation_flow(matches: list, boost: bool = False, subtract_day: bool = False, run_id: str = None):
+    # Olaylar run_id taşır; arayüz başka istemcilerin çalıştırmalarını buna göre ayıklar
+    run_id = run_id or uuid.uuid4().hex[:12]
+    # 1. Faz: API aramaları (paralel; limiter ve single-flight istekleri zaten düzenliyor)
+    async def resolve(index, m):
+        # gather her coroutine'i ayrı task'ta çalıştırır; etiket sadece bu maçın span'lerine geçer
+        tracer.bind(match=f"{m['home_team']} vs {m['away_team']}", index=index)
+        data = await process_match(m['home_team'], m['away_team'], subtract_day, m.get('manual_datetime'), use_ai=False)
+        # Bulunamayanlar 2. fazdan (AI) sonra yayınlanır
+        if data:
+            _publish_match(run_id, index, m, data)
+        return data
+
+    event_bus.publish("run_started", run_id=run_id, total=len(matches))
+    run_batch = tracer.start_batch("automation_flow", matches=len(matches))
+    found = await asyncio.gather(*(resolve(i, m) for i, m in enumerate(matches)))
+
+    # 2. Faz: API'de bulunamayanlar için tek bir toplu AI çağrısı
+    misses = [i for i, data in enumerate(found) if not data and not matches[i].get('manual_datetime')]
+    gemini_key = os.getenv("GEMINI_API_KEY")
+    if misses and gemini_key:
+        try:
+            answers = await smart_agent.ask_batch_for_match_times_async(
+                [(matches[i]['home_team'], matches[i]['away_team']) for i in misses], gemini_key
+            )
+            for i, (date_ai, time_ai) in zip(misses, answers):
+                if date_ai and time_ai:
+                    found[i] = {"time": time_ai, "date": date_ai, "source": "ai"}
+                    _publish_match(run_id, i, matches[i], found[i])
+        except Exception as e:
+            print(f"AI Batch Error: {e}")
+    for i in misses:
+        if not found[i]:
+            _publish_match(run_id, i, matches[i], None)
+    tracer.end_batch(run_batch)
+
     results = []
-    for m in matches:
-        data = await process_match(
-            m['home_team'], 
-            m['away_team'], 
-            subtract_day, 
-            m.get('manual_datetime')
-        )
+    for m, data in zip(matches, found):
         if data:
             results.append({**m, **data})
         else:
             results.append({**m, "error": "Match not found"})
     return results
 
-async def get_upcoming_fixtures():
+async def _league_fixtures(store, league, today):
+    """
+    Refreshes one league (at most once per NEXT_TTL, within its timeout)
+    and returns its next stored events. On timeout/failure the events
+    already in the fixture store are served.
     """
-    Fetch upcoming matches for popular leagues to display in the UI.
-    Leagues: Turkish Super Lig (4351), Premier League (4328), La Liga (4335), etc.
+    try:
+        async with asyncio.timeout(league["timeout"]):
+            await store.refresh_league(league["id"])
+    except TimeoutError:
+        print(f"⚠️ {league['name']} fikstürü {league['timeout']:.0f} sn içinde gelmedi, önbellek kullanılıyor.")
+    except Exception as e:
+        print(f"⚠️ {league['name']} fikstürü alınamadı: {e}")
+    return league, store.events_for_league(league["id"], from_date=today)[:league["take"]]
+
+async def get_upcoming_fixtures(leagues=None, today=None):
     """
-    leagues = [4351, 4328, 4335, 4332, 4331]
+    Fetch upcoming matches for the leagues of the catalogue (league_catalogue,
+    football and basketball) concurrently, merged and sorted by kickoff.
+    `today` (a date) defaults to the current day.
+    """
+    leagues = leagues or league_catalogue.load_leagues()
+    store = sports_cli.get_fixture_store()
+    today = (today or datetime.date.today()).isoformat()
     all_events = []
-    
-    for league_id in leagues:
-        try:
-            url = f"{sports_cli.BASE_URL}/eventsnextleague.php?id={league_id}"
-            res = await sports_cli.fetch_json_async(url)
-            if res.get("events"):
-                all_events.extend(res["events"][:5]) # Take top 5 from each
-        except:
-            pass
-            
+
+    # Toplu ön-yükleme: kullanıcı isteklerinin (/execute) önüne geçmesin
+    with rate_limiter.priority(rate_limiter.BULK):
+        tasks = [_league_fixtures(store, league, today) for league in leagues]
+        for finished in asyncio.as_completed(tasks):
+            league, events = await finished
+            # Gelen her lig, başlama saatine göre sıralı listeye yerleştirilir
+            for e in events:
+                bisect.insort(all_events, (fixture_store.kickoff_key(e), league["sport"], e), key=lambda item: item[0])
+    store.save()
+
     # Flatten and format
     formatted = []
-    for e in all_events:
+    for _, sport, e in all_events:
         formatted.append({
             "id": e.get("idEvent"),
             "home": e.get("strHomeTeam"),
@@ -107,6 +174,7 @@ async def get_upcoming_fixtures():
             "time": sports_cli.convert_to_tr_time(e.get("dateEvent"), e.get("strTime")),
             "date": e.get("dateEvent"),
             "league": e.get("strLeague"),
+            "sport": e.get("strSport") or sport,
             "home_badge": e.get("strHomeTeamBadge"),
             "away_badge": e.get("strAwayTeamBadge")
         })
@@ -129,18 +197,19 @@ async def get_upcoming_fixtures():
                 "time": dm['time'],
                 "date": dm['date'],
                 "league": dm['league'],
+                "sport": "Soccer",
                 "home_badge": f"https://www.thesportsdb.com/images/media/team/badge/small/{dm['h_id']}.png",
                 "away_badge": f"https://www.thesportsdb.com/images/media/team/badge/small/{dm['a_id']}.png"
             })
             
     return formatted
 
-def render_match_psd(match_data, template="Maclar.psd"):
+def render_match_psd(match_data, template="Maclar.psd", scratch_dir=None):
     """
     Triggers Photoshop to render a match preview based on match data.
+    Render pool workers pass their job's scratch_dir so concurrent jobs
+    never share a JSX file.
     """
-    import mac_duzenleyici
-    
     # Format data for mac_duzenleyici
     ev = match_data.get("home_team", match_data.get("home", "Team A"))
     dep = match_data.get("away_team", match_data.get("away", "Team B"))
@@ -156,16 +225,19 @@ def render_match_psd(match_data, template="Maclar.psd"):
         "output_filename": f"Match_{ev}_vs_{dep}.png"
     }
 
-    # Handle logos
-    url1 = match_data.get("home_badge")
-    url2 = match_data.get("away_badge")
-    
-    logo1, logo2 = mac_duzenleyici.download_logos(formatted_data["ev_sahibi"], formatted_data["deplasman"], url1=url1, url2=url2)
-    formatted_data["logo1"] = logo1
-    formatted_data["logo2"] = logo2
-    
-    # Trigger Photoshop with selected template
-    is_basketball = "basketbol" in template.lower()
-    success = mac_duzenleyici.trigger_photoshop_for_match(formatted_data, psd_filename=template, is_basketball=is_basketball)
+    # İşçi süreçteki render da ayrı bir batch olarak özetlenir (konsola basılmaz)
+    with tracer.batch("render", show=False, match=f"{ev} vs {dep}", template=template):
+        # Handle logos
+        url1 = match_data.get("home_badge")
+        url2 = match_data.get("away_badge")
+        
+        logo1, logo2 = mac_duzenleyici.download_logos(formatted_data["ev_sahibi"], formatted_data["deplasman"], url1=url1, url2=url2)
+        formatted_data["logo1"] = logo1
+        formatted_data["logo2"] = logo2
+        
+        # Trigger Photoshop with selected template
+        is_basketball = "basketbol" in template.lower()
+        jsx_path = os.path.join(scratch_dir, "psd_otomasyon.jsx") if scratch_dir else None
+        success = mac_duzenleyici.trigger_photoshop_for_match(formatted_data, psd_filename=template, is_basketball=is_basketball, jsx_path=jsx_path)
     
     return success
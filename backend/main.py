@@ -1,10 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import List, Optional
 import os
 import json
 import asyncio
+import time
+import hmac
 import subprocess
 
 from fastapi.staticfiles import StaticFiles
@@ -44,12 +47,160 @@ class AutomationTask(BaseModel):
     matches: List[MatchInput]
     boost_odds: bool = False
     subtract_day_for_night: bool = False
+    run_id: Optional[str] = None          # istemcinin ürettiği kimlik; SSE olaylarında geri döner
 
 @app.get("/")
 async def root():
     return {"status": "ok", "message": "Match Automation API is running"}
 
 from automation_engine import run_automation_flow, get_upcoming_fixtures, render_match_psd
+import ai_cache
+import lazy_imports
+import singleflight
+import rate_limiter
+import team_registry
+import event_bus
+import render_pool
+import asset_store
+import static_assets
+import tracer
+import metrics
+import profiler
+
+# Blob'lar değişmez ve içerik özetiyle adlandırılır: /static/a/<sha256>.png
+app.include_router(static_assets.router)
+
+HTTP_SECONDS = metrics.histogram(
+    "macbot_http_request_duration_seconds", "API request latency by route.", ("route", "method"),
+)
+HTTP_TOTAL = metrics.counter(
+    "macbot_http_requests_total", "API requests by route, method and status.", ("route", "method", "status"),
+)
+
+def _route_label(request):
+    route = request.scope.get("route")
+    if route is not None and hasattr(route, "path"):
+        return route.path
+    # Mount'lar (StaticFiles) route bırakmaz: /static/previews/... -> /static/previews
+    parts = request.url.path.split("/")
+    return "/".join(parts[:3]) if request.url.path.startswith("/static/") else "other"
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        # SSE gibi akışlarda süre yanıt başlıklarının dönmesine kadardır
+        route = _route_label(request)
+        HTTP_SECONDS.labels(route, request.method).observe(time.perf_counter() - start)
+        HTTP_TOTAL.labels(route, request.method, status).inc()
+
+@metrics.register_collector
+def _runtime_metrics():
+    """Cache hit/miss counts, render queue depth and subscriber counts from stats()."""
+    hits, misses = [], []
+
+    def cache(name, hit, miss):
+        hits.append(({"cache": name}, hit))
+        misses.append(({"cache": name}, miss))
+
+    answers = ai_cache.stats()
+    cache("ai_answers", answers["hits"], answers["misses"])
+    registry = team_registry.stats()
+    cache("team_registry", registry["hits"], registry["misses"])
+    assets = asset_store.stats()
+    cache("asset_store", assets["unchanged"] + assets["deduplicated"], assets["stored"])
+    for name, flight in singleflight.stats().items():
+        cache(f"singleflight_{name}", flight["saved"], flight["executed"])
+    ratios = [(labels, round(h / (h + m), 4) if h + m else None) for (labels, h), (_, m) in zip(hits, misses)]
+
+    pool = render_pool.get_render_pool().stats()
+    busy = sum(1 for w in pool["workers"] if w["busy"])
+    alive = sum(1 for w in pool["workers"] if w["alive"])
+    return [
+        ("macbot_cache_hits_total", "counter", "Cache hits by cache.", hits),
+        ("macbot_cache_misses_total", "counter", "Cache misses by cache.", misses),
+        ("macbot_cache_hit_ratio", "gauge", "Cache hit ratio by cache.", ratios),
+        ("macbot_render_queue_depth", "gauge", "Render jobs waiting for a worker.", [({}, pool["queued"])]),
+        ("macbot_render_workers", "gauge", "Render workers by state.", [({"state": "busy"}, busy), ({"state": "alive"}, alive)]),
+        ("macbot_render_jobs_rejected_total", "counter", "Render jobs rejected on a full queue.", [({}, pool["rejected"])]),
+        ("macbot_event_subscribers", "gauge", "Connected SSE clients.", [({}, event_bus.stats()["subscribers"])]),
+    ]
+
+PROFILE_TOKEN = os.getenv("MACBOT_PROFILE_TOKEN")
+
+class ProfileRequest(BaseModel):
+    kind: str = "flow"                   # flow: run_automation_flow | render: render batch
+    mode: str = "sample"                 # sample (düşük maliyet) | cprofile
+    task: Optional[AutomationTask] = None
+    matches: List[dict] = []             # render için maç verileri
+    template: str = "Maclar.psd"
+
+def _render_batch(matches, template):
+    # Havuz yerine bu süreçte çalışır ki profil render kodunu görsün
+    return [render_match_psd(m, template) for m in matches]
+
+@app.post("/api/v1/automation/profile")
+async def profile_batch(body: ProfileRequest, request: Request):
+    """
+    Profiles one automation flow or render batch and returns the written
+    profile files. Disabled unless MACBOT_PROFILE_TOKEN is set; callers
+    send it in the X-Profile-Token header.
+    """
+    token = request.headers.get("x-profile-token", "")
+    if not PROFILE_TOKEN or not hmac.compare_digest(token, PROFILE_TOKEN):
+        raise HTTPException(status_code=403, detail="Profiling is disabled or the token is wrong")
+    if body.mode not in profiler.MODES or body.kind not in ("flow", "render"):
+        raise HTTPException(status_code=400, detail="Unknown profile kind or mode")
+    if body.kind == "flow" and not body.task:
+        raise HTTPException(status_code=400, detail="'task' is required for kind=flow")
+
+    try:
+        if body.kind == "flow":
+            task = body.task
+            with profiler.profile("flow", body.mode, show=False) as result:
+                await run_automation_flow([m.dict() for m in task.matches], task.boost_odds, task.subtract_day_for_night)
+        else:
+            # cProfile sadece çağıran thread'i görür; render bu yüzden profil thread'in içinde alınır
+            def run():
+                with profiler.profile("render", body.mode, show=False) as result:
+                    _render_batch(body.matches, body.template)
+                return result
+            result = await asyncio.to_thread(run)
+    except profiler.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"status": "success", "profile": result.as_dict()}
+
+@app.get("/metrics")
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+EVENTS_KEEPALIVE = 15.0      # sessiz bağlantılarda proxy'lerin kesmemesi için yorum satırı aralığı (sn)
+PREVIEW_POLL_INTERVAL = 1.0  # Photoshop'un Mac/ klasörüne yazdığı önizlemeler bu aralıkla kontrol edilir
+
+@app.get("/api/v1/automation/stats")
+async def automation_stats():
+    # Tekilleştirilen (single-flight) istek sayıları: "saved" = ağdan tasarruf edilen çağrı
+    # rate_limits: host başına güncel hız, bekleyen istek ve 429/403 sayısı
+    # ai_cache: yapay zeka cevap önbelleğinin isabet oranı
+    # team_registry: yerelden kanonik isme çevrilen takım yazımları
+    # lazy_imports: ilk kullanımda yüklenen ağır paketler ve yükleme süreleri
+    return {
+        "status": "success",
+        "singleflight": singleflight.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "ai_cache": ai_cache.stats(),
+        "team_registry": team_registry.stats(),
+        "events": event_bus.stats(),
+        "render_pool": render_pool.get_render_pool().stats(),
+        "assets": asset_store.stats(),
+        "tracing": tracer.stats(),
+        "lazy_imports": lazy_imports.load_times(),
+    }
 
 @app.post("/api/v1/automation/render")
 async def render_match(data: dict):
@@ -57,9 +208,15 @@ async def render_match(data: dict):
         match = data.get("match")
         template = data.get("template", "Maclar.psd")
         
-        # Run in thread pool since Photoshop trigger is blocking
-        loop = asyncio.get_event_loop()
-        success = await loop.run_in_executor(None, render_match_psd, match, template)
+        # Render havuzundaki bir işçi süreçte, kendi scratch klasöründe çalışır
+        try:
+            success = await asyncio.wrap_future(render_pool.get_render_pool().submit(match, template))
+        except render_pool.RenderPoolBusy as e:
+            return {"status": "error", "message": str(e)}
+        event_bus.publish(
+            "render_done", home=match.get("home_team", match.get("home")), away=match.get("away_team", match.get("away")),
+            template=template, success=bool(success),
+        )
         
         if success:
             return {"status": "success", "message": "Render triggered in Photoshop"}
@@ -79,11 +236,14 @@ async def list_fixtures():
 @app.post("/api/v1/automation/execute")
 async def execute_automation(task: AutomationTask):
     try:
-        results = await run_automation_flow(
-            [m.dict() for m in task.matches], 
-            task.boost_odds, 
-            task.subtract_day_for_night
-        )
+        # Arayüzden gelen istek: toplu fikstür ön-yüklemesinden önce sıraya girer
+        with rate_limiter.priority(rate_limiter.INTERACTIVE):
+            results = await run_automation_flow(
+                [m.dict() for m in task.matches], 
+                task.boost_odds, 
+                task.subtract_day_for_night,
+                task.run_id,
+            )
         return {"status": "success", "results": results}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -94,23 +254,118 @@ async def delete_preview(filename: str):
         file_path = os.path.join(OUTPUT_DIR, filename)
         if os.path.exists(file_path):
             os.remove(file_path)
+            asset_store.get_store().unbind(f"renders/{filename}")
             return {"status": "success", "message": f"File {filename} deleted"}
         else:
             raise HTTPException(status_code=404, detail="File not found")
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def _preview_files():
+    import unicodedata
+    files = [unicodedata.normalize('NFC', f) for f in os.listdir(OUTPUT_DIR) if f.endswith(('.png', '.jpg', '.jpeg'))]
+    # Return sorted by modification time (newest first)
+    files.sort(key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)), reverse=True)
+    return files
+
+def _preview_url(filename):
+    # Değişmemiş dosya yeniden özetlenmez (stat imzası), bu yüzden liste ucuz kalır
+    digest = asset_store.get_store().put_file(os.path.join(OUTPUT_DIR, filename), f"renders/{filename}")
+    return static_assets.asset_url(digest) if digest else None
+
+def _preview_urls(files):
+    # Yeni dosyalar tek indeks yazımıyla kaydedilir
+    with asset_store.get_store().batch():
+        return {f: _preview_url(f) for f in files}
+
 @app.get("/api/v1/automation/previews")
 async def list_previews():
+    """
+    Preview file names (newest first) plus their content-hashed,
+    immutable URLs under "urls".
+    """
     try:
-        import unicodedata
-        files = [unicodedata.normalize('NFC', f) for f in os.listdir(OUTPUT_DIR) if f.endswith(('.png', '.jpg', '.jpeg'))]
-        # Return sorted by modification time (newest first)
-        files.sort(key=lambda x: os.path.getmtime(os.path.join(OUTPUT_DIR, x)), reverse=True)
-        return {"status": "success", "previews": files}
+        files = _preview_files()
+        urls = await asyncio.to_thread(_preview_urls, files)
+        return {"status": "success", "previews": files, "urls": urls}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+@app.get("/api/v1/automation/events")
+async def stream_events(request: Request):
+    """
+    Server-sent events: match_resolved, render_done, preview_added,
+    preview_removed, compressed (the latter from CLI processes, through the
+    event spool). Reconnecting clients send Last-Event-ID and receive the
+    events they missed.
+    """
+    last_id = request.headers.get("last-event-id")
+    last_id = int(last_id) if last_id and last_id.isdigit() else None
+
+    async def stream():
+        yield "retry: 3000\n\n"
+        async for event in event_bus.get_bus().subscribe(last_id, idle_timeout=EVENTS_KEEPALIVE):
+            if await request.is_disconnected():
+                break
+            yield event_bus.format_sse(event) if event else ": keep-alive\n\n"
+
+    return StreamingResponse(stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",
+    })
+
+def _preview_signature():
+    # Klasör mtime'ı yerinde üzerine yazmada değişmez; dosya başına (ad, mtime, boyut) bakılır
+    with os.scandir(OUTPUT_DIR) as entries:
+        return frozenset(
+            (e.name, st.st_mtime_ns, st.st_size)
+            for e in entries if e.name.endswith(('.png', '.jpg', '.jpeg'))
+            for st in (e.stat(),)
+        )
+
+async def _watch_previews():
+    # Sadece dinleyen varken dosya imzaları kontrol edilir; değişince fark yayınlanır
+    known, signature = None, None
+    while True:
+        await asyncio.sleep(PREVIEW_POLL_INTERVAL)
+        if not event_bus.stats()["subscribers"]:
+            known, signature = None, None
+            continue
+        try:
+            current = await asyncio.to_thread(_preview_signature)
+            if current == signature:
+                continue
+            files = await asyncio.to_thread(_preview_files)
+        except OSError:
+            continue
+        # Aynı adla üzerine yazılan render'ın URL'si (içerik özeti) değişir; o da "added" sayılır
+        urls = await asyncio.to_thread(_preview_urls, files)
+        if known is not None:
+            for f, url in urls.items():
+                if known.get(f) != url:
+                    event_bus.publish("preview_added", filename=f, url=url)
+            for f in known.keys() - urls.keys():
+                event_bus.publish("preview_removed", filename=f)
+        known, signature = urls, current
+
+@app.on_event("startup")
+async def start_background_services():
+    # Bilinen route'ların metrik serileri açılışta ayrılır
+    for route in app.routes:
+        for method in getattr(route, "methods", None) or ():
+            HTTP_SECONDS.labels(route.path, method)
+    app.state.preview_watcher = asyncio.create_task(_watch_previews())
+    # CLI ve render işçilerinin olayları (örn. compressed) spool üzerinden akışa katılır
+    app.state.event_spool = asyncio.create_task(event_bus.follow_spool())
+    # İşçiler açılışta başlar; ilk render süreç kurulumunu beklemez
+    await asyncio.to_thread(render_pool.get_render_pool().start)
+
+@app.on_event("shutdown")
+async def stop_background_services():
+    app.state.preview_watcher.cancel()
+    app.state.event_spool.cancel()
+    await asyncio.to_thread(render_pool.get_render_pool().shutdown)
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,133 @@
+import os
+import re
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+import asset_store
+
+# Varlık deposundaki blob'ların içerik özetli URL'lerle sunulması: /static/a/<sha256>.png
+# İçerik asla değişmediği için yanıtlar "immutable" olarak bir yıl önbelleklenir; galeri
+# yeniden yüklendiğinde tarayıcı ağa hiç çıkmaz. Tam dosyalar FileResponse ile gönderilir
+# (sunucu destekliyorsa sendfile), Range ve koşullu GET burada karşılanır.
+PREFIX = "/static/a"
+IMMUTABLE = "public, max-age=31536000, immutable"
+RANGE_CHUNK = 1 << 16       # Range gövdesi mmap'ten bu boyutta kopyasız dilimlerle akıtılır
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+router = APIRouter()
+
+def asset_url(digest, ext=None):
+    if ext is None:
+        info = asset_store.get_store().info(digest)
+        ext = info["ext"] if info else ""
+    return f"{PREFIX}/{digest}{ext}"
+
+def url_for(name):
+    """Hashed URL of a logical asset name ("renders/mac-1.png"), or None."""
+    digest = asset_store.get_store().resolve(name)
+    return asset_url(digest) if digest else None
+
+def _etag_matches(header, etag):
+    # If-None-Match: zayıf karşılaştırma (W/ öneki yok sayılır)
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+def _if_range_matches(header, etag):
+    # If-Range: yalnızca güçlü ve birebir eşleşme; tarih ya da W/ etiket tam yanıt alır
+    return header is None or header.strip() == etag
+
+def accepted_encodings(header):
+    """
+    Content codings the client accepts from an Accept-Encoding header,
+    honouring q-values: "gzip;q=0" or "*;q=0" rules a coding out.
+    """
+    weights = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+    star = weights.get("*", 0.0)
+    return {coding for coding in ("br", "gzip") if weights.get(coding, star) > 0}
+
+def _stream(view, start, end):
+    # memoryview dilimleri kopyalanmaz; her parça doğrudan sokete yazılır
+    for offset in range(start, end + 1, RANGE_CHUNK):
+        yield view[offset:min(offset + RANGE_CHUNK, end + 1)]
+
+def _variant_etag(digest, encoding):
+    # Sıkıştırılmış kopya ayrı bir temsil: kimlik gövdesinin ETag'ini paylaşmaz
+    return f'"{digest}-{encoding}"' if encoding else f'"{digest}"'
+
+def parse_range(header, size):
+    """
+    Returns (start, end) inclusive for a single "bytes=" range, or None when
+    it cannot be satisfied. Multi-range requests are not supported.
+    """
+    match = _RANGE.match(header.strip())
+    if not match or size == 0:
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    elif last:
+        start, end = max(0, size - int(last)), size - 1
+    else:
+        return None
+    if start > end or start >= size:
+        return None
+    return start, end
+
+@router.api_route(PREFIX + "/{filename}", methods=["GET", "HEAD"])
+async def serve_asset(filename: str, request: Request):
+    digest, ext = os.path.splitext(filename)
+    store = asset_store.get_store()
+    info = store.info(digest)
+    if not info or info["ext"] != ext:
+        raise HTTPException(status_code=404, detail="Asset not found")
+
+    # Range yalnızca kimlik gövdesine uygulanır; aksi halde kabul edilen ilk varyant seçilir
+    range_header = request.headers.get("range")
+    use_range = bool(range_header) and _if_range_matches(request.headers.get("if-range"), _variant_etag(digest, None))
+    path, encoding = info["path"], None
+    if not use_range:
+        accepted = accepted_encodings(request.headers.get("accept-encoding"))
+        path, encoding = next(((p, e) for p, e in store.variants(digest) if e in accepted), (path, None))
+
+    etag = _variant_etag(digest, encoding)
+    headers = {"ETag": etag, "Cache-Control": IMMUTABLE, "Accept-Ranges": "bytes", "Vary": "Accept-Encoding"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    size = info["size"]
+    if use_range:
+        byte_range = parse_range(range_header, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        view = store.view(digest)
+        if view is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        range_headers = {**headers, "Content-Range": f"bytes {start}-{end}/{size}", "Content-Length": str(end - start + 1)}
+        if request.method == "HEAD":
+            return Response(status_code=206, media_type=info["mime"], headers=range_headers)
+        return StreamingResponse(_stream(view, start, end), status_code=206, media_type=info["mime"], headers=range_headers)
+
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return FileResponse(path, media_type=info["mime"], headers=headers)
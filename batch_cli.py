@@ -0,0 +1,421 @@
+import os
+import sys
+import json
+import time
+import signal
+import argparse
+import contextlib
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import mac_duzenleyici
+import profiler
+import team_registry
+import tracer
+from logo_service import get_logo_service
+
+# Etkileşimsiz toplu çalıştırma (cron vb.): input() sorularının yerine bayraklar.
+#   python batch_cli.py resolve maclar.txt --format ndjson > resolved.ndjson
+#   python batch_cli.py render resolved.ndjson --jobs 4
+#   python batch_cli.py run-all maclar.txt --jobs 8 --format json
+# Girdi maclar.txt biçiminde metin veya JSON/NDJSON kayıtlarıdır ("-" veya dosya yoksa
+# stdin); bir alt komutun NDJSON çıktısı bir sonrakine doğrudan verilebilir. Makine
+# çıktısı stdout'a, insan için yazılan ilerleme mesajları stderr'e gider.
+COMMANDS = ("resolve", "fetch-logos", "render", "compress", "run-all")
+FORMATS = ("ndjson", "json", "text")
+DEFAULT_JOBS = min(8, os.cpu_count() or 1)
+
+EXIT_OK = 0             # tüm kayıtlar başarılı
+EXIT_PARTIAL = 1        # en az bir kayıt başarısız
+EXIT_USAGE = 2          # hatalı bayrak, okunamayan girdi veya boş girdi
+EXIT_INTERRUPTED = 130  # Ctrl+C / SIGTERM
+
+# Backend ve otomasyon akışındaki alan adları da kabul edilir
+FIELD_ALIASES = {
+    "home_team": "ev_sahibi", "home": "ev_sahibi",
+    "away_team": "deplasman", "away": "deplasman",
+    "odds_1": "oran_1", "odds_x": "oran_x", "odds_2": "oran_2",
+}
+
+class InputError(Exception):
+    pass
+
+# --- Girdi ---
+def _read_source(path):
+    if path == "-":
+        return sys.stdin.read()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    except OSError as e:
+        raise InputError(f"'{path}' okunamadı: {e}")
+
+def _parse_json_records(text, path):
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        # NDJSON: satır başına bir kayıt
+        data = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if line.strip():
+                try:
+                    data.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    raise InputError(f"{path}:{number}: geçersiz JSON ({e.msg})")
+    if isinstance(data, dict):
+        data = data.get("results", [data])
+    if not isinstance(data, list) or not all(isinstance(item, dict) for item in data):
+        raise InputError(f"{path}: JSON girdisi kayıt listesi olmalı")
+    return data
+
+def _normalize(record, path):
+    match = {FIELD_ALIASES.get(key, key): value for key, value in record.items()}
+    if not match.get("ev_sahibi") or not match.get("deplasman"):
+        raise InputError(f"{path}: takım adı eksik kayıt: {json.dumps(record, ensure_ascii=False)}")
+    # Önceki çalışmanın sonuç alanları yeni çalışmaya taşınmaz
+    for key in ("ok", "error", "stage", "elapsed"):
+        match.pop(key, None)
+    return match
+
+def read_matches(paths, boost=0.20):
+    """
+    Reads matches from files or stdin ("-"). JSON arrays, NDJSON and this
+    CLI's own output are taken as records; anything else is parsed as
+    maclar.txt text with `boost` added to the odds. Raises InputError.
+    """
+    matches = []
+    for path in paths or ["-"]:
+        text = _read_source(path)
+        if text.lstrip().startswith(("[", "{")):
+            matches.extend(_normalize(record, path) for record in _parse_json_records(text, path))
+        else:
+            matches.extend(mac_duzenleyici.parse_match_lines(text.splitlines(), boost=boost))
+    return matches
+
+# --- Çıktı ---
+class Output:
+    """
+    Writes result records to stdout: NDJSON lines as soon as each record
+    is done, or one JSON document / text table at the end.
+    """
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+        if self.fmt == "ndjson":
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self.stream.flush()
+
+    def close(self, command, elapsed):
+        failed = sum(1 for record in self.records if not record.get("ok"))
+        records = sorted(self.records, key=lambda record: record.get("index", 0))
+        if self.fmt == "json":
+            json.dump({
+                "command": command,
+                "total": len(records),
+                "ok": len(records) - failed,
+                "failed": failed,
+                "elapsed": round(elapsed, 3),
+                "results": records,
+            }, self.stream, ensure_ascii=False, indent=2, default=str)
+            self.stream.write("\n")
+        elif self.fmt == "text":
+            for record in records:
+                mark = "✅" if record.get("ok") else "❌"
+                title = f"{record['ev_sahibi']} vs {record['deplasman']}" if "ev_sahibi" in record else record.get("file", "")
+                detail = record.get("error") or " ".join(str(record.get(key) or "") for key in ("gun", "saat", "output_filename")).strip()
+                self.stream.write(f"{mark} {record.get('index', '-'):>3}  {title}  {detail}\n")
+            self.stream.write(f"{len(records) - failed}/{len(records)} başarılı ({elapsed:.2f} sn)\n")
+        self.stream.flush()
+        return failed
+
+def _failed(record, stage, error):
+    record.update(ok=False, stage=stage, error=str(error))
+    return record
+
+# --- Aşamalar ---
+def _resolve_one(match, args):
+    tracer.bind(match=f"{match['ev_sahibi']} vs {match['deplasman']}", index=match["index"])
+    try:
+        # Saati ve günü zaten olan kayıtlar (önceki çalışmanın çıktısı) yeniden aranmaz
+        if match.get("saat") and match.get("gun"):
+            match["time_source"] = match.get("time_source") or "input"
+        else:
+            saat, gun = mac_duzenleyici.resolve_match_time(match, args.subtract_day, args.ai_key)
+            match["time_source"] = "manual" if match.get("manual_datetime") else "lookup"
+            if (saat is None or gun is None) and not match.get("manual_datetime"):
+                if args.strict:
+                    return _failed(match, "resolve", "Maç saati hiçbir kaynakta bulunamadı")
+                saat, gun = mac_duzenleyici.default_match_time()
+                match["time_source"] = "default"
+            match["saat"], match["gun"] = saat, gun
+        mac_duzenleyici.verify_team_names(match)
+    except Exception as e:
+        return _failed(match, "resolve", e)
+    match["ok"] = True
+    return match
+
+def resolve_stage(matches, args, emit=None):
+    """
+    Resolves kick-off times and canonical names with `args.jobs` threads.
+    Returns the records in input order; `emit` sees each as it finishes.
+    """
+    context = contextvars.copy_context()
+    results = []
+    pool = ThreadPoolExecutor(max_workers=max(1, args.jobs))
+    try:
+        futures = [pool.submit(context.copy().run, _resolve_one, match, args) for match in matches]
+        for future in as_completed(futures):
+            record = future.result()
+            results.append(record)
+            if emit:
+                emit(record)
+    finally:
+        # Kesilirse sıradaki aramalar hiç başlatılmaz
+        pool.shutdown(cancel_futures=True)
+    results.sort(key=lambda record: record["index"])
+    return results
+
+def logos_stage(matches, args, emit=None):
+    """Fetches both logos of every match in one deduplicated parallel pass."""
+    teams = []
+    for match in matches:
+        teams.append((match["ev_sahibi"], match.get("api_logo1")))
+        teams.append((match["deplasman"], match.get("api_logo2")))
+    error = "Logo dosyası oluşturulamadı"
+    try:
+        paths = get_logo_service(mac_duzenleyici.LOGOS_DIR).resolve_many(teams, workers=args.jobs)
+    except Exception as e:
+        paths, error = {}, e
+    registry = team_registry.get_registry()
+    for match in matches:
+        logo1, logo2 = paths.get(match["ev_sahibi"]), paths.get(match["deplasman"])
+        if logo1 and logo2 and os.path.exists(logo1) and os.path.exists(logo2):
+            match.update(logo1=logo1, logo2=logo2, ok=True)
+            registry.set_logo_file(match["ev_sahibi"], os.path.basename(logo1))
+            registry.set_logo_file(match["deplasman"], os.path.basename(logo2))
+        else:
+            _failed(match, "fetch-logos", error)
+        if emit:
+            emit(match)
+    registry.save()
+    return matches
+
+def render_job(match, template="Maclar.psd", wait=None, scratch_dir=None):
+    """
+    Render pool target: renders one resolved match and returns the record
+    (the worker's changes to `match` are not visible to the parent).
+    """
+    if wait is None:
+        wait = mac_duzenleyici.PHOTOSHOP_WAIT
+    tracer.bind(match=f"{match['ev_sahibi']} vs {match['deplasman']}", index=match["index"])
+    if mac_duzenleyici.render_match(match, match["index"], psd_filename=template, wait=wait, scratch_dir=scratch_dir):
+        match["ok"] = True
+        return match
+    return _failed(match, "render", "Photoshop tetiklenemedi")
+
+def render_stage(matches, args, emit=None):
+    """
+    Renders every match: inline for --jobs 1, otherwise through a render
+    pool with `args.jobs` worker processes (each job has its own JSX).
+    """
+    ready, results = [], []
+    for match in matches:
+        if match.get("saat") is None or match.get("gun") is None:
+            results.append(_failed(match, "render", "Saat/gün yok (önce resolve çalıştırın)"))
+            if emit:
+                emit(match)
+        else:
+            ready.append(match)
+
+    if args.jobs <= 1:
+        for match in ready:
+            try:
+                record = render_job(match, args.template, args.wait)
+            except Exception as e:
+                record = _failed(match, "render", e)
+            results.append(record)
+            if emit:
+                emit(record)
+    elif ready:
+        from render_pool import RenderPool, JOB_TIMEOUT
+        pool = RenderPool(target="batch_cli:render_job", workers=args.jobs)
+        try:
+            futures = {}
+            for match in ready:
+                # Kuyruk doluysa yer açılana kadar beklenir (geri basınç)
+                future = pool.submit(match, template=args.template, wait=args.wait, timeout=JOB_TIMEOUT)
+                futures[future] = match
+            for future in as_completed(futures):
+                # İşçi kaydın kopyasını döndürür; çağıranın elindeki kayıt güncellenir
+                record = futures[future]
+                try:
+                    record.update(future.result())
+                except Exception as e:
+                    _failed(record, "render", e)
+                results.append(record)
+                if emit:
+                    emit(record)
+        finally:
+            pool.shutdown()
+    results.sort(key=lambda record: record["index"])
+    return results
+
+def compress_stage(args):
+    results = mac_duzenleyici.compress_outputs(args.output_dir)
+    for index, record in enumerate(results, 1):
+        record.update(index=index, ok=record.pop("success"))
+    return results
+
+def run_all(matches, args, emit):
+    """resolve -> fetch-logos -> render -> compress; failed matches stop at their stage."""
+    resolved = resolve_stage(matches, args)
+    for stage in (logos_stage, render_stage):
+        done = [match for match in resolved if match.get("ok")]
+        for match in done:
+            match.pop("ok")
+        stage(done, args)
+    if not args.no_compress and any(match.get("ok") for match in resolved):
+        try:
+            compressed = {os.path.basename(record["file"]): record for record in compress_stage(args)}
+        except Exception as e:
+            compressed = {}
+            for match in resolved:
+                if match.get("ok"):
+                    _failed(match, "compress", e)
+        for match in resolved:
+            record = compressed.get(match.get("output_filename"))
+            if record and match.get("ok"):
+                if record["ok"]:
+                    match["compressed"] = record["file"]
+                else:
+                    _failed(match, "compress", record["error"])
+    for match in resolved:
+        emit(match)
+
+# --- Komut satırı ---
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--format", choices=FORMATS, default="ndjson", help="stdout çıktı biçimi (varsayılan: ndjson)")
+    common.add_argument("--jobs", "-j", type=int, default=DEFAULT_JOBS, help=f"eşzamanlı iş sayısı (varsayılan: {DEFAULT_JOBS})")
+    common.add_argument("--profile", nargs="?", const="sample", choices=profiler.MODES, help="çalışmayı profille (sample|cprofile)")
+
+    inputs = argparse.ArgumentParser(add_help=False)
+    inputs.add_argument("inputs", nargs="*", metavar="FILE", help="maclar.txt metni veya JSON/NDJSON; '-' ya da boş: stdin")
+    inputs.add_argument("--boost", type=float, default=0.20, help="metin girdisinde oranlara eklenecek değer (varsayılan: 0.20)")
+
+    lookup = argparse.ArgumentParser(add_help=False)
+    lookup.add_argument("--subtract-day", action="store_true", help="00:00-05:59 maçlarını önceki günün tarihiyle yaz")
+    lookup.add_argument("--ai-key", default=os.getenv("GEMINI_API_KEY"), help="API bulamazsa AI araması için anahtar (varsayılan: $GEMINI_API_KEY)")
+    lookup.add_argument("--strict", action="store_true", help="saati bulunamayan maçı varsayılan saat atamak yerine başarısız say")
+
+    render = argparse.ArgumentParser(add_help=False)
+    render.add_argument("--template", default="Maclar.psd", help="PSD şablonu (adında 'basketbol' geçerse basketbol modu)")
+    render.add_argument("--wait", type=float, default=mac_duzenleyici.PHOTOSHOP_WAIT,
+                        help=f"her render sonrası Photoshop bekleme süresi, sn (varsayılan: {mac_duzenleyici.PHOTOSHOP_WAIT})")
+
+    parser = argparse.ArgumentParser(
+        prog="batch_cli",
+        description="Maç görsellerini etkileşimsiz, toplu olarak üretir.",
+        epilog=f"Çıkış kodları: {EXIT_OK} başarılı, {EXIT_PARTIAL} kısmi hata, {EXIT_USAGE} kullanım/girdi hatası, {EXIT_INTERRUPTED} kesildi.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("resolve", parents=[common, inputs, lookup], help="maç saatlerini ve takım adlarını bul")
+    sub.add_parser("fetch-logos", parents=[common, inputs], help="takım logolarını indir/işle")
+    sub.add_parser("render", parents=[common, inputs, render], help="çözümlenmiş maçları Photoshop'ta üret")
+    compress = sub.add_parser("compress", parents=[common], help="mac-*.png çıktılarını sıkıştır")
+    compress.add_argument("--output-dir", default=mac_duzenleyici.OUTPUT_DIR, help="render çıktılarının klasörü")
+    run = sub.add_parser("run-all", parents=[common, inputs, lookup, render], help="resolve + fetch-logos + render + compress")
+    run.add_argument("--no-compress", action="store_true", help="sıkıştırma adımını atla")
+    run.set_defaults(output_dir=mac_duzenleyici.OUTPUT_DIR)
+    return parser
+
+@contextlib.contextmanager
+def _machine_stdout():
+    """
+    Yields the stream for result records and sends everything else printed
+    to stdout to stderr. Done at the file descriptor level when possible,
+    so render pool worker processes cannot break the JSON output either.
+    """
+    try:
+        fd, err_fd = sys.stdout.fileno(), sys.stderr.fileno()
+    except (AttributeError, OSError, ValueError):
+        stream = sys.stdout
+        with contextlib.redirect_stdout(sys.stderr):
+            yield stream
+        return
+    sys.stdout.flush()
+    saved = os.dup(fd)
+    os.dup2(err_fd, fd)
+    stream = os.fdopen(saved, "w", encoding="utf-8", closefd=False)
+    try:
+        yield stream
+    finally:
+        stream.flush()
+        sys.stdout.flush()
+        os.dup2(saved, fd)
+        os.close(saved)
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+def _run(args, out):
+    if args.command == "compress":
+        try:
+            records = compress_stage(args)
+        except Exception as e:
+            records = [_failed({"index": 1, "file": args.output_dir}, "compress", e)]
+        for record in records:
+            out.emit(record)
+        return
+
+    matches = read_matches(args.inputs, args.boost)
+    if not matches:
+        raise InputError("Girdide geçerli maç bulunamadı")
+    for index, match in enumerate(matches, 1):
+        match.setdefault("index", index)
+
+    with tracer.batch(f"batch_{args.command.replace('-', '_')}", matches=len(matches)):
+        if args.command == "resolve":
+            resolve_stage(matches, args, out.emit)
+        elif args.command == "fetch-logos":
+            logos_stage(matches, args, out.emit)
+        elif args.command == "render":
+            render_stage(matches, args, out.emit)
+        else:
+            run_all(matches, args, out.emit)
+
+def main(argv=None):
+    """
+    Entry point; returns the exit code (EXIT_OK, EXIT_PARTIAL, EXIT_USAGE
+    or EXIT_INTERRUPTED).
+    """
+    args = build_parser().parse_args(argv)
+    if args.jobs < 1:
+        print("❌ --jobs en az 1 olmalı", file=sys.stderr)
+        return EXIT_USAGE
+    # cron/systemd durdurması da Ctrl+C gibi ele alınır; yazılmış NDJSON satırları geçerli kalır
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    start = time.perf_counter()
+    try:
+        with _machine_stdout() as stream:
+            out = Output(stream, args.format)
+            profile = profiler.profile(f"batch-{args.command}", args.profile) if args.profile else contextlib.nullcontext()
+            with profile:
+                _run(args, out)
+            failed = out.close(args.command, time.perf_counter() - start)
+    except InputError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except KeyboardInterrupt:
+        print("\n⛔ Kesildi.", file=sys.stderr)
+        return EXIT_INTERRUPTED
+    return EXIT_PARTIAL if failed else EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(main())
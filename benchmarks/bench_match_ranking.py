@@ -0,0 +1,73 @@
+"""
+Maç eşleştirme benchmark'ı (kayıtlı fikstürler üzerinde).
+
+Kayıtlı TheSportsDB etkinliklerini geçici bir fikstür deposuna yükler,
+her test vakası için find_match_candidates çağırır ve isabet oranını,
+lookup başına süreyi ve yapılan ağ çağrısı sayısını raporlar.
+
+Kullanım: python benchmarks/bench_match_ranking.py [--repeat 20]
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import sports_cli
+import match_ranker
+from fixture_store import FixtureStore
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "events_sample.json")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with open(FIXTURES, encoding="utf-8") as f:
+        recorded = json.load(f)
+    today = date.fromisoformat(recorded["recorded_on"])
+
+    network_calls = []
+
+    async def offline_fetch(url):
+        network_calls.append(url)
+        return {}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FixtureStore(sports_cli.BASE_URL, offline_fetch, path=os.path.join(tmp, "fixtures.json"))
+        store.ingest(recorded["events"])
+        sports_cli._fixture_store = store
+        sports_cli.fetch_json_async = offline_fetch
+
+        async def run_cases():
+            hits = 0
+            for case in recorded["cases"]:
+                ranked = await sports_cli.find_match_candidates(case["home"], case["away"], today=today)
+                if ranked and ranked[0].event["idEvent"] == case["expected"]:
+                    hits += 1
+            return hits
+
+        hits = asyncio.run(run_cases())
+        match_ranker.name_similarity.cache_clear()
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            asyncio.run(run_cases())
+        elapsed = time.perf_counter() - start
+
+    lookups = args.repeat * len(recorded["cases"])
+    print(f"Etkinlik sayısı   : {len(recorded['events'])}")
+    print(f"Vaka sayısı       : {len(recorded['cases'])}")
+    print(f"İsabet            : {hits}/{len(recorded['cases'])} ({hits / len(recorded['cases']):.1%})")
+    print(f"Lookup başına     : {elapsed / lookups * 1e6:.1f} µs")
+    print(f"Lookup/sn         : {lookups / elapsed:,.0f}")
+    print(f"Ağ çağrısı        : {len(network_calls)}")
+
+if __name__ == "__main__":
+    main()
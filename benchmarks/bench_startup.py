@@ -0,0 +1,113 @@
+"""
+Açılış süresi benchmark'ı ve import profili.
+
+Her hedef (backend, CLI, ...) ayrı ve taze bir Python sürecinde
+`-X importtime` ile import edilir. Süreç başına duvar saati süresi
+(p50/en kötü), kümülatif import süresi en yüksek modüller ve ağır
+opsiyonel paketlerin (duckduckgo_search, openai, google.generativeai, PIL,
+requests) açılışta yüklenip yüklenmediği raporlanır. Bütçe aşılırsa çıkış kodu 1.
+
+Kullanım:
+    python benchmarks/bench_startup.py                   # tüm hedefler
+    python benchmarks/bench_startup.py --only backend --top 20
+    python benchmarks/bench_startup.py --budget-ms 1000 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import subprocess
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+
+TARGETS = {
+    "backend": "import main",
+    "automation_engine": "import automation_engine",
+    "cli": "import mac_duzenleyici",
+    "sports_cli": "import sports_cli",
+}
+HEAVY_MODULES = ("duckduckgo_search", "openai", "google.generativeai", "PIL", "requests")
+
+def run_once(code):
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT_DIR, os.path.join(ROOT_DIR, "backend")]))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True,
+    )
+    return time.perf_counter() - start, proc
+
+def parse_importtime(stderr):
+    """
+    Returns [(module, self_us, cumulative_us)] from `-X importtime` output;
+    nested modules keep their leading spaces stripped.
+    """
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2].strip()
+        except (ValueError, IndexError):
+            continue
+        rows.append((name, self_us, cumulative_us))
+    return rows
+
+def profile_target(name, code, repeat, top):
+    durations = []
+    proc = None
+    for _ in range(repeat):
+        elapsed, proc = run_once(code)
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ["?"])[-1]
+            return {"error": error}
+        durations.append(elapsed)
+
+    rows = parse_importtime(proc.stderr)
+    loaded = {m for m, _, _ in rows}
+    durations.sort()
+    return {
+        "p50_ms": round(durations[len(durations) // 2] * 1000, 1),
+        "max_ms": round(durations[-1] * 1000, 1),
+        "import_ms": round(sum(s for _, s, _ in rows) / 1000, 1),
+        "modules": len(rows),
+        "heavy_loaded": [m for m in HEAVY_MODULES if m in loaded],
+        "top": sorted(rows, key=lambda r: r[2], reverse=True)[:top],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Backend / CLI açılış süresi ve import profili")
+    parser.add_argument("--only", nargs="*", choices=sorted(TARGETS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Kümülatif süreye göre gösterilecek modül sayısı")
+    parser.add_argument("--budget-ms", type=float, default=1000.0, help="Hedef başına izin verilen p50 açılış süresi")
+    args = parser.parse_args()
+
+    over_budget = []
+    for name in args.only or TARGETS:
+        res = profile_target(name, TARGETS[name], args.repeat, args.top)
+        print(f"\n=== {name}: {TARGETS[name]}")
+        if "error" in res:
+            print(f"   ATLANDI ({res['error']})")
+            continue
+        print(f"   açılış p50 {res['p50_ms']} ms (en kötü {res['max_ms']} ms), "
+              f"import {res['import_ms']} ms, {res['modules']} modül")
+        print(f"   açılışta yüklenen ağır paketler: {', '.join(res['heavy_loaded']) or 'yok'}")
+        print(f"   {'modül':<40}{'self ms':>10}{'kümülatif ms':>14}")
+        for module, self_us, cumulative_us in res["top"]:
+            print(f"   {module[:40]:<40}{self_us / 1000:>10.1f}{cumulative_us / 1000:>14.1f}")
+        if res["p50_ms"] > args.budget_ms:
+            over_budget.append(f"{name}: {res['p50_ms']} ms > {args.budget_ms:.0f} ms")
+
+    if over_budget:
+        print("\n❌ Açılış bütçesi aşıldı:")
+        for line in over_budget:
+            print(f"   - {line}")
+        return 1
+    print(f"\n✅ Tüm hedefler {args.budget_ms:.0f} ms bütçesinin altında.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Yerel tarih/saat çıkarımı benchmark'ı (kayıtlı DDG snippet'leri üzerinde).
+
+Her vaka için time_extractor.extract_match_time sonucunu beklenen TSİ
+tarih/saatiyle karşılaştırır; eski "ilk regex eşleşmesi" yöntemiyle isabet
+oranını, LLM çağrısına gerek kalmayan vaka oranını ve vaka başına süreyi
+raporlar.
+
+Kullanım: python benchmarks/bench_time_extractor.py [--repeat 200]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import time_extractor
+
+SNIPPETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "snippets.json")
+
+_LEGACY_TIME = re.compile(r'\b([0-1]?[0-9]|2[0-3]):([0-5][0-9])\b')
+
+def legacy_first_hit(results):
+    """Eski heuristic_parse_match_time'ın saat seçimi: ilk HH:MM eşleşmesi, dilim dönüşümü yok."""
+    for r in results:
+        m = _LEGACY_TIME.search(r["title"] + " " + r["body"])
+        if m:
+            return m.group(0)
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    with open(SNIPPETS, encoding="utf-8") as f:
+        recorded = json.load(f)
+    today = date.fromisoformat(recorded["recorded_on"])
+    cases = recorded["cases"]
+
+    hits = confident = confident_wrong = legacy_hits = 0
+    for case in cases:
+        result = time_extractor.extract_match_time(case["home"], case["away"], case["results"], today)
+        correct = (result.date, result.time) == (case["expected_date"], case["expected_time"])
+        hits += correct
+        if result.confidence >= time_extractor.CONFIDENT:
+            confident += 1
+            confident_wrong += not correct
+        legacy_hits += legacy_first_hit(case["results"]) == case["expected_time"]
+        if not correct:
+            print(f"  ✗ {case['home']} vs {case['away']}: {result.date} {result.time} "
+                  f"(beklenen {case['expected_date']} {case['expected_time']})")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for case in cases:
+            time_extractor.extract_match_time(case["home"], case["away"], case["results"], today)
+    elapsed = time.perf_counter() - start
+
+    n = len(cases)
+    print(f"Vaka sayısı         : {n}")
+    print(f"İsabet (tarih+saat) : {hits}/{n} ({hits / n:.1%})")
+    print(f"Eski yöntem (saat)  : {legacy_hits}/{n} ({legacy_hits / n:.1%})")
+    print(f"LLM'siz çözülen     : {confident}/{n} (güven >= {time_extractor.CONFIDENT}, {confident_wrong} hatalı)")
+    print(f"Vaka başına         : {elapsed / (args.repeat * n) * 1e6:.1f} µs")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Uçtan uca benchmark paketi (kayıtlı HTTP verisi üzerinde).
+
+Tüm dış çağrılar http_replay üzerinden kayıt dosyasından (cassette) okunur;
+istenirse her çağrıya yapay gecikme eklenir. Her senaryo için p50/p95
+gecikme, iterasyon başına istek sayısı ve throughput raporlanır ve
+benchmarks/baseline.json ile karşılaştırılır. Gerileme varsa çıkış kodu 1.
+
+Kullanım:
+    python benchmarks/run_benchmarks.py                      # replay + baseline kontrolü
+    python benchmarks/run_benchmarks.py --latency-ms 80      # gerçekçi ağ gecikmesi
+    python benchmarks/run_benchmarks.py --save-baseline      # 5 turun en yavaşını baseline yap
+    python benchmarks/run_benchmarks.py --record             # canlı ağdan cassette kaydet
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import atexit
+import asyncio
+import argparse
+import tempfile
+import contextlib
+from datetime import date
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.join(ROOT_DIR, "backend"))
+
+# Ölçümler gerçek cache/ ve assets/ klasörlerine yazmaz (logo indeksleri, takım kayıtları,
+# varlık blob'ları): modüller import edilmeden önce geçici bir klasöre yönlendirilir.
+STATE_DIR = tempfile.mkdtemp(prefix="macbot-bench-")
+os.environ["MACBOT_CACHE_DIR"] = os.path.join(STATE_DIR, "cache")
+os.environ["MACBOT_ASSETS"] = os.path.join(STATE_DIR, "assets")
+atexit.register(shutil.rmtree, STATE_DIR, ignore_errors=True)
+
+import http_replay
+import rate_limiter
+import sports_cli
+import league_catalogue
+import match_ranker
+import time_extractor
+import fixture_store
+from fixture_store import FixtureStore
+
+CASSETTE = os.path.join(BENCH_DIR, "cassettes", "sample.json")
+BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+EVENTS = os.path.join(BENCH_DIR, "fixtures", "events_sample.json")
+SNIPPETS = os.path.join(BENCH_DIR, "fixtures", "snippets.json")
+# Girdiler cassette'in kapsadığı kümeye sabitlenir: katalog ya da kullanıcının maclar.txt'si
+# değişince replay miss olmasın. Yeni lig/maç eklemek için bu dosyalar güncellenip --record
+# ile yeniden kaydedilir.
+MACLAR = os.path.join(BENCH_DIR, "fixtures", "maclar.txt")
+LEAGUES = os.path.join(BENCH_DIR, "fixtures", "leagues.json")
+
+def load_fixture(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+def recorded_today():
+    return date.fromisoformat(load_fixture(EVENTS)["recorded_on"])
+
+def freeze_today(day):
+    """
+    Kayıtlı fikstürler geçmişte kalmasın diye sports_cli'nin ve fixture_store'un
+    'bugün'ünü sabitler (sezon adı ve saklama sınırı da kayıt gününe göre hesaplanır).
+    """
+    class RecordedDate(date):
+        @classmethod
+        def today(cls):
+            return day
+    sports_cli.date = RecordedDate
+    fixture_store.date = RecordedDate
+
+def fresh_fixture_store(tmp_dir):
+    # Her iterasyon soğuk depoyla başlar; aksi halde ilk iterasyondan sonra istek sayısı 0 olur
+    path = os.path.join(tmp_dir, "fixtures.json")
+    if os.path.exists(path):
+        os.remove(path)
+    sports_cli._fixture_store = FixtureStore(sports_cli.BASE_URL, sports_cli.fetch_json_checked_async, path=path)
+
+def maclar_pairs():
+    pairs = []
+    with open(MACLAR, encoding="utf-8") as f:
+        for line in f:
+            if " vs " in line:
+                home, rest = line.split(" vs ", 1)
+                away = []
+                for word in rest.split():
+                    if any(c.isdigit() for c in word):
+                        break
+                    away.append(word)
+                pairs.append({"home_team": home.strip(), "away_team": " ".join(away)})
+    return pairs
+
+# --- Senaryolar: her biri (setup -> iterasyon fonksiyonu) ---
+def scenario_parsing(tmp_dir):
+    events = load_fixture(EVENTS)
+    snippets = load_fixture(SNIPPETS)["cases"]
+    today = date.fromisoformat(events["recorded_on"])
+
+    def run():
+        for e in events["events"]:
+            sports_cli.convert_to_tr_time(e["dateEvent"], e["strTime"])
+            sports_cli.format_tr_date(e["dateEvent"])
+        for case in events["cases"]:
+            match_ranker.rank_candidates(case["home"], case["away"], events["events"], today)
+        for case in snippets:
+            time_extractor.extract_match_time(case["home"], case["away"], case["results"], today)
+    return run
+
+def scenario_get_upcoming_fixtures(tmp_dir):
+    import automation_engine
+    leagues = league_catalogue.load_leagues(LEAGUES)
+    today = recorded_today()
+
+    def run():
+        fresh_fixture_store(tmp_dir)
+        asyncio.run(automation_engine.get_upcoming_fixtures(leagues, today=today))
+    return run
+
+def scenario_run_automation_flow(tmp_dir):
+    import automation_engine
+    matches = maclar_pairs()
+
+    def run():
+        fresh_fixture_store(tmp_dir)
+        asyncio.run(automation_engine.run_automation_flow(matches))
+    return run
+
+def scenario_download_logos(tmp_dir):
+    import mac_duzenleyici
+    logos_dir = os.path.join(tmp_dir, "logos")
+    pairs = maclar_pairs()
+
+    def run():
+        # Boş logo klasörü: yerel kopya yerine indirme yolları ölçülür
+        shutil.rmtree(logos_dir, ignore_errors=True)
+        os.makedirs(logos_dir)
+        mac_duzenleyici.LOGOS_DIR = logos_dir
+        for m in pairs:
+            mac_duzenleyici.download_logos(m["home_team"], m["away_team"])
+    return run
+
+def scenario_resolve_logos_batch(tmp_dir):
+    import logo_service
+    logos_dir = os.path.join(tmp_dir, "logos_batch")
+    pairs = maclar_pairs()
+    teams = [t for m in pairs for t in (m["home_team"], m["away_team"])]
+
+    def run():
+        # Aynı boş klasör; tekrar eden takımlar tek sefer çözülür
+        shutil.rmtree(logos_dir, ignore_errors=True)
+        os.makedirs(logos_dir)
+        logo_service.get_logo_service(logos_dir).resolve_many(teams)
+    return run
+
+SCENARIOS = {
+    "parsing": scenario_parsing,
+    "get_upcoming_fixtures": scenario_get_upcoming_fixtures,
+    "run_automation_flow": scenario_run_automation_flow,
+    "download_logos": scenario_download_logos,
+    "resolve_logos_batch": scenario_resolve_logos_batch,
+}
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[idx]
+
+def run_scenario(name, factory, iterations, tmp_dir):
+    session = http_replay.session()
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            run = factory(tmp_dir)
+            run()  # ısınma (import, lru_cache vb.)
+    except ImportError as e:
+        return {"skipped": f"ImportError: {e}"}
+
+    session.reset_stats()
+    durations = []
+    counts = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(iterations):
+            calls = session.stats()["calls"]
+            start = time.perf_counter()
+            run()
+            durations.append(time.perf_counter() - start)
+            counts.append(session.stats()["calls"] - calls)
+    stats = session.stats()
+    total = sum(durations)
+    return {
+        "iterations": iterations,
+        "p50_ms": round(percentile(durations, 50) * 1000, 3),
+        "p95_ms": round(percentile(durations, 95) * 1000, 3),
+        "requests_per_iter": round(stats["calls"] / iterations, 2),
+        # Eşzamanlı aynı URL'ler tek isteğe iner ama yalnızca gerçekten çakışırlarsa;
+        # ortalama zamanlamaya göre oynar, en az istekli iterasyon ise sabittir
+        "requests_min": min(counts),
+        "replay_misses": stats["misses"],
+        "throughput_per_s": round(iterations / total, 2) if total else None,
+    }
+
+def slowest(rounds):
+    """Baseline için her senaryonun en yavaş turu alınır: gürültülü makinede tek iyi tur eşik olmasın."""
+    merged = {}
+    for results in rounds:
+        for name, res in results.items():
+            base = merged.get(name)
+            if base is None or ("skipped" not in res and ("skipped" in base or res["p95_ms"] > base["p95_ms"])):
+                merged[name] = res
+    return merged
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    regressions = []
+    for name, res in results.items():
+        if "skipped" in res:
+            continue
+        # Kayıtta olmayan çağrı ölçümü geçersiz kılar (hata yolu ölçülür); baseline'dan bağımsız
+        if res["replay_misses"]:
+            regressions.append(f"{name}: {res['replay_misses']} replay miss (cassette'i --record ile yenileyin)")
+        base = baseline.get(name)
+        if not base or "skipped" in base:
+            continue
+        # Birkaç ms'lik zamanlayıcı gürültüsü kısa senaryolarda göreli eşiği tek başına aşabilir
+        limit = max(base["p95_ms"] * (1 + tolerance), base["p95_ms"] + min_delta_ms)
+        if res["p95_ms"] > limit:
+            regressions.append(f"{name}: p95 {base['p95_ms']} ms -> {res['p95_ms']} ms")
+        if "requests_min" in base and res["requests_min"] > base["requests_min"]:
+            regressions.append(f"{name}: en az istek/iterasyon {base['requests_min']} -> {res['requests_min']}")
+        if res["requests_per_iter"] > base["requests_per_iter"] * (1 + tolerance):
+            regressions.append(f"{name}: istek/iterasyon {base['requests_per_iter']} -> {res['requests_per_iter']}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Kayıtlı veri üzerinde uçtan uca benchmark")
+    parser.add_argument("--cassette", default=CASSETTE)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Her dış çağrıya eklenen yapay gecikme")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--only", nargs="*", choices=sorted(SCENARIOS), help="Sadece bu senaryolar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="p95 ve ortalama istek sayısı için izin verilen göreli artış")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0, help="p95 için gerileme sayılmayan mutlak artış")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--baseline-rounds", type=int, default=5, help="--save-baseline'da tur sayısı (en yavaşı kaydedilir)")
+    parser.add_argument("--record", action="store_true", help="Canlı çağrıları cassette'e kaydet")
+    parser.add_argument("--json", action="store_true", help="Sonuçları JSON olarak yazdır")
+    parser.add_argument("--rate-limits", action="store_true", help="Host hız limitlerini replay'de de uygula")
+    args = parser.parse_args()
+
+    if not args.rate_limits:
+        # Replay'de ölçülen şey kodun kendisi; hız limiti beklemeleri sonuçları domine etmesin
+        for host in rate_limiter.DEFAULT_LIMITS:
+            rate_limiter.configure(host, rate=1e9, burst=1e9)
+
+    http_replay.configure(
+        mode="record" if args.record else "replay",
+        path=args.cassette,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+    )
+    freeze_today(recorded_today())
+
+    rounds = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for _ in range(max(1, args.baseline_rounds) if args.save_baseline else 1):
+            rounds.append({name: run_scenario(name, SCENARIOS[name], args.iterations, tmp_dir)
+                           for name in args.only or SCENARIOS})
+    results = slowest(rounds)
+    http_replay.session().save()
+    # --json'da stdout yalnızca sonuç JSON'ıdır; durum satırları stderr'e gider
+    status = sys.stderr if args.json else sys.stdout
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        print(f"{'Senaryo':<24}{'p50 ms':>10}{'p95 ms':>10}{'istek/it':>10}{'miss':>6}{'it/s':>10}")
+        for name, res in results.items():
+            if "skipped" in res:
+                print(f"{name:<24}  ATLANDI ({res['skipped']})")
+                continue
+            print(f"{name:<24}{res['p50_ms']:>10}{res['p95_ms']:>10}{res['requests_per_iter']:>10}"
+                  f"{res['replay_misses']:>6}{res['throughput_per_s']:>10}")
+
+    if args.save_baseline:
+        with open(BASELINE, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"\n✅ Baseline kaydedildi: {BASELINE}", file=status)
+        return 0
+
+    baseline = load_fixture(BASELINE) if os.path.exists(BASELINE) else {}
+    if not baseline:
+        print("\nℹ️  Baseline yok; yalnızca replay miss kontrol edildi (--save-baseline ile oluşturun).", file=status)
+
+    regressions = [] if args.record else compare(results, baseline, args.tolerance, args.min_delta_ms)
+    if regressions:
+        print("\n❌ Performans gerilemesi:", file=status)
+        for r in regressions:
+            print(f"   - {r}", file=status)
+        return 1
+    print("\n✅ Baseline ile karşılaştırma: gerileme yok.", file=status)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
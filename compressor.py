@@ -2,10 +2,16 @@ import os
 import shutil
 from PIL import Image
 
+import asset_store
+import event_bus
+import metrics
+import tracer
+
 def compress_and_rename_images(directory="."):
     """
     Finds 'mac-*.png' images, compresses them locally using PIL,
     and saves them to a 'compressed' directory with the new naming convention.
+    Returns one {"file", "success", ...} dict per image.
     """
     
     # 1. Create 'compressed' folder
@@ -19,10 +25,12 @@ def compress_and_rename_images(directory="."):
     
     if not files:
         print("No 'mac-*.png' files found to compress.")
-        return
+        return []
 
     print(f"Found {len(files)} files to compress...")
 
+    results = []
+
     for filename in files:
         filepath = os.path.join(directory, filename)
         
@@ -36,7 +44,7 @@ def compress_and_rename_images(directory="."):
         try:
             # 3. Compress using Pillow
             # 'optimize=True' and 'quality=85' usually gives good compression with little visual loss
-            with Image.open(filepath) as img:
+            with tracer.span("compress_file", file=filename), Image.open(filepath) as img:
                 # Kullanıcının "%10 kadar compress" isteği:
                 # PNG için 'save(quality=...)' parametresi yoktur. 
                 # Dosya boyutunu ciddi oranda düşürmek için 'Quantization' (renk azaltma) kullanılır.
@@ -49,9 +57,26 @@ def compress_and_rename_images(directory="."):
                 img.save(new_filepath, "PNG", optimize=True)
                 
             print(f"✅ Compressed & Saved: {new_filename}")
+            store = asset_store.get_store()
+            with store.batch():
+                store.put_file(filepath, f"renders/{filename}")
+                digest = store.put_file(new_filepath, f"compressed/{new_filename}")
+            original_bytes, compressed_bytes = os.path.getsize(filepath), os.path.getsize(new_filepath)
+            metrics.COMPRESS_FILES_TOTAL.labels("ok").inc()
+            metrics.COMPRESS_BYTES_TOTAL.labels("original").inc(original_bytes)
+            metrics.COMPRESS_BYTES_TOTAL.labels("compressed").inc(compressed_bytes)
+            event_bus.publish("compressed", filename=new_filename, success=True, hash=digest,
+                              original_bytes=original_bytes, compressed_bytes=compressed_bytes)
+            results.append({"file": new_filepath, "success": True, "hash": digest,
+                            "original_bytes": original_bytes, "compressed_bytes": compressed_bytes})
             
         except Exception as e:
             print(f"❌ Failed to compress {filename}: {e}")
+            metrics.COMPRESS_FILES_TOTAL.labels("error").inc()
+            event_bus.publish("compressed", filename=filename, success=False, error=str(e))
+            results.append({"file": filepath, "success": False, "error": str(e)})
+
+    return results
 
 if __name__ == "__main__":
     compress_and_rename_images(os.getcwd())
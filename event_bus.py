@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import atexit
+import asyncio
+import threading
+from collections import deque
+
+import metrics
+from local_store import cache_path
+
+# Backend olay yolu: maç çözümleme sonuçları, render bitişleri, yeni önizlemeler ve
+# sıkıştırma sonuçları yayınlanır; /events (SSE) uç noktası bunları arayüze iter.
+# publish() herhangi bir thread'den çağrılabilir; abone yoksa olay sadece geçmişe yazılır.
+HISTORY_SIZE = 200          # yeniden bağlanan istemciye (Last-Event-ID) tekrar gönderilen olaylar
+QUEUE_SIZE = 500            # yavaş abone başına bekleyen olay sınırı; dolarsa en eskisi atılır
+
+# Süreçler arası aktarım: CLI (mac_duzenleyici, batch_cli) ve render işçileri backend'in
+# belleğine erişemez. Backend çalışıyorsa (sahip dosyasındaki pid canlıysa) bu süreçlerin
+# olayları bir spool dosyasına satır satır eklenir; backend dosyayı izleyip olayları
+# kendi yoluna yeniden yayınlar. Backend yoksa dosyaya hiç yazılmaz. Aynı yoldan
+# süreç çıkışında metrik değişimleri de gönderilir (örn. CLI'daki sıkıştırma sayaçları).
+SPOOL_PATH = cache_path("events_spool.jsonl")
+SPOOL_OWNER_PATH = cache_path("events_spool.pid")
+SPOOL_POLL_INTERVAL = 0.5
+SPOOL_MAX_BYTES = 1 << 20   # okunan dosya bu boyutu geçince yenisine geçilir
+METRICS_RECORD = "_metrics"  # olay değil; backend metrics.merge() ile işler
+
+class EventBus:
+    def __init__(self, history_size=HISTORY_SIZE):
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()     # (loop, asyncio.Queue)
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.published = 0
+        self.dropped = 0
+
+    def publish(self, event_type, **data):
+        """
+        Records an event and hands it to every subscriber's queue on that
+        subscriber's own loop. Returns the event dict.
+        """
+        with self._lock:
+            event = {"id": self._next_id, "type": event_type, "time": time.time(), "data": data}
+            self._next_id += 1
+            self.published += 1
+            self._history.append(event)
+            subscribers = list(self._subscribers)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._offer, queue, event)
+            except RuntimeError:
+                # Döngüsü kapanmış abone
+                self._discard(loop, queue)
+        return event
+
+    def _offer(self, queue, event):
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+        queue.put_nowait(event)
+
+    def _discard(self, loop, queue):
+        with self._lock:
+            self._subscribers.discard((loop, queue))
+
+    async def subscribe(self, last_id=None, idle_timeout=None):
+        """
+        Async iterator of events for one client. With `last_id`, missed
+        events still in the history are replayed first; with `idle_timeout`
+        None is yielded after that many quiet seconds (SSE keep-alive).
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add((loop, queue))
+            backlog = [e for e in self._history if last_id is not None and e["id"] > last_id]
+        try:
+            sent = 0
+            for event in backlog:
+                sent = event["id"]
+                yield event
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), idle_timeout)
+                except TimeoutError:
+                    yield None
+                    continue
+                if event["id"] > sent:
+                    yield event
+        finally:
+            self._discard(loop, queue)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": self.dropped,
+                "last_id": self._next_id - 1,
+            }
+
+def format_sse(event):
+    """
+    Serializes an event in text/event-stream format.
+    """
+    payload = json.dumps({**event["data"], "time": event["time"]}, ensure_ascii=False)
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {payload}\n\n"
+
+_bus = EventBus()
+_serving = False            # bu süreç spool'u okuyan backend mi
+
+def get_bus():
+    return _bus
+
+def _spool_owner_alive():
+    try:
+        with open(SPOOL_OWNER_PATH, encoding="utf-8") as f:
+            pid = int(f.read().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return False
+    return pid != os.getpid()
+
+def _spool(record):
+    line = json.dumps({**record, "pid": os.getpid()}, ensure_ascii=False, default=str)
+    try:
+        # O_APPEND: eşzamanlı yazan süreçlerin satırları karışmaz
+        with open(SPOOL_PATH, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+    except OSError:
+        pass
+
+def publish(event_type, **data):
+    event = _bus.publish(event_type, **data)
+    if not _serving and _spool_owner_alive():
+        _spool({"type": event_type, "data": data})
+    return event
+
+def _forward_metrics():
+    if not _serving and _spool_owner_alive():
+        deltas = metrics.take_delta()
+        if deltas:
+            _spool({"type": METRICS_RECORD, "deltas": deltas})
+
+atexit.register(_forward_metrics)
+
+def _read_spool(path, offset):
+    """Returns (complete lines after offset, new offset); a partial last line is left for later."""
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read()
+    except OSError:
+        return [], offset
+    end = chunk.rfind(b"\n") + 1
+    return chunk[:end].decode("utf-8", "replace").splitlines(), offset + end
+
+def _republish(lines):
+    for line in lines:
+        try:
+            record = json.loads(line)
+            if record["type"] == METRICS_RECORD:
+                metrics.merge(record["deltas"])
+            else:
+                _bus.publish(record["type"], **record["data"])
+        except (ValueError, KeyError, TypeError):
+            continue
+
+async def follow_spool(poll_interval=SPOOL_POLL_INTERVAL):
+    """
+    Backend task: claims the spool and republishes events other processes
+    append to it. Events spooled before the backend started are skipped.
+    """
+    global _serving
+    _serving = True
+    try:
+        os.remove(SPOOL_PATH)
+    except OSError:
+        pass
+    with open(SPOOL_OWNER_PATH, "w", encoding="utf-8") as f:
+        f.write(str(os.getpid()))
+    offset = 0
+    try:
+        while True:
+            await asyncio.sleep(poll_interval)
+            lines, offset = _read_spool(SPOOL_PATH, offset)
+            _republish(lines)
+            if offset >= SPOOL_MAX_BYTES:
+                # Dosya ad değiştirir; yazanlar bir sonraki satırda yeni dosyayı açar.
+                # Ad değişikliği anında yazılmakta olan satırlar eski dosyadan okunur.
+                rotated = SPOOL_PATH + ".old"
+                os.replace(SPOOL_PATH, rotated)
+                lines, _ = _read_spool(rotated, offset)
+                _republish(lines)
+                os.remove(rotated)
+                offset = 0
+    finally:
+        _serving = False
+        try:
+            # Sahiplik başka bir backend'e geçmediyse dosya silinir
+            if not _spool_owner_alive():
+                os.remove(SPOOL_OWNER_PATH)
+                os.remove(SPOOL_PATH)
+        except OSError:
+            pass
+
+def stats():
+    return _bus.stats()
@@ -0,0 +1,268 @@
+import time
+import unicodedata
+from datetime import date, timedelta
+
+from local_store import cache_path, load_json, save_json_atomic
+
+# Yerel fikstür deposu: TheSportsDB etkinlikleri tarihe ve takım ID'sine göre indekslenir.
+# Depo sıcakken (warm) ev sahibi/deplasman eşleşmesi hiç ağ çağrısı yapmadan bulunur.
+FIXTURES_PATH = cache_path("fixtures.json")
+
+# Kaynak başına yenileme süreleri (saniye)
+NEXT_TTL = 3 * 3600          # eventsnext / eventsnextleague
+DAY_TTL = 6 * 3600           # eventsday
+SEASON_TTL = 24 * 3600       # eventsseason (tüm sezon listesi, nadiren değişir)
+
+# Bu kadar günden eski etkinlikler kayıt sırasında atılır
+KEEP_PAST_DAYS = 7
+
+TEAM_SUFFIXES = ("afc", "fc", "sk", "fk", "as", "calcio", "jk", "cf", "sc", "ac")
+
+_TR_FOLD = str.maketrans({
+    'ı': 'i', 'İ': 'i', 'ş': 's', 'Ş': 's', 'ç': 'c', 'Ç': 'c',
+    'ğ': 'g', 'Ğ': 'g', 'ü': 'u', 'Ü': 'u', 'ö': 'o', 'Ö': 'o',
+})
+
+def normalize_team_name(name):
+    """
+    Lowercases, folds Turkish/accented characters and drops club suffixes
+    ("FC", "SK", ...) so that "Fenerbahçe SK" and "fenerbahce" share a key.
+    """
+    if not name:
+        return ""
+    name = name.translate(_TR_FOLD)
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c)).lower()
+    name = "".join(c if c.isalnum() else " " for c in name)
+    words = [w for w in name.split() if w not in TEAM_SUFFIXES]
+    return " ".join(words)
+
+def current_season(today=None):
+    """
+    Returns the football season string for a date, e.g. "2025-2026".
+    """
+    today = today or date.today()
+    if today.month > 6:
+        return f"{today.year}-{today.year + 1}"
+    return f"{today.year - 1}-{today.year}"
+
+def names_match(target, candidate):
+    """
+    Loose name comparison on normalized names (substring either way or a
+    shared significant word). Same rule the old eventsnext loop used.
+    """
+    if not target or not candidate:
+        return False
+    if target in candidate or candidate in target:
+        return True
+    return any(len(w) > 3 and w in candidate for w in target.split())
+
+def kickoff_key(event):
+    """
+    Sort key for an event's kickoff (UTC): strTimestamp when present, else
+    dateEvent + strTime.
+    """
+    stamp = event.get("strTimestamp")
+    if stamp:
+        return stamp[:19]
+    return f"{event.get('dateEvent') or ''}T{(event.get('strTime') or '00:00:00')[:8]}"
+
+class FixtureStore:
+    """
+    In-memory event index persisted to cache/fixtures.json.
+
+    events   : idEvent -> event dict (TheSportsDB formatı)
+    by_date  : "YYYY-MM-DD" -> {idEvent}
+    by_team  : idTeam -> {idEvent}
+    by_league: idLeague -> {idEvent}
+    names    : normalized team name -> idTeam
+    fetched  : source key ("day:...", "season:...", ...) -> last fetch timestamp
+    """
+
+    def __init__(self, base_url, fetch, path=FIXTURES_PATH):
+        self.base_url = base_url
+        self.fetch = fetch
+        self.path = path
+        self.events = {}
+        self.by_date = {}
+        self.by_team = {}
+        self.by_league = {}
+        self.names = {}
+        self.fetched = {}
+        self._dirty = False
+        self._load()
+
+    # --- Kalıcılık ---
+    def _load(self):
+        data = load_json(self.path, default={}) or {}
+        self.fetched = data.get("fetched", {})
+        self.names = data.get("names", {})
+        self.ingest(data.get("events", []), mark_dirty=False)
+
+    def save(self):
+        if not self._dirty:
+            return
+        cutoff = (date.today() - timedelta(days=KEEP_PAST_DAYS)).isoformat()
+        for day in [d for d in self.by_date if d < cutoff]:
+            for event_id in self.by_date.pop(day):
+                self._unindex(self.events.pop(event_id, None))
+        try:
+            save_json_atomic(self.path, {
+                "events": list(self.events.values()),
+                "names": self.names,
+                "fetched": self.fetched,
+            })
+            self._dirty = False
+        except OSError as e:
+            print(f"⚠️ Fikstür deposu kaydedilemedi: {e}")
+
+    # --- İndeksleme ---
+    def _unindex(self, event):
+        if not event:
+            return
+        event_id = event.get("idEvent")
+        self.by_date.get(event.get("dateEvent"), set()).discard(event_id)
+        for key in ("idHomeTeam", "idAwayTeam"):
+            self.by_team.get(event.get(key), set()).discard(event_id)
+        self.by_league.get(event.get("idLeague"), set()).discard(event_id)
+
+    def ingest(self, events, mark_dirty=True):
+        """
+        Upserts events into the indexes. Re-ingesting an event whose date
+        changed (postponed match) moves it to the new date bucket.
+        """
+        count = 0
+        for e in events or []:
+            event_id = e.get("idEvent")
+            if not event_id or not e.get("dateEvent"):
+                continue
+            self._unindex(self.events.get(event_id))
+            self.events[event_id] = e
+            self.by_date.setdefault(e["dateEvent"], set()).add(event_id)
+            if e.get("idLeague"):
+                self.by_league.setdefault(e["idLeague"], set()).add(event_id)
+            for id_key, name_key in (("idHomeTeam", "strHomeTeam"), ("idAwayTeam", "strAwayTeam")):
+                team_id = e.get(id_key)
+                if not team_id:
+                    continue
+                self.by_team.setdefault(team_id, set()).add(event_id)
+                norm = normalize_team_name(e.get(name_key))
+                if norm:
+                    self.names[norm] = team_id
+            count += 1
+        if count and mark_dirty:
+            self._dirty = True
+        return count
+
+    def remember_team(self, team):
+        """
+        Records the names of a searchteams.php result so later lookups by
+        the same (or alternate) name resolve to its ID locally.
+        """
+        team_id = team.get("idTeam")
+        for key in ("strTeam", "strTeamShort", "strAlternate"):
+            for name in (team.get(key) or "").split(","):
+                norm = normalize_team_name(name)
+                if team_id and norm and self.names.get(norm) != team_id:
+                    self.names[norm] = team_id
+                    self._dirty = True
+
+    # --- Sorgular (ağ yok) ---
+    def team_ids_for_name(self, name):
+        norm = normalize_team_name(name)
+        if not norm:
+            return []
+        if norm in self.names:
+            return [self.names[norm]]
+        return list(dict.fromkeys(tid for n, tid in self.names.items() if names_match(norm, n)))
+
+    def events_on(self, day):
+        return [self.events[i] for i in self.by_date.get(day, ())]
+
+    def events_for_team(self, team_id, from_date=None):
+        events = (self.events[i] for i in self.by_team.get(team_id, ()))
+        if from_date:
+            events = (e for e in events if e.get("dateEvent", "") >= from_date)
+        return list(events)
+
+    def events_for_league(self, league_id, from_date=None):
+        events = (self.events[i] for i in self.by_league.get(str(league_id), ()))
+        if from_date:
+            events = (e for e in events if e.get("dateEvent", "") >= from_date)
+        return sorted(events, key=kickoff_key)
+
+    def find_pair(self, home_name, away_name, from_date=None, team_ids=None):
+        """
+        Returns stored events involving one of the home team's IDs whose
+        opponent name matches `away_name`. No network calls.
+        """
+        target_away = normalize_team_name(away_name)
+        candidates = []
+        for team_id in team_ids or self.team_ids_for_name(home_name):
+            for e in self.events_for_team(team_id, from_date):
+                e_home = normalize_team_name(e.get("strHomeTeam"))
+                e_away = normalize_team_name(e.get("strAwayTeam"))
+                if names_match(target_away, e_home) or names_match(target_away, e_away):
+                    candidates.append(e)
+        return list({e["idEvent"]: e for e in candidates}.values())
+
+    # --- Toplu doldurma / artımlı yenileme ---
+    def is_fresh(self, key, ttl):
+        return time.time() - self.fetched.get(key, 0) < ttl
+
+    def event_is_fresh(self, event):
+        """
+        True if any source that lists this event (team next, league next,
+        its day or a team season) was fetched within that source's TTL.
+        """
+        home, away = event.get("idHomeTeam"), event.get("idAwayTeam")
+        season = event.get("strSeason")
+        sources = [
+            (f"next:{home}", NEXT_TTL), (f"next:{away}", NEXT_TTL),
+            (f"league:{event.get('idLeague')}", NEXT_TTL),
+            (f"day:{event.get('dateEvent')}", DAY_TTL),
+        ]
+        if season:
+            sources += [(f"season:{home}:{season}", SEASON_TTL), (f"season:{away}:{season}", SEASON_TTL)]
+        return any(self.is_fresh(key, ttl) for key, ttl in sources)
+
+    async def _refresh(self, key, url, ttl, defaults=None):
+        if self.is_fresh(key, ttl):
+            return 0
+        try:
+            res = await self.fetch(url)
+        except Exception as e:
+            # Başarısız istek kaynağı taze işaretlemez; bir sonraki çağrı yeniden dener
+            print(f"⚠️ Fikstür kaynağı alınamadı ({key}): {e}")
+            return 0
+        # Boş yanıt da kaydedilir; aksi halde maçı olmayan takım her seferinde yeniden sorgulanır
+        self.fetched[key] = time.time()
+        res = res or {}
+        self._dirty = True
+        events = res.get("events") or []
+        for e in events:
+            for field, value in (defaults or {}).items():
+                e.setdefault(field, value)
+        return self.ingest(events)
+
+    async def refresh_day(self, day, ttl=DAY_TTL):
+        return await self._refresh(f"day:{day}", f"{self.base_url}/eventsday.php?d={day}", ttl)
+
+    async def refresh_team_next(self, team_id, ttl=NEXT_TTL):
+        return await self._refresh(f"next:{team_id}", f"{self.base_url}/eventsnext.php?id={team_id}", ttl)
+
+    async def refresh_season(self, team_id, season=None, ttl=SEASON_TTL):
+        season = season or current_season()
+        return await self._refresh(
+            f"season:{team_id}:{season}",
+            f"{self.base_url}/eventsseason.php?id={team_id}&s={season}",
+            ttl,
+        )
+
+    async def refresh_league(self, league_id, ttl=NEXT_TTL):
+        return await self._refresh(
+            f"league:{league_id}",
+            f"{self.base_url}/eventsnextleague.php?id={league_id}",
+            ttl,
+            defaults={"idLeague": str(league_id)},
+        )
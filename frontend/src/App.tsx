@@ -113,6 +113,7 @@ const App: React.FC = () => {
   const [matches, setMatches] = useState<any[]>([]);
   const [fixtures, setFixtures] = useState<any[]>([]);
   const [previews, setPreviews] = useState<string[]>([]);
+  const [previewUrls, setPreviewUrls] = useState<Record<string, string>>({});
   const [loading, setLoading] = useState(false);
   const [fixturesLoading, setFixturesLoading] = useState(false);
   const [inputText, setInputText] = useState('');
@@ -120,6 +121,8 @@ const App: React.FC = () => {
   const [logs, setLogs] = useState<any[]>([]);
   const [inputMode, setInputMode] = useState<'manual' | 'live'>('manual');
   const terminalRef = React.useRef<HTMLDivElement>(null);
+  // The run this client started; SSE events of other clients' runs are ignored
+  const currentRun = React.useRef<{ id: string; inputs: any[] } | null>(null);
 
   useEffect(() => {
     if (terminalRef.current) {
@@ -154,13 +157,61 @@ const App: React.FC = () => {
     localStorage.setItem('lang', newLang);
   };
 
+  // Initial snapshot once; afterwards the backend pushes changes over SSE
   useEffect(() => {
-    if (activeTab === 0) {
-      fetchFixtures();
-    } else if (activeTab === 1) {
-      fetchPreviews();
-    }
-  }, [activeTab]);
+    fetchFixtures();
+    fetchPreviews();
+  }, []);
+
+  useEffect(() => {
+    const source = new EventSource('http://localhost:8000/api/v1/automation/events');
+    const on = (type: string, handler: (data: any) => void) =>
+      source.addEventListener(type, (e) => handler(JSON.parse((e as MessageEvent).data)));
+
+    // Resync previews after a (re)connect in case files changed while disconnected
+    source.onopen = () => fetchPreviews();
+
+    const isOwnRun = (d: any) => currentRun.current !== null && d.run_id === currentRun.current.id;
+
+    on('run_started', (d) => {
+      if (!isOwnRun(d)) return;
+      // Start from the submitted inputs so rows never mix with the previous run's results
+      setMatches(currentRun.current!.inputs.map(m => ({ ...m })));
+      addLog(`Pipeline: ${d.total} matches queued`, 'info');
+    });
+    on('match_resolved', (d) => {
+      if (!isOwnRun(d)) return;
+      setMatches(prev => prev.map((m, i) => (i === d.index ? { ...m, ...d } : m)));
+      if (d.found) {
+        addLog(`RESOLVED [${d.source}]: ${d.home_team} vs ${d.away_team} -> ${d.date} ${d.time}`, 'success');
+      } else {
+        addLog(`NOT FOUND: ${d.home_team} vs ${d.away_team}`, 'error');
+      }
+    });
+    on('render_done', (d) => {
+      if (d.success) {
+        addLog(`SUCCESS: ${d.home} vs ${d.away} sent to Photoshop (${d.template})`, 'success');
+      } else {
+        addLog(`RENDER ERROR: ${d.home} vs ${d.away}`, 'error');
+      }
+    });
+    on('preview_added', (d) => {
+      setPreviews(prev => [d.filename, ...prev.filter(f => f !== d.filename)]);
+      if (d.url) setPreviewUrls(prev => ({ ...prev, [d.filename]: d.url }));
+      addLog(`PREVIEW: /Mac/${d.filename} ready`, 'success');
+    });
+    on('preview_removed', (d) => setPreviews(prev => prev.filter(f => f !== d.filename)));
+    on('compressed', (d) => {
+      if (d.success) {
+        const saved = Math.round((1 - d.compressed_bytes / d.original_bytes) * 100);
+        addLog(`COMPRESSED: ${d.filename} (-${saved}%)`, 'success');
+      } else {
+        addLog(`COMPRESS ERROR: ${d.filename}: ${d.error}`, 'error');
+      }
+    });
+
+    return () => source.close();
+  }, []);
 
   const fetchFixtures = async () => {
     setFixturesLoading(true);
@@ -186,11 +237,18 @@ const App: React.FC = () => {
     try {
       const response = await axios.get('http://localhost:8000/api/v1/automation/previews');
       setPreviews(response.data.previews);
+      setPreviewUrls(response.data.urls || {});
     } catch (error) {
       console.error("Error fetching previews:", error);
     }
   };
 
+  // Content-hashed URLs are cached forever by the browser; fall back to the mutable path
+  const previewSrc = (file: string) =>
+    previewUrls[file]
+      ? `http://localhost:8000${previewUrls[file]}`
+      : `http://localhost:8000/static/previews/${encodeURIComponent(file)}`;
+
   const handleDeleteAsset = async (filename: string) => {
     if (!window.confirm(t('gallery.confirm_delete') || "Are you sure you want to delete this asset?")) return;
 
@@ -198,7 +256,6 @@ const App: React.FC = () => {
       addLog(`SYSTEM: Deleting asset ${filename}...`, 'info');
       await axios.delete(`http://localhost:8000/api/v1/automation/previews/${filename}`);
       addLog(`SUCCESS: Asset ${filename} removed.`, 'success');
-      fetchPreviews();
     } catch (error) {
       addLog(`ERROR: Could not delete ${filename}`, 'error');
     }
@@ -216,7 +273,7 @@ const App: React.FC = () => {
       });
       if (response.data.status === 'success') {
         confetti({ particleCount: 100, spread: 70, colors: ['#10b981'] });
-        addLog(`SUCCESS: ${match.home_team} rendered to /Mac/${match.filename || 'result'}.png`, 'success');
+        // Re-read the hashed URLs: an overwritten render gets a new URL even if SSE missed it
         fetchPreviews();
       } else {
         addLog(`RENDER ERROR: ${response.data.message}`, 'error');
@@ -250,12 +307,16 @@ const App: React.FC = () => {
       };
     }).filter(Boolean);
 
+    const runId = crypto.randomUUID();
+    currentRun.current = { id: runId, inputs: matchInputs };
+
     try {
       addLog(`Requesting ${matchInputs.length} matches from automation core...`, 'info');
       const response = await axios.post('http://localhost:8000/api/v1/automation/execute', {
         matches: matchInputs,
         boost_odds: false,
-        subtract_day_for_night: false
+        subtract_day_for_night: false,
+        run_id: runId
       });
 
       const results = response.data.results;
@@ -492,10 +553,11 @@ const App: React.FC = () => {
 
                       // Aggressive normalization and matching
                       const normOutput = outputName.normalize('NFC').toLowerCase();
-                      const isRendered = previews.some(p => p.normalize('NFC').toLowerCase() === normOutput);
+                      const renderedFile = previews.find(p => p.normalize('NFC').toLowerCase() === normOutput);
+                      const isRendered = Boolean(renderedFile);
 
-                      const displaySrc = isRendered
-                        ? `http://localhost:8000/static/previews/${encodeURIComponent(outputName)}?v=${Date.now()}`
+                      const displaySrc = renderedFile
+                        ? previewSrc(renderedFile)
                         : (match.home_badge || `https://via.placeholder.com/320x180/09090b/1e293b?text=${encodeURIComponent(home)}`);
 
                       return (
@@ -611,18 +673,18 @@ const App: React.FC = () => {
                   <div key={idx} className="asset-card fade-in">
                     <div className="asset-image-container">
                       <img
-                        src={`http://localhost:8000/static/previews/${file}`}
+                        src={previewSrc(file)}
                         alt={file}
                         className="asset-image"
-                        onClick={() => window.open(`http://localhost:8000/static/previews/${file}`, '_blank')}
+                        onClick={() => window.open(previewSrc(file), '_blank')}
                       />
                       <div className="asset-overlay">
-                        <div className="action-btn-circle" onClick={() => window.open(`http://localhost:8000/static/previews/${file}`, '_blank')}>
+                        <div className="action-btn-circle" onClick={() => window.open(previewSrc(file), '_blank')}>
                           <Eye size={18} />
                         </div>
                         <a
-                          href={`http://localhost:8000/static/previews/${file}`}
-                          download
+                          href={previewSrc(file)}
+                          download={file}
                           className="action-btn-circle"
                           style={{ textDecoration: 'none' }}
                         >
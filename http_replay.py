@@ -0,0 +1,262 @@
+import os
+import json
+import time
+import atexit
+import asyncio
+import base64
+import random
+import threading
+import urllib.parse
+from collections import Counter
+
+import metrics
+from local_store import cache_path, load_json, save_json_atomic
+from lazy_imports import lazy
+
+requests = lazy("requests")
+
+# Dış HTTP çağrıları için kayıt/tekrar oynatma katmanı.
+# MACBOT_HTTP_MODE     : live (varsayılan) | record | replay
+# MACBOT_HTTP_CASSETTE : kayıt dosyası (JSON)
+# MACBOT_HTTP_LATENCY_MS / MACBOT_HTTP_JITTER_MS : her çağrıya eklenecek yapay gecikme
+MODES = ("live", "record", "replay")
+
+class ReplayMiss(Exception):
+    """Raised in replay mode when the cassette has no entry for a request."""
+
+class ReplayError(Exception):
+    """A recorded call that failed when it was recorded; replayed as an exception."""
+
+class ReplayResponse:
+    """
+    Minimal stand-in for requests.Response built from a cassette entry.
+    """
+    def __init__(self, status_code, content, headers=None, url=""):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.url = url
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+def normalize_url(url, params=None):
+    """
+    Canonical request key: scheme/host lowercased, query parameters merged
+    with `params` and sorted, so equivalent URLs share one cassette entry.
+    """
+    parts = urllib.parse.urlsplit(url)
+    query = urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+    if params:
+        query.extend((str(k), str(v)) for k, v in params.items())
+    query.sort()
+    return urllib.parse.urlunsplit((
+        parts.scheme.lower(), parts.netloc.lower(), parts.path,
+        urllib.parse.urlencode(query), "",
+    ))
+
+def host_of(key):
+    return urllib.parse.urlsplit(key).netloc or key.split("|", 1)[0]
+
+def _unreachable(exc):
+    # Bağlantı düzeyindeki hatalar (DNS, bağlantı reddi, ağ yok) kaydedilmez: HTTP durum
+    # kodu taşımayan OSError'lar ortamla ilgilidir, API'nin gerçek cevabı değildir
+    return isinstance(exc, OSError) and getattr(exc, "code", None) is None
+
+class HttpReplay:
+    def __init__(self, mode="live", path=None, latency_ms=0.0, jitter_ms=0.0):
+        if mode not in MODES:
+            raise ValueError(f"Geçersiz HTTP modu: {mode} (seçenekler: {', '.join(MODES)})")
+        self.mode = mode
+        self.path = path or cache_path("http_cassette.json")
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.calls = Counter()     # (kind, host) -> çağrı sayısı
+        self.misses = Counter()    # (kind, host) -> kayıtta bulunamayan çağrı
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._meta = {}            # "entries" dışındaki üst düzey alanlar (örn. recorded_on)
+        self._dirty = False
+        if mode != "live":
+            data = load_json(self.path, default={}) or {}
+            self._entries = data.pop("entries", {})
+            self._meta = data
+        if mode == "record":
+            atexit.register(self.save)
+
+    def _delay_seconds(self):
+        if self.latency_ms or self.jitter_ms:
+            return (self.latency_ms + random.uniform(0, self.jitter_ms)) / 1000.0
+        return 0.0
+
+    def _begin(self, kind, key):
+        stat_key = (kind, host_of(key))
+        with self._lock:
+            self.calls[stat_key] += 1
+        return stat_key, f"{kind} {key}"
+
+    def _timed(self, stat_key, fn):
+        # Gerçek (live/record) çağrılar host bazında süre ve sonuç olarak ölçülür
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = fn()
+            outcome = "ok"
+            return result
+        finally:
+            metrics.OUTBOUND_SECONDS.labels(*stat_key).observe(time.perf_counter() - start)
+            metrics.OUTBOUND_TOTAL.labels(*stat_key, outcome).inc()
+
+    async def _timed_async(self, stat_key, coro_fn):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await coro_fn()
+            outcome = "ok"
+            return result
+        finally:
+            metrics.OUTBOUND_SECONDS.labels(*stat_key).observe(time.perf_counter() - start)
+            metrics.OUTBOUND_TOTAL.labels(*stat_key, outcome).inc()
+
+    def _replay(self, stat_key, entry_key):
+        entry = self._entries.get(entry_key)
+        if entry is None:
+            with self._lock:
+                self.misses[stat_key] += 1
+            raise ReplayMiss(entry_key)
+        if "error" in entry:
+            raise ReplayError(entry["error"])
+        return entry["data"]
+
+    def _record(self, entry_key, entry):
+        with self._lock:
+            # Yeniden kayıtta başarısız bir çağrı (örn. ağ yok) kayıtlı cevabı ezmez
+            if "error" in entry and "data" in self._entries.get(entry_key, {}):
+                return
+            self._entries[entry_key] = entry
+            self._dirty = True
+
+    def call(self, kind, key, live_fn):
+        """
+        Runs `live_fn` (live/record) or returns the recorded value (replay).
+        The recorded value must be JSON serializable.
+        """
+        stat_key, entry_key = self._begin(kind, key)
+        delay = self._delay_seconds()
+        if delay:
+            time.sleep(delay)
+
+        if self.mode == "replay":
+            return self._replay(stat_key, entry_key)
+        if self.mode == "live":
+            return self._timed(stat_key, live_fn)
+        try:
+            data = self._timed(stat_key, live_fn)
+        except Exception as e:
+            if not _unreachable(e):
+                self._record(entry_key, {"error": str(e)})
+            raise
+        self._record(entry_key, {"data": data})
+        return data
+
+    async def call_async(self, kind, key, live_coro_fn):
+        """
+        Async counterpart of call(): `live_coro_fn()` returns an awaitable and
+        the artificial latency is applied with asyncio.sleep.
+        """
+        stat_key, entry_key = self._begin(kind, key)
+        delay = self._delay_seconds()
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.mode == "replay":
+            return self._replay(stat_key, entry_key)
+        if self.mode == "live":
+            return await self._timed_async(stat_key, live_coro_fn)
+        try:
+            data = await self._timed_async(stat_key, live_coro_fn)
+        except Exception as e:
+            if not _unreachable(e):
+                self._record(entry_key, {"error": str(e)})
+            raise
+        self._record(entry_key, {"data": data})
+        return data
+
+    def get(self, url, params=None, headers=None, timeout=10, session=None):
+        """
+        requests.get replacement used by the logo downloaders. Live mode
+        returns the real requests.Response. `session` (requests.Session)
+        reuses pooled connections across calls.
+        """
+        client = session or requests
+        if self.mode == "live":
+            stat_key, _ = self._begin("http", url)
+            delay = self._delay_seconds()
+            if delay:
+                time.sleep(delay)
+            return self._timed(stat_key, lambda: client.get(url, params=params, headers=headers, timeout=timeout))
+
+        key = normalize_url(url, params)
+
+        def live():
+            res = client.get(url, params=params, headers=headers, timeout=timeout)
+            return {
+                "status": res.status_code,
+                "headers": {"Content-Type": res.headers.get("Content-Type", "")},
+                "body_b64": base64.b64encode(res.content).decode("ascii"),
+            }
+
+        data = self.call("http", key, live)
+        return ReplayResponse(data["status"], base64.b64decode(data["body_b64"]), data.get("headers"), key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "calls": sum(self.calls.values()),
+                "misses": sum(self.misses.values()),
+                "by_host": {f"{kind}:{host}": n for (kind, host), n in sorted(self.calls.items())},
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.calls.clear()
+            self.misses.clear()
+
+    def save(self):
+        if self.mode != "record" or not self._dirty:
+            return
+        with self._lock:
+            entries = dict(self._entries)
+            self._dirty = False
+        save_json_atomic(self.path, {"version": 1, **self._meta, "entries": entries})
+
+_session = None
+
+def configure(mode=None, path=None, latency_ms=None, jitter_ms=None):
+    """
+    Replaces the process-wide replay session (benchmarks call this before
+    running the pipeline). Unset arguments fall back to the environment.
+    """
+    global _session
+    if _session is not None:
+        _session.save()
+    _session = HttpReplay(
+        mode=mode or os.getenv("MACBOT_HTTP_MODE", "live"),
+        path=path or os.getenv("MACBOT_HTTP_CASSETTE") or None,
+        latency_ms=float(os.getenv("MACBOT_HTTP_LATENCY_MS", "0")) if latency_ms is None else latency_ms,
+        jitter_ms=float(os.getenv("MACBOT_HTTP_JITTER_MS", "0")) if jitter_ms is None else jitter_ms,
+    )
+    return _session
+
+def session():
+    """
+    Returns the process-wide replay session, configured from the environment on first use.
+    """
+    if _session is None:
+        return configure()
+    return _session
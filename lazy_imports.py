@@ -0,0 +1,75 @@
+import sys
+import time
+import importlib
+import threading
+
+# Ağır / opsiyonel bağımlılıklar için modül seviyesinde tembel import.
+# `genai = lazy("google.generativeai", optional=True)` modülü ilk öznitelik
+# erişiminde (veya `if not genai:` kontrolünde) yükler; backend ve CLI açılışı
+# bu paketleri hiç kullanmıyorsa onların import maliyetini ödemez.
+
+_load_times = {}      # modül adı -> yükleme süresi (sn)
+_lock = threading.RLock()
+
+class LazyModule:
+    def __init__(self, name, optional=False):
+        self.__dict__["_name"] = name
+        self.__dict__["_optional"] = optional
+        self.__dict__["_module"] = None
+        self.__dict__["_failed"] = False
+
+    def _load(self):
+        module = self.__dict__["_module"]
+        if module is not None or self.__dict__["_failed"]:
+            return module
+        with _lock:
+            if self.__dict__["_module"] is None and not self.__dict__["_failed"]:
+                name = self._name
+                start = time.perf_counter()
+                try:
+                    module = importlib.import_module(name)
+                except ImportError:
+                    if not self._optional:
+                        raise
+                    self.__dict__["_failed"] = True
+                    return None
+                _load_times[name] = time.perf_counter() - start
+                self.__dict__["_module"] = module
+        return self.__dict__["_module"]
+
+    def __getattr__(self, attr):
+        module = self._load()
+        if module is None:
+            raise ImportError(f"Opsiyonel paket yüklü değil: {self._name}")
+        return getattr(module, attr)
+
+    def __setattr__(self, attr, value):
+        # Testler / benchmark'lar öznitelik yamalayabilsin (gerçek modüle yazılır)
+        setattr(self._load(), attr, value)
+
+    def __bool__(self):
+        return self._load() is not None
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+def lazy(name, optional=False):
+    """
+    Returns a proxy that imports `name` on first use. With optional=True a
+    missing package makes the proxy falsy instead of raising at import.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name, optional)
+
+def is_loaded(name):
+    return name in sys.modules
+
+def load_times():
+    """
+    Seconds spent importing each lazily loaded module so far.
+    """
+    with _lock:
+        return {name: round(seconds, 4) for name, seconds in _load_times.items()}
@@ -0,0 +1,51 @@
+import os
+
+from local_store import BASE_DIR, load_json
+
+# Arayüzdeki "yaklaşan maçlar" listesi için lig kataloğu. Varsayılan liste aşağıda;
+# leagues.json (veya MACBOT_LEAGUES ile verilen dosya) varsa onun yerine kullanılır.
+# Örnek kayıt: {"id": "4387", "name": "NBA", "sport": "Basketball", "take": 5, "timeout": 8}
+LEAGUES_PATH = os.getenv("MACBOT_LEAGUES") or os.path.join(BASE_DIR, "leagues.json")
+
+DEFAULT_TAKE = 5             # lig başına listelenecek maç sayısı
+DEFAULT_TIMEOUT = 8.0        # lig başına istek süresi (sn); aşılırsa önbellekteki maçlar kullanılır
+
+DEFAULT_LEAGUES = [
+    {"id": "4351", "name": "Turkish Super Lig", "sport": "Soccer"},
+    {"id": "4328", "name": "English Premier League", "sport": "Soccer"},
+    {"id": "4335", "name": "Spanish La Liga", "sport": "Soccer"},
+    {"id": "4332", "name": "Italian Serie A", "sport": "Soccer"},
+    {"id": "4331", "name": "German Bundesliga", "sport": "Soccer"},
+    {"id": "4334", "name": "French Ligue 1", "sport": "Soccer"},
+    {"id": "4480", "name": "UEFA Champions League", "sport": "Soccer"},
+    {"id": "4337", "name": "Dutch Eredivisie", "sport": "Soccer"},
+    {"id": "4344", "name": "Portuguese Primeira Liga", "sport": "Soccer"},
+    {"id": "4387", "name": "NBA", "sport": "Basketball"},
+    {"id": "4546", "name": "EuroLeague Basketball", "sport": "Basketball"},
+]
+
+def _normalize(entry):
+    league = {"take": DEFAULT_TAKE, "timeout": DEFAULT_TIMEOUT, "sport": "Soccer", "enabled": True, **entry}
+    league["id"] = str(league["id"])
+    league["take"] = int(league["take"])
+    league["timeout"] = float(league["timeout"])
+    return league
+
+def load_leagues(path=None):
+    """
+    Returns the enabled leagues of the catalogue file, or the defaults when
+    the file is missing or unreadable. The file may be a list of leagues or
+    {"leagues": [...]}.
+    """
+    data = load_json(path or LEAGUES_PATH)
+    if isinstance(data, dict):
+        data = data.get("leagues")
+    entries = data if isinstance(data, list) and data else DEFAULT_LEAGUES
+    leagues = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not entry.get("id"):
+            continue
+        league = _normalize(entry)
+        if league["enabled"]:
+            leagues.append(league)
+    return leagues
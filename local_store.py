@@ -0,0 +1,44 @@
+import os
+import json
+import tempfile
+
+# Yerel önbellek dosyaları (fikstür deposu vb.) bu klasörde tutulur; MACBOT_CACHE_DIR
+# ile başka bir klasöre yönlendirilebilir (örn. benchmark'lar geçici klasör kullanır).
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.getenv("MACBOT_CACHE_DIR") or os.path.join(BASE_DIR, "cache")
+
+def cache_path(filename):
+    """
+    Returns the absolute path of a file inside the shared cache directory.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    return os.path.join(CACHE_DIR, filename)
+
+def load_json(path, default=None):
+    """
+    Reads a JSON file. Missing or corrupt files return `default`.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+def save_json_atomic(path, data):
+    """
+    Writes JSON via a temp file + os.replace so that the CLI and the backend
+    never see a half-written file.
+    """
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
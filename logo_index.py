@@ -0,0 +1,295 @@
+import os
+import time
+import hashlib
+import threading
+
+from fixture_store import normalize_team_name
+from lazy_imports import lazy
+from local_store import cache_path, load_json, save_json_atomic
+
+# logos/ klasörünün kalıcı indeksi: yerel logo araması dosya sistemi taraması yerine
+# sözlük araması olur. Klasör değişiklikleri mtime yoklamasıyla (veya watchdog
+# yüklüyse dosya sistemi olaylarıyla) artımlı olarak indekse işlenir.
+watchdog_observers = lazy("watchdog.observers", optional=True)
+
+LOGO_EXTENSIONS = (".png", ".webp")
+MIN_LOCAL_BYTES = 100        # bundan küçük dosyalar bozuk sayılır ve eşleşmez
+POLL_INTERVAL = 2.0          # klasör mtime'ı en fazla bu sıklıkla kontrol edilir (sn)
+MIN_WORD_LENGTH = 4          # bulanık eşleşmede önce denenen kelimelerin asgari uzunluğu
+SHORT_WORD_LENGTH = 3        # kısaltmalar (PSG, AEK) ikinci aşamada bu uzunluktan itibaren
+PREFIX_LENGTH = 5            # bitişik yazımlar (galatasaraysk) boşluksuz anahtarın başıyla bulunur
+
+_SAFE_NAME = str.maketrans({
+    'ı': 'i', 'İ': 'I', 'ş': 's', 'Ş': 'S',
+    'ç': 'c', 'Ç': 'C', 'ğ': 'g', 'Ğ': 'G',
+    'ü': 'u', 'Ü': 'U', 'ö': 'o', 'Ö': 'O',
+    ' ': '_'
+})
+
+def safe_filename(name):
+    return name.translate(_SAFE_NAME).lower()
+
+def index_path_for(logos_dir):
+    digest = hashlib.sha1(os.path.abspath(logos_dir).encode("utf-8")).hexdigest()[:10]
+    return cache_path(f"logo_index_{digest}.json")
+
+def name_key(filename):
+    """
+    Normalized team key of a logo filename ("Galatasaray_SK.svg.png" ->
+    "galatasaray").
+    """
+    base_name = filename.rsplit(".", 1)[0]
+    if base_name.lower().endswith(".svg"):
+        base_name = base_name.rsplit(".", 1)[0]
+    return normalize_team_name(base_name)
+
+def _significant_words(key):
+    return [w for w in key.split() if len(w) >= MIN_WORD_LENGTH]
+
+def _indexed_words(key):
+    return [w for w in key.split() if len(w) >= SHORT_WORD_LENGTH]
+
+def _compact_prefix(key):
+    return key.replace(" ", "")[:PREFIX_LENGTH]
+
+def _containing(compact, filenames):
+    # Boşluksuz anahtarı takımınkini içeren (veya onun içinde geçen) dosyalar
+    for filename in filenames:
+        f_compact = name_key(filename).replace(" ", "")
+        if f_compact and (compact in f_compact or f_compact in compact):
+            yield filename
+
+def _preference(filename):
+    # Aynı anahtara birden fazla dosya düşerse PNG (dönüşümsüz) ve kısa isim önce
+    return (not filename.lower().endswith(".png"), len(filename), filename)
+
+class LogoIndex:
+    """
+    In-memory index of a logos directory, persisted to cache/.
+
+    files   : filename -> {"size", "mtime_ns"}
+    keys    : normalized name -> {filename}
+    words   : word of a key (3+ characters) -> {filename}
+    prefixes: first PREFIX_LENGTH characters of a key without spaces -> {filename}
+    aliases : normalized team name -> filename (öğrenilmiş eşleşmeler)
+    """
+
+    def __init__(self, logos_dir, path=None):
+        self.logos_dir = logos_dir
+        self.path = path or index_path_for(logos_dir)
+        self.files = {}
+        self.keys = {}
+        self.words = {}
+        self.prefixes = {}
+        self.aliases = {}
+        self._dir_mtime_ns = None
+        self._last_check = 0.0
+        self._observer = None
+        self._dirty = False
+        self._lock = threading.RLock()
+        self._load()
+
+    # --- Kalıcılık ---
+    def _load(self):
+        data = load_json(self.path, default={}) or {}
+        if data.get("dir") != os.path.abspath(self.logos_dir):
+            return
+        for filename, meta in data.get("files", {}).items():
+            self._add(filename, meta)
+        self.aliases = data.get("aliases", {})
+        self._dir_mtime_ns = data.get("dir_mtime_ns")
+
+    def save(self):
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {
+                "dir": os.path.abspath(self.logos_dir),
+                "dir_mtime_ns": self._dir_mtime_ns,
+                "files": dict(self.files),
+                "aliases": dict(self.aliases),
+            }
+            self._dirty = False
+        try:
+            save_json_atomic(self.path, data)
+        except OSError as e:
+            print(f"⚠️ Logo indeksi kaydedilemedi: {e}")
+
+    # --- İndeksleme ---
+    def _add(self, filename, meta):
+        self._remove(filename)
+        self.files[filename] = meta
+        key = name_key(filename)
+        if not key:
+            return
+        self.keys.setdefault(key, set()).add(filename)
+        for word in _indexed_words(key):
+            self.words.setdefault(word, set()).add(filename)
+        self.prefixes.setdefault(_compact_prefix(key), set()).add(filename)
+
+    def _remove(self, filename):
+        if self.files.pop(filename, None) is None:
+            return
+        key = name_key(filename)
+        self.keys.get(key, set()).discard(filename)
+        for word in _indexed_words(key):
+            self.words.get(word, set()).discard(filename)
+        self.prefixes.get(_compact_prefix(key), set()).discard(filename)
+
+    def touch(self, filename):
+        """
+        Re-reads one file's metadata (after a download or conversion wrote
+        it) without rescanning the directory.
+        """
+        if not filename.lower().endswith(LOGO_EXTENSIONS):
+            return
+        try:
+            st = os.stat(os.path.join(self.logos_dir, filename))
+        except OSError:
+            with self._lock:
+                if filename in self.files:
+                    self._remove(filename)
+                    self._dirty = True
+            return
+        meta = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        with self._lock:
+            if self.files.get(filename) != meta:
+                self._add(filename, meta)
+                self._dirty = True
+
+    def refresh(self, force=False):
+        """
+        Applies directory changes incrementally. The directory is only
+        rescanned when its mtime moved, and only new, changed or removed
+        entries touch the index.
+        """
+        now = time.monotonic()
+        if self._observer is not None and not force:
+            return
+        if not force and now - self._last_check < POLL_INTERVAL:
+            return
+        self._last_check = now
+        try:
+            dir_mtime_ns = os.stat(self.logos_dir).st_mtime_ns
+        except OSError:
+            return
+        if dir_mtime_ns == self._dir_mtime_ns and not force:
+            return
+
+        seen = {}
+        with os.scandir(self.logos_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(LOGO_EXTENSIONS) or not entry.is_file():
+                    continue
+                st = entry.stat()
+                seen[entry.name] = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        with self._lock:
+            for filename in [f for f in self.files if f not in seen]:
+                self._remove(filename)
+                self._dirty = True
+            for filename, meta in seen.items():
+                if self.files.get(filename) != meta:
+                    self._add(filename, meta)
+                    self._dirty = True
+            if self._dir_mtime_ns != dir_mtime_ns:
+                self._dir_mtime_ns = dir_mtime_ns
+                self._dirty = True
+        self.save()
+
+    def watch(self):
+        """
+        Switches from mtime polling to filesystem events when watchdog is
+        installed. Returns True if a watcher is running.
+        """
+        if self._observer is not None:
+            return True
+        if not watchdog_observers:
+            return False
+        from watchdog.events import FileSystemEventHandler
+
+        index = self
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                for path in (event.src_path, getattr(event, "dest_path", None)):
+                    if path:
+                        index.touch(os.path.basename(path))
+
+        self.refresh(force=True)
+        observer = watchdog_observers.Observer()
+        observer.schedule(_Handler(), self.logos_dir, recursive=False)
+        observer.daemon = True
+        observer.start()
+        self._observer = observer
+        return True
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+        self.save()
+
+    # --- Sorgular ---
+    def _best(self, filenames):
+        usable = [f for f in filenames if self.files.get(f, {}).get("size", 0) > MIN_LOCAL_BYTES]
+        return min(usable, key=_preference) if usable else None
+
+    def lookup(self, team_name):
+        """
+        Returns (filename, mode) for the best local logo of a team, or
+        (None, None). Exact key and learned aliases first, then files that
+        share a significant word and whose key contains (or is contained
+        in) the team's key; if none do, the same test on files sharing a
+        short word or the first PREFIX_LENGTH characters of the key.
+        """
+        self.refresh()
+        key = normalize_team_name(team_name)
+        if not key:
+            return None, None
+        with self._lock:
+            alias = self.aliases.get(key)
+            if alias and self._best([alias]):
+                return alias, "Tam"
+            exact = self._best(self.keys.get(key, ()))
+            if exact:
+                return exact, "Tam"
+
+            compact = key.replace(" ", "")
+            candidates = set()
+            for word in _significant_words(key):
+                candidates |= self.words.get(word, set())
+            fuzzy = self._best(_containing(compact, candidates))
+            if not fuzzy:
+                # Kısa adlar ("PSG", "AEK") kısa kelime indeksinden, bitişik yazımlar
+                # ("galatasaraysk") boşluksuz anahtarın önekinden bulunur
+                candidates = set(self.prefixes.get(compact[:PREFIX_LENGTH], ()))
+                for word in _indexed_words(key):
+                    if len(word) < MIN_WORD_LENGTH:
+                        candidates |= self.words.get(word, set())
+                fuzzy = self._best(_containing(compact, candidates))
+        if fuzzy:
+            return fuzzy, f"Bulanık ({fuzzy})"
+        return None, None
+
+    def add_alias(self, team_name, filename):
+        """
+        Remembers that `team_name` resolved to `filename`, so the next
+        lookup for that spelling is an exact hit.
+        """
+        key = normalize_team_name(team_name)
+        if not key or name_key(filename) == key:
+            return
+        with self._lock:
+            if self.aliases.get(key) != filename:
+                self.aliases[key] = filename
+                self._dirty = True
+
+    def stats(self):
+        return {
+            "files": len(self.files),
+            "keys": sum(1 for v in self.keys.values() if v),
+            "aliases": len(self.aliases),
+            "watching": self._observer is not None,
+        }
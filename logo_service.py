@@ -0,0 +1,415 @@
+import os
+import re
+import threading
+import contextvars
+from io import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+
+import asset_store
+import http_replay
+import metrics
+import rate_limiter
+import sports_cli
+import tracer
+from lazy_imports import lazy
+from logo_index import LogoIndex, safe_filename
+from singleflight import SingleFlight
+
+# Uzun ömürlü logo servisi: paylaşılan HTTP oturumu, logos/ klasörünün bellek içi
+# indeksi ve işlenmiş (transparan + kırpılmış) görsel önbelleği çağrılar arasında korunur.
+Image = lazy("PIL.Image")
+ImageDraw = lazy("PIL.ImageDraw")
+requests = lazy("requests")
+
+LOGO_FLIGHT = SingleFlight("logo_http")
+
+MIN_EXISTING_BYTES = 1000     # bundan küçük mevcut dosya bozuk sayılır
+BATCH_WORKERS = 4
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36'
+}
+
+class LogoService:
+    """
+    Resolves team logos into `logos_dir`, in priority order: API URL,
+    existing file, local folder (exact / fuzzy), TheSportsDB, Wikimedia,
+    TR Wikipedia, DuckDuckGo images, and finally a red placeholder.
+    """
+
+    def __init__(self, logos_dir):
+        self.logos_dir = logos_dir
+        os.makedirs(logos_dir, exist_ok=True)
+        self._session = None
+        self._lock = threading.Lock()
+        self.index = LogoIndex(logos_dir)
+        self._processed = {}        # yol -> (mtime, boyut): zaten işlenmiş görsel
+        self.stats = {"resolved": 0, "local": 0, "downloaded": 0, "placeholder": 0, "reprocess_skipped": 0}
+
+    # --- HTTP -----------------------------------------------------------------
+    @property
+    def session(self):
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = requests.Session()
+        return self._session
+
+    def http_get(self, url, params=None, headers=None, timeout=10):
+        # Aynı anda aynı URL'yi isteyen render'lar tek indirmeyi paylaşır
+        key = http_replay.normalize_url(url, params)
+        http = http_replay.session()
+        return LOGO_FLIGHT.do_sync(
+            key, lambda: http.get(url, params=params, headers=headers, timeout=timeout, session=self.session)
+        )
+
+    def _save_response(self, res, output_path):
+        with open(output_path, 'wb') as f:
+            f.write(res.content)
+
+    # --- görsel işleme --------------------------------------------------------
+    def _signature(self, path):
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def resize_and_mask_logo(self, image_path, size=177):
+        """Logoyu işle: Beyaz arka planı temizle, transparan yap, kırp ve kaydet"""
+        sig = self._signature(image_path)
+        if sig is not None and self._processed.get(image_path) == sig:
+            self.stats["reprocess_skipped"] += 1
+            return True
+        try:
+            with tracer.span("image_process"):
+                img = Image.open(image_path).convert("RGBA")
+
+                # Beyaz arka plan temizleme (Basit threshold)
+                datas = img.getdata()
+
+                # İlk piksel beyaz mı? Kontrol et (Basit heuristic)
+                first_pixel = datas[0]
+                if first_pixel[0] > 240 and first_pixel[1] > 240 and first_pixel[2] > 240:
+                    # Beyaza yakın pikselleri transparan yap (Threshold: 240)
+                    img.putdata([
+                        (255, 255, 255, 0) if item[0] > 240 and item[1] > 240 and item[2] > 240 else item
+                        for item in datas
+                    ])
+
+                # 1. Transparan boşlukları kırp (Trim)
+                bbox = img.split()[-1].getbbox()
+                if bbox:
+                    img = img.crop(bbox)
+
+                # 2. Devasa boyutları engelle
+                if img.width > 500 or img.height > 500:
+                    img.thumbnail((500, 500), Image.Resampling.LANCZOS)
+
+                img.save(image_path, 'PNG')
+                self._processed[image_path] = self._signature(image_path)
+                return True
+        except Exception as e:
+            print(f"⚠️ Logo işleme hatası: {e}")
+            return False
+
+    def _convert_local(self, source_path, dest_path):
+        try:
+            # Eğer kaynak webp ise veya farklıysa açıp png olarak kaydet
+            img = Image.open(source_path).convert("RGBA")
+            img.save(dest_path, "PNG")
+            self.resize_and_mask_logo(dest_path)
+            return True
+        except Exception as e:
+            print(f"⚠️ Dönüştürme hatası ({source_path}): {e}")
+            return False
+
+    def get_local_logo(self, team_name, target_path):
+        """Yerel klasörde logo ara (Tam ve Bulanık) - PNG ve WEBP destekli"""
+        filename, mode = self.index.lookup(team_name)
+        if not filename:
+            return False, None
+        self.index.add_alias(team_name, filename)
+        source_path = os.path.join(self.logos_dir, filename)
+        if source_path == target_path:
+            return self.resize_and_mask_logo(target_path), mode
+        if self._convert_local(source_path, target_path):
+            return True, mode
+        return False, None
+
+    # --- uzak kaynaklar -------------------------------------------------------
+    def download_from_url(self, url, path, name):
+        try:
+            res = self.http_get(url, timeout=10)
+            if res.status_code == 200:
+                self._save_response(res, path)
+                self.resize_and_mask_logo(path)
+                print(f"✅ Logo URL'den indirildi: {name}")
+                return True
+        except Exception:
+            pass
+        return False
+
+    def search_wikimedia_logo(self, team_name, output_path):
+        """Wikimedia Commons üzerinden logo ara ve indir"""
+        try:
+            url = "https://commons.wikimedia.org/w/api.php"
+            params = {
+                "action": "query", "format": "json", "generator": "search",
+                "gsrnamespace": "6", "gsrsearch": f"{team_name} logo filetype:png",
+                "gsrlimit": 1, "prop": "imageinfo", "iiprop": "url"
+            }
+            headers = {'User-Agent': 'MacBot/1.0'}
+            data = self.http_get(url, params=params, headers=headers, timeout=10).json()
+            pages = data.get("query", {}).get("pages", {})
+            for page in pages.values():
+                image_info = page.get("imageinfo", [])
+                image_url = image_info[0].get("url") if image_info else None
+                if image_url:
+                    img_res = self.http_get(image_url, headers=headers, timeout=10)
+                    if img_res.status_code == 200:
+                        self._save_response(img_res, output_path)
+                        print(f"✅ Logo Wikimedia'dan indirildi: {team_name}")
+                        return True
+            return False
+        except Exception:
+            return False
+
+    def download_team_logo(self, team_name, output_path):
+        """TheSportsDB API üzerinden logo indir"""
+        try:
+            search_url = f"https://www.thesportsdb.com/api/v1/json/3/searchteams.php?t={team_name}"
+            response = self.http_get(search_url, timeout=10)
+            if response.status_code == 200:
+                data = response.json()
+                if data.get('teams'):
+                    logo_url = data['teams'][0].get('strBadge') or data['teams'][0].get('strTeamBadge')
+                    if logo_url:
+                        logo_res = self.http_get(logo_url, timeout=10)
+                        if logo_res.status_code == 200:
+                            self._save_response(logo_res, output_path)
+                            print(f"✅ Logo API'den indirildi: {team_name}")
+                            return True
+            return False
+        except Exception:
+            return False
+
+    def search_tr_wikipedia_logo(self, team_name, output_path):
+        """Wikipedia (TR) üzerinden logo ara"""
+        try:
+            url = f"https://tr.wikipedia.org/wiki/{team_name.replace(' ', '_')}"
+            headers = {'User-Agent': 'Mozilla/5.0'}
+            res = self.http_get(url, headers=headers, timeout=10)
+            if res.status_code == 200:
+                img_match = re.search(r'<img[^>]+src="([^"]+\.(?:png|svg|jpg|jpeg))"', res.text, re.IGNORECASE)
+                if img_match:
+                    img_url = img_match.group(1)
+                    if img_url.startswith("//"): img_url = "https:" + img_url
+                    img_res = self.http_get(img_url, headers=headers, timeout=10)
+                    if img_res.status_code == 200:
+                        self._save_response(img_res, output_path)
+                        print(f"✅ Logo Wikipedia'dan indirildi: {team_name}")
+                        return True
+            return False
+        except Exception:
+            return False
+
+    def aggressive_image_search(self, team_name, save_path):
+        """
+        Placeholder yerine interneti didik didik edip logo bulur.
+        "Sike sike o görsel bulunacak" modudur.
+        """
+        print(f"🕵️‍♂️ '{team_name}' logosu için derin arama başlatılıyor...")
+
+        # 1. Önce Wikipedia/Wikimedia Tekrar Deneyelim (Farklı Varyasyonlarla)
+        # Bazen "FC" eklemek veya çıkarmak işe yarar
+        variations = [team_name, team_name + " FC", team_name.replace(" FC", "").replace("SK", "").strip()]
+        for v in variations:
+            if self.search_wikimedia_logo(v, save_path): return True
+
+        # 2. DuckDuckGo (DDGS)
+        try:
+            from duckduckgo_search import DDGS
+        except ImportError:
+            print("⚠️ DuckDuckGo modülü yüklenemedi.")
+            return False
+
+        # Sorgular arası bekleme sabit sleep yerine host limiter'ı ile yapılır
+        ddg_limiter = rate_limiter.for_host("duckduckgo.com")
+        http = http_replay.session()
+
+        queries = [
+            f"{team_name} logo png transparent",
+            f"{team_name} football club logo",
+            f"{team_name} crest png",
+            f"{team_name} logo",
+            f"{team_name} arması"
+        ]
+
+        try:
+            with DDGS() as ddgs:
+                for q in queries:
+                    print(f"   🔎 Deneniyor: '{q}'")
+                    try:
+                        # DDG Images search
+                        key = f"duckduckgo.com|images|3|{q}"
+                        ddg_limiter.acquire_sync()
+                        results = http.call("ddg", key, lambda: list(ddgs.images(q, max_results=3)))
+                        ddg_limiter.report(200)
+
+                        for r in results:
+                            img_url = r.get('image')
+                            if not img_url: continue
+                            try:
+                                res = self.http_get(img_url, headers=BROWSER_HEADERS, timeout=5)
+                                if res.status_code == 200:
+                                    Image.open(BytesIO(res.content)).verify()
+                                    self._save_response(res, save_path)
+                                    print(f"✅ BULUNDU (Deep Search): {team_name} -> {img_url}")
+                                    self.resize_and_mask_logo(save_path)
+                                    return True
+                            except Exception:
+                                continue
+
+                    except Exception as e:
+                        # 403/Ratelimit: limiter hızı düşürür ve geri çekilir, sonraki sorgu bekler
+                        ddg_limiter.report_error(e)
+                        if rate_limiter.status_from_error(e) in rate_limiter.THROTTLE_STATUSES:
+                            print("⚠️ DuckDuckGo Rate Limit! (Biraz bekleniyor...)")
+                            continue
+                        print(f"⚠️ Arama hatası ({q}): {e}")
+
+        except Exception as e:
+            print(f"⚠️ Derin arama başlatılamadı: {e}")
+
+        print(f"❌ '{team_name}' için internette bile düzgün logo bulunamadı!")
+        return False
+
+    def _placeholder(self, team_name, path):
+        print(f"💀 KRİTİK: {team_name} logosu hiçbir yerde yok. Acil durum görseli oluşturuluyor.")
+        img = Image.new('RGBA', (500, 500), color=(255, 0, 0, 255))
+        d = ImageDraw.Draw(img)
+        d.text((50, 250), f"{team_name}\nLOGO BULUNAMADI", fill=(255, 255, 255))
+        img.save(path, "PNG")
+
+    # --- çözümleme ------------------------------------------------------------
+    def path_for(self, team_name):
+        return os.path.join(self.logos_dir, f"{safe_filename(team_name)}.png")
+
+    def resolve(self, team_name, url=None):
+        """
+        Returns the path of a processed logo for one team, trying every
+        source in priority order (see class docstring).
+        """
+        with tracer.span("logo_resolve", team=team_name):
+            path = self._resolve(team_name, url)
+        # Yazılan dosya klasör taranmadan indekse işlenir
+        filename = os.path.basename(path)
+        self.index.touch(filename)
+        self.index.save()
+        # İşlenmiş logo içerik adresli depoya da yazılır (aynı logo tek blob)
+        asset_store.get_store().put_file(path, f"logos/{filename}")
+        return path
+
+    def _attempt(self, source, func, *args):
+        # Her kaynak denemesi ayrı span: hangi kaynağın ne kadar sürdüğü ve tuttuğu görülür
+        with tracer.span(f"logo.{source}") as span:
+            span["ok"] = bool(func(*args))
+        return self._count(source, span["ok"])
+
+    def _count(self, source, ok):
+        metrics.LOGO_SOURCE_TOTAL.labels(source, "hit" if ok else "miss").inc()
+        return ok
+
+    def _resolve(self, team_name, url):
+        path = self.path_for(team_name)
+        self.stats["resolved"] += 1
+
+        # 1. Öncelik: API URL'si (Varsa ve çalışırsa kesinlikle bunu kullan)
+        if url:
+            print(f"⬇️  API'den logo indiriliyor: {team_name}")
+            if self._attempt("api_url", self.download_from_url, url, path, team_name):
+                self.stats["downloaded"] += 1
+                return path
+
+        # 2. Öncelik: Yerel Dosya (Sadece API başarısızsa veya URL yoksa)
+        if os.path.exists(path) and os.path.getsize(path) > MIN_EXISTING_BYTES:
+            print(f"✅ Logo zaten mevcut: {team_name}")
+            self._attempt("existing", self.resize_and_mask_logo, path)
+            self.stats["local"] += 1
+            return path
+
+        with tracer.span("logo.local") as span:
+            found, mode = self.get_local_logo(team_name, path)
+            span["ok"] = self._count("local", bool(found))
+        if found:
+            print(f"✅ Logo yerel klasörden bulundu ({mode}): {team_name}")
+            self.stats["local"] += 1
+            return path
+
+        # 3. Uzak kaynaklar
+        if (self._attempt("thesportsdb", self.download_team_logo, team_name, path)
+                or self._attempt("wikimedia", self.search_wikimedia_logo, team_name, path)
+                or self._attempt("tr_wikipedia", self.search_tr_wikipedia_logo, team_name, path)):
+            self.stats["downloaded"] += 1
+            return path
+        try:
+            with tracer.span("logo.sports_cli") as span:
+                cli_url = sports_cli.get_team_logo_url(team_name)
+                span["ok"] = self._count("sports_cli", bool(cli_url and self.download_from_url(cli_url, path, team_name)))
+            if span["ok"]:
+                self.stats["downloaded"] += 1
+                return path
+        except Exception:
+            pass
+
+        # Placeholder YOK! Aggressive Search VAR!
+        if self._attempt("image_search", self.aggressive_image_search, team_name, path):
+            self.stats["downloaded"] += 1
+            return path
+        with tracer.span("logo.placeholder"):
+            self._placeholder(team_name, path)
+        self._count("placeholder", True)
+        self.stats["placeholder"] += 1
+        return path
+
+    def resolve_pair(self, team1, team2, url1=None, url2=None):
+        return self.resolve(team1, url1), self.resolve(team2, url2)
+
+    def resolve_many(self, teams, workers=BATCH_WORKERS):
+        """
+        Resolves logos for a whole match list at once. `teams` is an
+        iterable of team names or (team_name, url) tuples; teams that map
+        to the same file are resolved once. Returns {team_name: path}.
+        """
+        urls = {}
+        names_by_file = {}
+        for item in teams:
+            name, url = (item, None) if isinstance(item, str) else item
+            key = safe_filename(name)
+            names_by_file.setdefault(key, []).append(name)
+            if url and not urls.get(key):
+                urls[key] = url
+
+        def work(key):
+            return key, self.resolve(names_by_file[key][0], urls.get(key))
+
+        # İş parçacıkları çağıranın context'ini (tracer batch/maç etiketleri) taşısın
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            resolved = dict(pool.map(lambda key: context.copy().run(work, key), names_by_file))
+        return {name: resolved[key] for key, names in names_by_file.items() for name in names}
+
+_services = {}
+_services_lock = threading.Lock()
+
+def get_logo_service(logos_dir):
+    """Process-wide LogoService per logos directory."""
+    logos_dir = os.path.abspath(logos_dir)
+    with _services_lock:
+        service = _services.get(logos_dir)
+        if service is None:
+            service = _services[logos_dir] = LogoService(logos_dir)
+            # watchdog yoksa indeks mtime yoklamasıyla güncel kalır
+            service.index.watch()
+        return service
@@ -0,0 +1,84 @@
+import atexit
+import asyncio
+import threading
+import contextvars
+import concurrent.futures
+
+# Senkron sarmalayıcılar (sports_cli.get_team_info vb.) için kalıcı arka plan olay döngüsü.
+# Her çağrıda asyncio.run ile yeni döngü + thread havuzu kurmak yerine coroutine'ler
+# tek bir daemon thread'deki döngüye gönderilir. Backend'in çalışan döngüsünün
+# içinden (senkron kod yolunda) çağrılmak da böylece mümkün olur.
+
+_loop = None
+_thread = None
+_lock = threading.Lock()
+
+def _serve(loop, ready):
+    asyncio.set_event_loop(loop)
+    loop.call_soon(ready.set)
+    loop.run_forever()
+
+def get_loop():
+    """
+    Returns the background loop, starting its thread on first use.
+    """
+    global _loop, _thread
+    if _loop is None:
+        with _lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(target=_serve, args=(loop, ready), name="loop_runner", daemon=True)
+                thread.start()
+                ready.wait()
+                _loop, _thread = loop, thread
+    return _loop
+
+def in_loop_thread():
+    return _thread is not None and threading.current_thread() is _thread
+
+def run(coro, timeout=None):
+    """
+    Runs `coro` on the background loop and blocks until it finishes. The
+    caller's contextvars (e.g. rate_limiter.priority) carry over. On
+    timeout the task is cancelled and TimeoutError is raised.
+    """
+    if in_loop_thread():
+        coro.close()
+        raise RuntimeError("loop_runner.run() arka plan döngüsünün içinden çağrılamaz; coroutine'i await edin.")
+    loop = get_loop()
+    ctx = contextvars.copy_context()
+    result = concurrent.futures.Future()
+    holder = {}
+
+    def _done(task):
+        if task.cancelled():
+            result.set_exception(concurrent.futures.CancelledError())
+        elif task.exception() is not None:
+            result.set_exception(task.exception())
+        else:
+            result.set_result(task.result())
+
+    def _start():
+        task = loop.create_task(coro, context=ctx)
+        holder["task"] = task
+        task.add_done_callback(_done)
+
+    loop.call_soon_threadsafe(_start)
+    try:
+        return result.result(timeout)
+    except concurrent.futures.TimeoutError:
+        loop.call_soon_threadsafe(lambda: holder.get("task") and holder["task"].cancel())
+        raise
+
+def _shutdown():
+    loop = _loop
+    if loop is None or loop.is_closed():
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(loop.shutdown_default_executor(), loop).result(5)
+    except Exception:
+        pass
+    loop.call_soon_threadsafe(loop.stop)
+
+atexit.register(_shutdown)
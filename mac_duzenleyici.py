@@ -7,11 +7,20 @@ Photoshop ExtendScript'i tetikler.
 """
 
 import os
+import re
+import sys
 import subprocess
 import base64
 import json
+import time
 import datetime
 import sports_cli  # Import the sports CLI module
+import team_registry
+import template_cache
+import profiler
+import text_layout
+import tracer
+from logo_service import get_logo_service
 
 # =============================================================================
 # AYARLAR VE SABİTLER
@@ -34,6 +43,7 @@ DUMMY_PNG_B64 = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8B
 # II. EXTENDSCRIPT (JSX) ŞABLONU
 # =============================================================================
 JSX_TEMPLATE = """
+#targetengine "macbot"
 
 app.displayDialogs = DialogModes.NO; // Disable dialogs for speed
 app.preferences.rulerUnits = Units.PIXELS; // Enforce pixels
@@ -43,12 +53,29 @@ function main() {
     var data = {{DATA_JSON}};
 
     // 1. DOSYA AÇMA
+    // Şablon açık tutulur ve her render kopyası üzerinde çalışır; kalıcı motordaki
+    // (targetengine) özet değiştiyse şablon kapatılıp diskten yeniden açılır.
     var fileRef = new File(data.psdPath);
     if (!fileRef.exists) {
         alert("Hata: PSD dosyası bulunamadı -> " + data.psdPath);
         return;
     }
-    var doc = app.open(fileRef);
+    if (typeof $.global.macbotTemplates === "undefined") $.global.macbotTemplates = {};
+    var template = null;
+    for (var d = 0; d < app.documents.length; d++) {
+        try {
+            if (app.documents[d].fullName.fsName === fileRef.fsName) { template = app.documents[d]; break; }
+        } catch(e) {}
+    }
+    if (template && $.global.macbotTemplates[fileRef.fsName] !== data.templateHash) {
+        template.close(SaveOptions.DONOTSAVECHANGES);
+        template = null;
+    }
+    if (!template) {
+        template = app.open(fileRef);
+        $.global.macbotTemplates[fileRef.fsName] = data.templateHash;
+    }
+    var doc = template.duplicate();
 
     // --- YARDIMCI FONKSİYONLAR ---
     function findLayerByName(root, name) {
@@ -195,6 +222,43 @@ function main() {
         }
     }
 
+    // --- METİN YERLEŞİM ÖNBELLEĞİ ---
+    // Kalıcı motorda (şablon, katman, font, boyut, metin) -> genişlik LRU'su; aynı takım
+    // adı / oran sonraki render'larda yeniden ölçülmez. Şablon özeti ve katman adı anahtarda:
+    // tracking, stil veya paragraf ayarı farklı bir şablon/katman eski genişliği almaz.
+    if (typeof $.global.macbotLayout === "undefined") {
+        $.global.macbotLayout = {};
+        $.global.macbotLayoutOrder = [];
+    }
+
+    function cachedLayout(key, measure) {
+        var cache = $.global.macbotLayout;
+        var order = $.global.macbotLayoutOrder;
+        if (cache.hasOwnProperty(key)) {
+            for (var o = order.length - 1; o >= 0; o--) {
+                if (order[o] === key) { order.splice(o, 1); break; }
+            }
+            order.push(key);
+            return cache[key];
+        }
+        var value = measure();
+        cache[key] = value;
+        order.push(key);
+        while (order.length > data.layoutCacheSize) delete cache[order.shift()];
+        return value;
+    }
+
+    function cachedTextWidth(layer, text) {
+        var key;
+        try {
+            key = "text|" + data.templateHash + "|" + layer.name + "|" + layer.textItem.font + "|" +
+                  layer.textItem.size.as("px") + "|" + text;
+        } catch(e) {
+            return getLayerWidth(layer);
+        }
+        return cachedLayout(key, function() { return getLayerWidth(layer); });
+    }
+
     // --- 2. KATMANLARI GÜNCELLEME ---
     var updateLog = "";
     var textUpdateCount = 0;
@@ -264,15 +328,9 @@ function main() {
                 var mainKey = keys[0];
                 
                 if (mainKey === "1.MacAdi" || mainKey === "2.MacAdi") {
-                     // Basit Kısaltmalar
-                     content = content.replace(/Football Club/gi, "FC")
-                                      .replace(/United/gi, "Utd")
-                                      .replace(/Sporting/gi, "Sp.")
-                                      .replace(/Olympique/gi, "O.")
-                                      .replace(/Saint/gi, "St.")
-                                      .replace(/Borussia/gi, "B.");
-                     // Özel Kısaltmalar (Örnek)
-                     if (content.match(/Paris Saint-Germain/i)) content = "PSG";
+                     // Kısaltmalar Python tarafında (text_layout, önbellekli) hesaplanır
+                     var shortName = (mainKey === "1.MacAdi") ? data.evSahibiKisa : data.deplasmanKisa;
+                     if (shortName) content = shortName;
                      
                      layer.textItem.contents = content;
                      
@@ -282,8 +340,10 @@ function main() {
                          var rectLayer = findLayerByName(doc, rectName) || findLayerByFuzzyName(doc, rectName);
                          if (rectLayer) {
                              // Basitçe metin genişliğine göre scale
-                             var tW = getLayerWidth(layer);
-                             var rW = rectLayer.bounds[2].as("px") - rectLayer.bounds[0].as("px");
+                             var tW = cachedTextWidth(layer, content);
+                             var rW = cachedLayout("rect|" + data.templateHash + "|" + rectName, function() {
+                                 return rectLayer.bounds[2].as("px") - rectLayer.bounds[0].as("px");
+                             });
                              var targetW = tW + 50; 
                              var scaleP = (targetW / rW) * 100;
                              rectLayer.resize(scaleP, 100, AnchorPosition.MIDDLECENTER);
@@ -569,6 +629,297 @@ def get_match_data_from_user(boost_odds=False):
     
     return matches
 
+def parse_match_lines(lines, boost=0.20):
+    """
+    Parses maclar.txt-style text into match dicts. Supports single-line
+    matches ("Ev vs Deplasman 22:30 14 OCAK 1.85 3.20 4.10", 3 or 2 odds,
+    or no odds) and 3-6 line blocks (teams, odds or "yok", optional
+    "Tarih: ..." line). `boost` is added to every odd.
+    """
+    matches = []
+    raw_lines = [line.strip() for line in lines if line.strip()]
+    
+    i = 0
+    while i < len(raw_lines):
+        line = raw_lines[i]
+        found_match = False
+        
+        # 1. Try to parse as single-line match with optional Date/Time
+        separators = [" vs. ", " vs ", " - ", " / ", " VS. ", " VS ", " Vs. ", " Vs ", " v "]
+        for sep in separators:
+            if sep in line:
+                parts = line.split(sep, 1)
+                if len(parts) == 2:
+                    ev_sahibi = parts[0].strip()
+                    remaining = parts[1].strip().split()
+                    
+                    # Akıllı Oran Bulucu (Smart Odds Parser)
+                    # Sondan başa değil, pattern tarayarak bulalım.
+                    # Football: [Float, Float, Float]
+                    # Basketball: [Float, Float]
+                    
+                    odds_found = False
+                    
+                    # Futbol (3 Oran) Tarama
+                    for k in range(len(remaining) - 2):
+                        try:
+                            o1 = float(remaining[k])
+                            ox = float(remaining[k+1])
+                            o2 = float(remaining[k+2])
+                            
+                            # Bulundu!
+                            # Deplasman ismini oluşturmadan önce, oranlardan önceki son kelimeye bak
+                            # Eğer saat formatındaysa (20:00), onu al ve takımdan çıkar.
+                            
+                            pre_odds_tokens = remaining[:k]
+                            dt_from_prev = None
+                            
+                            import re
+                            import re
+                            # Geriye doğru tarama (Backwards scan)
+                            # Oranlardan hemen önceki tokenlar Tarih/Saat olabilir
+                            # Örn: Freiburg 22:30 14 OCAK 1.79...
+                            
+                            found_datetime_parts = []
+                            while pre_odds_tokens:
+                                last_t = pre_odds_tokens[-1]
+                                is_dt = False
+                                
+                                # Saat kontrolü
+                                if re.match(r'^\d{1,2}[:.]\d{2}$', last_t): 
+                                    is_dt = True
+                                
+                                # Ay ismi kontrolü
+                                elif re.search(r'(ocak|şubat|mart|nisan|mayıs|haziran|temmuz|ağustos|eylül|ekim|kasım|aralık|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', last_t.lower()):
+                                    is_dt = True
+                                    
+                                # Gün (sayı) ve Yıl kontrolü
+                                elif last_t.isdigit():
+                                    if len(last_t) == 4 or int(last_t) <= 31:
+                                        is_dt = True
+                                
+                                if is_dt:
+                                    found_datetime_parts.insert(0, pre_odds_tokens.pop())
+                                else:
+                                    # Tarih/Saat değilse, muhtemelen takım isminin son parçasıdır.
+                                    # Ancak bazen "14 OCAK" gibi arada boşluk olunca split ayrı token yapar.
+                                    # Bu döngü contiguous (bitişik) tarih bloğunu alır.
+                                    break
+                                    
+                            dt_from_prev = " ".join(found_datetime_parts) if found_datetime_parts else None
+                            
+                            deplasman = " ".join(pre_odds_tokens)
+                            
+                            # Oranlardan sonra kalan kısım TARİH/SAAT olabilir
+                            dt_from_post = " ".join(remaining[k+3:])
+                            
+                            # Hangisi varsa onu kullan (Öncelik: Explicit yazılan)
+                            final_dt = dt_from_prev if dt_from_prev else (dt_from_post if dt_from_post.strip() else None)
+                            
+                            matches.append({
+                                "ev_sahibi": ev_sahibi,
+                                "deplasman": deplasman,
+                                "oran_1": f"{o1 + boost:.2f}",
+                                "oran_x": f"{ox + boost:.2f}",
+                                "oran_2": f"{o2 + boost:.2f}",
+                                "manual_datetime": final_dt
+                            })
+                            found_match = True
+                            print(f"✅ Eklendi (BOOST +{boost:.2f}): {ev_sahibi} vs {deplasman}" + (f" 🕒 {final_dt}" if final_dt else ""))
+                            odds_found = True
+                            break
+                        except: continue
+                    
+                    if odds_found: break
+
+                    # Basketbol (2 Oran) Tarama
+                    if not odds_found:
+                        for k in range(len(remaining) - 1):
+                            try:
+                                o1 = float(remaining[k])
+                                o2 = float(remaining[k+1])
+                                
+                                # Deplasman ve Saat Ayrıştırma (Önceki kelime kontrolü)
+                                pre_odds_tokens = remaining[:k]
+                                dt_from_prev = None
+                                
+                                import re
+                                if pre_odds_tokens and re.match(r'^\d{1,2}[:.]\d{2}$', pre_odds_tokens[-1]):
+                                    dt_from_prev = pre_odds_tokens.pop()
+                                    dt_from_prev = dt_from_prev.replace(".", ":")
+                                
+                                deplasman = " ".join(pre_odds_tokens)
+                                dt_from_post = " ".join(remaining[k+2:])
+                                
+                                final_dt = dt_from_prev if dt_from_prev else (dt_from_post if dt_from_post.strip() else None)
+                                
+                                matches.append({
+                                    "ev_sahibi": ev_sahibi,
+                                    "deplasman": deplasman,
+                                    "oran_1": f"{o1 + boost:.2f}",
+                                    "oran_x": "",
+                                    "oran_2": f"{o2 + boost:.2f}",
+                                    "manual_datetime": final_dt
+                                })
+                                found_match = True
+                                print(f"🏀 Basketbol Eklendi: {ev_sahibi} vs {deplasman}" + (f" 🕒 {final_dt}" if final_dt else ""))
+                                odds_found = True
+                                break
+                            except: continue
+                    
+                    # C. No Odds (Single Line) Tarama
+                    # Eğer oran bulamadıysak, geri kalan kısmın tamamını Deplasman + Tarih olarak al
+                    # Örnek: Freiburg 22:30 14 OCAK
+                    if not odds_found:
+                        try:
+                            # Sondan başa doğru tarih/saat parçalarını ayıkla
+                            # Basit heuristic: Tarih/Saat formatına uyanları topla
+                            date_tokens = []
+                            team_tokens = list(remaining) # Copy
+                            
+                            while team_tokens:
+                                last_token = team_tokens[-1]
+                                # Basit kontrol: Sayı içeriyor mu veya ay ismi mi?
+                                is_time = ":" in last_token or "." in last_token # 22:30, 22.30
+                                is_date_part = False
+                                
+                                import re
+                                # Ay isimleri kontrolü
+                                months_regex = r'(ocak|şubat|mart|nisan|mayıs|haziran|temmuz|ağustos|eylül|ekim|kasım|aralık|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)'
+                                if re.search(months_regex, last_token.lower()):
+                                    is_date_part = True
+                                elif last_token.isdigit() and int(last_token) < 32: # Gün
+                                    is_date_part = True
+                                elif re.match(r'^\d{4}$', last_token): # Yıl
+                                    is_date_part = True
+                                    
+                                if is_time or is_date_part:
+                                    date_tokens.insert(0, team_tokens.pop())
+                                else:
+                                    break
+                            
+                            if team_tokens: # En az bir kelime takım adı kalmalı
+                                deplasman = " ".join(team_tokens)
+                                manual_dt = " ".join(date_tokens) if date_tokens else None
+                                
+                                matches.append({
+                                    "ev_sahibi": ev_sahibi,
+                                    "deplasman": deplasman,
+                                    "oran_1": "",
+                                    "oran_x": "",
+                                    "oran_2": "",
+                                    "manual_datetime": manual_dt,
+                                    "hide_odds": True
+                                })
+                                found_match = True
+                                print(f"✅ Eklendi (Oransız): {ev_sahibi} vs {deplasman}" + (f" 🕒 {manual_dt}" if manual_dt else ""))
+                                break # Stop looking for separators
+                        except Exception as e:
+                            print(e)
+                            pass
+
+        if found_match:
+            i += 1
+            continue
+            
+        # 2. Try to parse as multi-line block (Standard 5 lines or No Odds 3-5 lines)
+        if i + 2 < len(raw_lines):
+            # A. Check for "No Odds" indicator at line 3 (index i+2)
+            first_odd_line = raw_lines[i+2].lower().strip()
+            if first_odd_line in ["yok", "-", "0", "oran_yok", "no_odds"]:
+                consumed = 3
+                # Dynamically check for 4th and 5th lines being placeholders too
+                # Check line 4
+                if i + 3 < len(raw_lines):
+                    l4 = raw_lines[i+3].lower().strip()
+                    is_placeholder = l4 in ["yok", "-", "0", "oran_yok", "no_odds"]
+                    if is_placeholder:
+                        consumed += 1
+                        # Check line 5 (only if line 4 was placeholder)
+                        if i + 4 < len(raw_lines):
+                            l5 = raw_lines[i+4].lower().strip()
+                            is_placeholder_5 = l5 in ["yok", "-", "0", "oran_yok", "no_odds"]
+                            if is_placeholder_5:
+                                consumed += 1
+                
+                matches.append({
+                    "ev_sahibi": raw_lines[i],
+                    "deplasman": raw_lines[i+1],
+                    "oran_1": "",
+                    "oran_x": "",
+                    "oran_2": "",
+                    "hide_odds": True
+                })
+                print(f"✅ Bloktan Eklendi (Oransız): {raw_lines[i]} vs {raw_lines[i+1]}")
+                # Check for Optional Date/Time line (Tarih: ...)
+                if i + consumed < len(raw_lines):
+                    next_line = raw_lines[i + consumed].strip()
+                    if next_line.lower().startswith(("tarih:", "date:", "saat:", "time:")):
+                        manual_dt = next_line.split(":", 1)[1].strip()
+                        last_match = matches[-1]
+                        last_match["manual_datetime"] = manual_dt
+                        print(f"📅 Manuel Tarih Bulundu: {manual_dt}")
+                        consumed += 1
+                
+                i += consumed
+                continue
+
+            # B. Check for Standard 5 Lines (Floats)
+            if i + 4 < len(raw_lines):
+                try:
+                    o1 = float(raw_lines[i+2])
+                    ox = float(raw_lines[i+3])
+                    o2 = float(raw_lines[i+4])
+                    matches.append({
+                        "ev_sahibi": raw_lines[i],
+                        "deplasman": raw_lines[i+1],
+                        "oran_1": f"{o1 + boost:.2f}",
+                        "oran_x": f"{ox + boost:.2f}",
+                        "oran_2": f"{o2 + boost:.2f}",
+                        "hide_odds": False
+                    })
+                    print(f"✅ Bloktan Eklendi (BOOST +{boost:.2f}): {raw_lines[i]} vs {raw_lines[i+1]}")
+                    
+                    # Check for Optional Date/Time line
+                    if i + 5 < len(raw_lines):
+                        next_line = raw_lines[i+5].strip()
+                        if next_line.lower().startswith(("tarih:", "date:", "saat:", "time:")):
+                            manual_dt = next_line.split(":", 1)[1].strip()
+                            matches[-1]["manual_datetime"] = manual_dt
+                            print(f"📅 Manuel Tarih Bulundu: {manual_dt}")
+                            i += 6
+                        else:
+                            i += 5
+                    else:
+                        i += 5
+                    continue
+                except: pass
+
+            
+        # 3. Try to parse as multi-line block (4 lines: T1, T2, O1, O2 - Basketball)
+        if i + 3 < len(raw_lines):
+            try:
+                o1 = float(raw_lines[i+2])
+                o2 = float(raw_lines[i+3])
+                matches.append({
+                    "ev_sahibi": raw_lines[i],
+                    "deplasman": raw_lines[i+1],
+                    "oran_1": f"{o1 + boost:.2f}",
+                    "oran_x": "",
+                    "oran_2": f"{o2 + boost:.2f}",
+                    "hide_odds": False
+                })
+                print(f"🏀 Bloktan Eklendi (Basketbol): {raw_lines[i]} vs {raw_lines[i+1]}")
+                i += 4
+                continue
+            except: pass
+        
+        # If everything fails
+        print(f"⚠️ Format Hatası (Satır Atlandı veya Blok Geçersiz): {line}")
+        i += 1
+
+    return matches
+
 def get_demo_match_data():
     """A. Giriş Verileri - Demo: 5 örnek maç verisi"""
     return [
@@ -638,10 +989,14 @@ def smart_match_search(team1, team2, api_key):
         # Key tipine göre fonksiyon seç
         if api_key.startswith("sk-"):
             # OpenAI
-            saat, gun = smart_agent.ask_gpt_for_match_time(team1, team2, api_key)
+            gun, saat = smart_agent.ask_gpt_for_match_time(team1, team2, api_key)
         else:
             # Gemini (Varsayılan olarak AIza... ile başlar ama else yeterli)
-            saat, gun = smart_agent.ask_gemini_for_match_time(team1, team2, api_key)
+            gun, saat = smart_agent.ask_gemini_for_match_time(team1, team2, api_key)
+
+        cache_stats = smart_agent.ai_cache.stats()
+        if cache_stats["hit_rate"] is not None:
+            print(f"💾 AI önbellek isabet oranı: %{cache_stats['hit_rate'] * 100:.0f} ({cache_stats['hits']}/{cache_stats['hits'] + cache_stats['misses']})")
             
         if saat and gun:
             print(f"✅ AI SONUCU: {gun} {saat}")
@@ -685,387 +1040,41 @@ def download_logos(team1, team2, url1=None, url2=None):
     - team1 (kullanıcının girdiği ilk takım) -> logo1 (1.MacGorseli)
     - team2 (kullanıcının girdiği ikinci takım) -> logo2 (2.MacGorseli)
     """
-    import requests
-    from PIL import Image, ImageDraw
-    import os
-    from shutil import copyfile
-    
-    # API'den gelen URL'leri GÖRMEZDEN GEL (veya opsiyonel kullan)
-    
-    def safe_filename(name):
-        replacements = {
-            'ı': 'i', 'İ': 'I', 'ş': 's', 'Ş': 'S',
-            'ç': 'c', 'Ç': 'C', 'ğ': 'g', 'Ğ': 'G',
-            'ü': 'u', 'Ü': 'U', 'ö': 'o', 'Ö': 'O',
-            ' ': '_'
-        }
-        for old, new in replacements.items():
-            name = name.replace(old, new)
-        return name.lower()
-    
-    def resize_and_mask_logo(image_path, size=177):
-        """Logoyu işle: Beyaz arka planı temizle, transparan yap, kırp ve kaydet"""
-        try:
-            img = Image.open(image_path).convert("RGBA")
-            
-            # Beyaz arka plan temizleme (Basit threshold)
-            datas = img.getdata()
-            new_data = []
-            
-            # İlk piksel beyaz mı? Kontrol et (Basit heuristic)
-            first_pixel = datas[0]
-            is_white_bg = first_pixel[0] > 240 and first_pixel[1] > 240 and first_pixel[2] > 240
-            
-            if is_white_bg:
-                for item in datas:
-                    # Beyaza yakın pikselleri transparan yap (Threshold: 240)
-                    if item[0] > 240 and item[1] > 240 and item[2] > 240:
-                        new_data.append((255, 255, 255, 0))
-                    else:
-                        new_data.append(item)
-                img.putdata(new_data)
-            
-            # 1. Transparan boşlukları kırp (Trim)
-            # Alpha kanalını kullanarak bbox bul
-            alpha = img.split()[-1]
-            bbox = alpha.getbbox()
-            
-            if bbox:
-                img = img.crop(bbox)
-            
-            # 2. Devasa boyutları engelle (Opsiyonel optimizasyon)
-            if img.width > 500 or img.height > 500:
-                img.thumbnail((500, 500), Image.Resampling.LANCZOS)
-                
-            img.save(image_path, 'PNG')
-            return True
-        except Exception as e:
-            print(f"⚠️ Logo işleme hatası: {e}")
-            return False
-
-    def search_wikimedia_logo(team_name, output_path):
-        """Wikimedia Commons üzerinden logo ara ve indir"""
-        try:
-            url = "https://commons.wikimedia.org/w/api.php"
-            params = {
-                "action": "query", "format": "json", "generator": "search",
-                "gsrnamespace": "6", "gsrsearch": f"{team_name} logo filetype:png",
-                "gsrlimit": 1, "prop": "imageinfo", "iiprop": "url"
-            }
-            headers = {'User-Agent': 'MacBot/1.0'}
-            res = requests.get(url, params=params, headers=headers, timeout=10)
-            data = res.json()
-            pages = data.get("query", {}).get("pages", {})
-            for page_id in pages:
-                image_info = pages[page_id].get("imageinfo", [])
-                if image_info:
-                    image_url = image_info[0].get("url")
-                    if image_url:
-                        img_res = requests.get(image_url, headers=headers, timeout=10)
-                        if img_res.status_code == 200:
-                            with open(output_path, 'wb') as f:
-                                f.write(img_res.content)
-                            print(f"✅ Logo Wikimedia'dan indirildi: {team_name}")
-                            return True
-            return False
-        except: return False
-
-    def download_team_logo(team_name, output_path):
-        """TheSportsDB API üzerinden logo indir"""
-        try:
-            search_url = f"https://www.thesportsdb.com/api/v1/json/3/searchteams.php?t={team_name}"
-            response = requests.get(search_url, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('teams'):
-                    logo_url = data['teams'][0].get('strBadge') or data['teams'][0].get('strTeamBadge')
-                    if logo_url:
-                        logo_res = requests.get(logo_url, timeout=10)
-                        if logo_res.status_code == 200:
-                            with open(output_path, 'wb') as f:
-                                f.write(logo_res.content)
-                            print(f"✅ Logo API'den indirildi: {team_name}")
-                            return True
-            return False
-        except: return False
-
-    def search_tr_wikipedia_logo(team_name, output_path):
-        """Wikipedia (TR) üzerinden logo ara"""
-        try:
-            formatted_name = team_name.replace(" ", "_")
-            url = f"https://tr.wikipedia.org/wiki/{formatted_name}"
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            res = requests.get(url, headers=headers, timeout=10)
-            if res.status_code == 200:
-                import re
-                img_match = re.search(r'<img[^>]+src="([^"]+\.(?:png|svg|jpg|jpeg))"', res.text, re.IGNORECASE)
-                if img_match:
-                    img_url = img_match.group(1)
-                    if img_url.startswith("//"): img_url = "https:" + img_url
-                    img_res = requests.get(img_url, headers=headers, timeout=10)
-                    if img_res.status_code == 200:
-                        with open(output_path, 'wb') as f:
-                            f.write(img_res.content)
-                        print(f"✅ Logo Wikipedia'dan indirildi: {team_name}")
-                        return True
-            return False
-        except: return False
-
-    def get_local_logo(team_name, target_path):
-        """Yerel klasörde logo ara (Tam ve Bulanık) - PNG ve WEBP destekli"""
-        
-        def try_convert_and_use(source_path, dest_path):
-            try:
-                # Eğer kaynak webp ise veya farklıysa açıp png olarak kaydet
-                img = Image.open(source_path).convert("RGBA")
-                img.save(dest_path, "PNG")
-                resize_and_mask_logo(dest_path)
-                return True
-            except Exception as e:
-                print(f"⚠️ Dönüştürme hatası ({source_path}): {e}")
-                return False
-
-        # 1. Tam Eşleşme (PNG ve WEBP)
-        possible_names = [
-            f"{team_name}.png", f"{safe_filename(team_name)}.png", f"{team_name.replace(' ', '_')}.png",
-            f"{team_name}.webp", f"{safe_filename(team_name)}.webp", f"{team_name.replace(' ', '_')}.webp"
-        ]
-        
-        for pname in possible_names:
-            local_path = os.path.join(LOGOS_DIR, pname)
-            if os.path.exists(local_path) and os.path.getsize(local_path) > 100:
-                # Bulundu!
-                if try_convert_and_use(local_path, target_path):
-                    return True, "Tam"
-        
-        # 2. Bulanık Eşleşme (PNG ve WEBP)
-        try:
-            t_clean = "".join(c for c in team_name.lower() if c.isalnum())
-            for f in os.listdir(LOGOS_DIR):
-                valid_exts = (".png", ".webp")
-                if not f.lower().endswith(valid_exts): continue
-                
-                # Dosya adını temizle (uzantısız)
-                base_name = f.rsplit(".", 1)[0]
-                if base_name.lower().endswith(".svg"): base_name = base_name.rsplit(".", 1)[0]
-                
-                f_clean = "".join(c for c in base_name.lower() if c.isalnum())
-                
-                if t_clean == f_clean or t_clean in f_clean or f_clean in t_clean:
-                    local_path = os.path.join(LOGOS_DIR, f)
-                    if try_convert_and_use(local_path, target_path):
-                         return True, f"Bulanık ({f})"
-        except: pass
-        return False, None
-
-    def download_from_url(url, path, name):
-        try:
-            res = requests.get(url, timeout=10)
-            if res.status_code == 200:
-                with open(path, 'wb') as f: f.write(res.content)
-                resize_and_mask_logo(path)
-                print(f"✅ Logo URL'den indirildi: {name}")
-                return True
-        except: return False
-
-    t1_safe = safe_filename(team1)
-    t2_safe = safe_filename(team2)
-    path1 = os.path.join(LOGOS_DIR, f"{t1_safe}.png")
-    path2 = os.path.join(LOGOS_DIR, f"{t2_safe}.png")
-
-    # --- YENİ EKLENTİ: AGRESİF LOGO ARAMA (DuckDuckGo Images) ---
-    def aggressive_image_search(team_name, save_path):
-        """
-        Placeholder yerine interneti didik didik edip logo bulur.
-        "Sike sike o görsel bulunacak" modudur.
-        """
-        print(f"🕵️‍♂️ '{team_name}' logosu için derin arama başlatılıyor...")
-        
-        # 1. Önce Wikipedia/Wikimedia Tekrar Deneyelim (Farklı Varyasyonlarla)
-        # Bazen "FC" eklemek veya çıkarmak işe yarar
-        variations = [team_name, team_name + " FC", team_name.replace(" FC", "").replace("SK", "").strip()]
-        for v in variations:
-            if search_wikimedia_logo(v, save_path): return True
-
-        # 2. DuckDuckGo (DDGS)
-        try:
-            from duckduckgo_search import DDGS
-        except ImportError:
-            try:
-                # Fallback implementation if package name changed?
-                # User env seems to have it but warns about renaming. 
-                # We assume standard import works despite warning.
-                pass
-            except:
-                print("⚠️ DuckDuckGo modülü yüklenemedi.")
-                return False
-
-        import time
-        import random
-
-        queries = [
-            f"{team_name} logo png transparent",
-            f"{team_name} football club logo",
-            f"{team_name} crest png",
-            f"{team_name} logo",
-            f"{team_name} arması"
-        ]
-
-        try:
-            with DDGS() as ddgs:
-                for q in queries:
-                    print(f"   🔎 Deneniyor: '{q}'")
-                    try:
-                        # DDG Images search
-                        results = list(ddgs.images(q, max_results=3)) 
-                        
-                        for r in results:
-                            img_url = r.get('image')
-                            if not img_url: continue
-                            
-                            try:
-                                headers = {
-                                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/115.0.0.0 Safari/537.36'
-                                }
-                                res = requests.get(img_url, headers=headers, timeout=5)
-                                if res.status_code == 200:
-                                    from io import BytesIO
-                                    test_img = Image.open(BytesIO(res.content))
-                                    test_img.verify() 
-                                    
-                                    with open(save_path, 'wb') as f:
-                                        f.write(res.content)
-                                    
-                                    print(f"✅ BULUNDU (Deep Search): {team_name} -> {img_url}")
-                                    resize_and_mask_logo(save_path)
-                                    return True
-                            except: continue
-                        
-                        # Wait between queries to avoid Rate Limit
-                        time.sleep(random.uniform(2.0, 4.0))
-                        
-                    except Exception as e:
-                        err_str = str(e).lower()
-                        if "ratelimit" in err_str or "403" in err_str:
-                            print("⚠️ DuckDuckGo Rate Limit! (Biraz bekleniyor...)")
-                            time.sleep(5)
-                            continue
-                        print(f"⚠️ Arama hatası ({q}): {e}")
-                        
-        except Exception as e:
-            print(f"⚠️ Derin arama başlatılamadı: {e}")
-            
-        print(f"❌ '{team_name}' için internette bile düzgün logo bulunamadı!")
-        return False
-
-    # Team 1 İşlemi
-    success1 = False
-    
-    # 1. Öncelik: API URL'si (Varsa ve çalışırsa kesinlikle bunu kullan)
-    if url1:
-        print(f"⬇️  API'den logo indiriliyor: {team1}")
-        if download_from_url(url1, path1, team1):
-            success1 = True
-
-    # 2. Öncelik: Yerel Dosya (Sadece API başarısızsa veya URL yoksa)
-    if not success1 and os.path.exists(path1) and os.path.getsize(path1) > 1000:
-        print(f"✅ Logo zaten mevcut: {team1}")
-        resize_and_mask_logo(path1)
-        success1 = True
-    
-    if not success1:
-        found, mode = get_local_logo(team1, path1)
-        if found:
-            print(f"✅ Logo yerel klasörden bulundu ({mode}): {team1}")
-            success1 = True
-
-    if not success1:
-        if download_team_logo(team1, path1): success1 = True
-        elif search_wikimedia_logo(team1, path1): success1 = True
-        elif search_tr_wikipedia_logo(team1, path1): success1 = True
-        else:
-            try:
-                cli_url = sports_cli.get_team_logo_url(team1)
-                if cli_url and download_from_url(cli_url, path1, team1): success1 = True
-            except: pass
-            
-        if not success1:
-            # Placeholder YOK! Aggressive Search VAR!
-            if aggressive_image_search(team1, path1):
-                success1 = True
-            else:
-                print(f"💀 KRİTİK: {team1} logosu hiçbir yerde yok. Acil durum görseli oluşturuluyor.")
-                img = Image.new('RGBA', (500, 500), color=(255, 0, 0, 255))
-                d = ImageDraw.Draw(img)
-                d.text((50, 250), f"{team1}\nLOGO BULUNAMADI", fill=(255, 255, 255))
-                img.save(path1, "PNG")
-
-    # Team 2 İşlemi
-    success2 = False
-    
-    # 1. Öncelik: API URL'si
-    if url2:
-        print(f"⬇️  API'den logo indiriliyor: {team2}")
-        if download_from_url(url2, path2, team2):
-            success2 = True
-            
-    # 2. Öncelik: Yerel Dosya
-    if not success2 and os.path.exists(path2) and os.path.getsize(path2) > 1000:
-        print(f"✅ Logo zaten mevcut: {team2}")
-        resize_and_mask_logo(path2)
-        success2 = True
-    
-    if not success2:
-        found, mode = get_local_logo(team2, path2)
-        if found:
-            print(f"✅ Logo yerel klasörden bulundu ({mode}): {team2}")
-            success2 = True
-
-    if not success2:
-        if download_team_logo(team2, path2): success2 = True
-        elif search_wikimedia_logo(team2, path2): success2 = True
-        elif search_tr_wikipedia_logo(team2, path2): success2 = True
-        else:
-            try:
-                cli_url = sports_cli.get_team_logo_url(team2)
-                if cli_url and download_from_url(cli_url, path2, team2): success2 = True
-            except: pass
-            
-        if not success2:
-             # Placeholder YOK! Aggressive Search VAR!
-            if aggressive_image_search(team2, path2):
-                success2 = True
-            else:
-                print(f"💀 KRİTİK: {team2} logosu hiçbir yerde yok. Acil durum görseli oluşturuluyor.")
-                img = Image.new('RGBA', (500, 500), color=(255, 0, 0, 255))
-                d = ImageDraw.Draw(img)
-                d.text((50, 250), f"{team2}\nLOGO BULUNAMADI", fill=(255, 255, 255))
-                img.save(path2, "PNG")
-
-    return path1, path2
+    return get_logo_service(LOGOS_DIR).resolve_pair(team1, team2, url1, url2)
 
 
 def create_output_filename(team1, team2, index=1):
     """C. Çıktı Dosya Adı Hazırlama - Sıralı numaralandırma"""
     return f"mac-{index}.png"
 
-def trigger_photoshop_for_match(match_data, psd_filename="Maclar.psd", is_basketball=False):
-    """C. ExtendScript Tetikleme ve Veri Aktarımı"""
+def trigger_photoshop_for_match(match_data, psd_filename="Maclar.psd", is_basketball=False, jsx_path=None):
+    """
+    C. ExtendScript Tetikleme ve Veri Aktarımı
+
+    jsx_path: Render havuzundaki işler kendi scratch klasörüne yazar; verilmezse
+    paylaşılan psd_otomasyon.jsx kullanılır.
+    """
+    jsx_path = jsx_path or JSX_OUTPUT_PATH
     
-    # 0. PSD Dosyası Kontrolü
-    psd_full_path = os.path.join(BASE_DIR, psd_filename)
-    if not os.path.exists(psd_full_path):
+    # 0. PSD Dosyası Kontrolü (şablon önbelleği: dosya değişmediyse diske gidilmez)
+    template = template_cache.get_template(psd_filename)
+    if template is None:
         print(f"❌ HATA: '{psd_filename}' dosyası bulunamadı!")
-        print(f"Konum: {psd_full_path}")
+        print(f"Konum: {os.path.join(BASE_DIR, psd_filename)}")
         return False
+    psd_full_path = template.path
 
     # 1. Veriyi JSON formatına hazırla
     js_data = {
         "psdPath": psd_full_path,
+        "templateHash": template.sha1,
         "outputDir": OUTPUT_DIR,
         "outputFileName": match_data["output_filename"],
         "evSahibi": match_data["ev_sahibi"],
         "deplasman": match_data["deplasman"],
+        "evSahibiKisa": text_layout.abbreviate_team(match_data["ev_sahibi"]),
+        "deplasmanKisa": text_layout.abbreviate_team(match_data["deplasman"]),
+        "layoutCacheSize": text_layout.LAYOUT_CACHE_SIZE,
         "saat": match_data["saat"],
         "gun": match_data["gun"],
         "oran1": match_data["oran_1"],
@@ -1078,14 +1087,15 @@ def trigger_photoshop_for_match(match_data, psd_filename="Maclar.psd", is_basket
         "isBasketball": is_basketball
     }
     
-    # Python dict -> JSON string
-    json_str = json.dumps(js_data, ensure_ascii=False)
-    
-    # 2. JSX dosyasını oluştur
-    script_content = JSX_TEMPLATE.replace("{{DATA_JSON}}", json_str)
-    
-    with open(JSX_OUTPUT_PATH, "w", encoding="utf-8") as f:
-        f.write(script_content)
+    with tracer.span("jsx_generate"):
+        # Python dict -> JSON string
+        json_str = json.dumps(js_data, ensure_ascii=False)
+        
+        # 2. JSX dosyasını oluştur
+        script_content = JSX_TEMPLATE.replace("{{DATA_JSON}}", json_str)
+        
+        with open(jsx_path, "w", encoding="utf-8") as f:
+            f.write(script_content)
     
     # 3. Photoshop'u Tetikle (open komutu ile - daha güvenilir)
     print(f"\n🎨 Photoshop tetikleniyor: {match_data['ev_sahibi']} vs {match_data['deplasman']}")
@@ -1093,13 +1103,15 @@ def trigger_photoshop_for_match(match_data, psd_filename="Maclar.psd", is_basket
     try:
         # 'open' komutu dosyayı ilgili uygulama ile açar (Photoshop JSX'i çalıştırır)
         # Bu yöntem AppleScript'in izin sorunlarını ve donmalarını aşar.
-        cmd = ["open", "-a", "Adobe Photoshop 2026", JSX_OUTPUT_PATH]
+        cmd = ["open", "-a", "Adobe Photoshop 2026", jsx_path]
         
         # Debugging prints
-        print(f"JSX Dosyası: {JSX_OUTPUT_PATH}")
+        print(f"JSX Dosyası: {jsx_path}")
         print("Çalıştırılan Komut: " + " ".join(cmd))
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+        with tracer.span("photoshop_open") as span:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            span["ok"] = result.returncode == 0
         
         if result.returncode == 0:
             print("✅ Komut başarıyla gönderildi (Dosya açıldı).")
@@ -1128,10 +1140,177 @@ def trigger_photoshop_for_match(match_data, psd_filename="Maclar.psd", is_basket
         print(f"❌ Beklenmeyen Hata: {e}")
         return False
 
+PHOTOSHOP_WAIT = 5            # open komutu asenkron; Photoshop'un kaydetmesi için beklenen süre (sn)
+
+def default_match_time():
+    """Fallback when no source knows the match: today, 20:00. Returns (saat, gun)."""
+    tr_days = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
+    tr_months = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran", "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
+    now = datetime.datetime.now()
+    return "20:00", f"{tr_days[now.weekday()]}, {now.day} {tr_months[now.month-1]}"
+
+def resolve_match_time(match, subtract_day=False, ai_key=None):
+    """
+    Finds the kick-off for one match: manual_datetime first (the API fills
+    a missing time), otherwise TheSportsDB, then the AI search when
+    `ai_key` is given. Canonical team names and API logo URLs are written
+    into `match`. Returns (saat, gun); None where nothing was found.
+    """
+    if match.get("manual_datetime"):
+         # Manuel tarih varsa onu kullan
+         mdt = match["manual_datetime"].strip()
+
+         # SAAT Format Kontrolü (HH:MM)
+         # Önce tüm string içinde saat formatı (HH:MM veya HH.MM) ara
+         # \b ensures word boundary, but note time can be at end of string
+         time_matches = re.findall(r'\b(\d{1,2}[:.]\d{2})\b', mdt)
+
+         found_time = None
+         if time_matches:
+             # Filter out things that look like years (2025) - but regex checks for : or .
+             found_time = time_matches[-1].replace('.', ':')
+
+         if found_time:
+             saat = found_time
+             # Tarih kısmını ayıkla: Saati sil
+             # mdt'yi geçici olarak temizle
+             clean_mdt = mdt.replace(time_matches[-1], "").strip()
+             clean_mdt = re.sub(r'\s+', ' ', clean_mdt)
+             gun = clean_mdt
+
+             if not gun: # Sadece 22:30 yazıldıysa
+                 _, gun = default_match_time()
+
+         else:
+             # Saat bulunamadı, tamamı tarih
+             gun = mdt
+             saat = ""
+
+         print(f"👉 Manuel Tarih Kullanılıyor: {gun} {saat}")
+
+         # Eğer saat boşsa, API'den saati bulmaya çalış
+         if not saat:
+            print(f"ℹ️  Manuel saat belirtilmedi (saat boş), API'den aranıyor...")
+            api_saat, _, _, _, _, _ = scrape_match_time_sportsdb(match["ev_sahibi"], match["deplasman"], subtract_day_for_night=subtract_day)
+
+            # Fallback to AI if API fails for time
+            if not api_saat and ai_key:
+                print("ℹ️  Standart API'de saat bulunamadı, AI deneniyor...")
+                api_saat, _ = smart_match_search(match["ev_sahibi"], match["deplasman"], ai_key)
+
+            if api_saat:
+                saat = api_saat
+                print(f"✅ Saat API/AI'den eklendi: {saat}")
+            else:
+                print("⚠️ Saat API'den bulunamadı.")
+
+    else:
+         # Saat ve gün - TheSportsDB (sports_cli.py)
+         # NOT: API'den gelen home_badge ve away_badge KULLANILMAZ
+         saat, gun, api_logo1, api_logo2, canon1, canon2 = scrape_match_time_sportsdb(match["ev_sahibi"], match["deplasman"], subtract_day_for_night=subtract_day)
+
+         # API'den gelen verileri kullan
+         if canon1 and canon2:
+             # Doğru isimlerle güncelle (Opsiyonel: Eğer çok farklıysa kullanıcıyı uyarabiliriz ama oto-düzeltme premium hissettirir)
+             print(f"🔄 Takım isimleri güncelleniyor: {match['ev_sahibi']} -> {canon1} | {match['deplasman']} -> {canon2}")
+             match["ev_sahibi"] = canon1
+             match["deplasman"] = canon2
+
+         if api_logo1: match["api_logo1"] = api_logo1
+         if api_logo2: match["api_logo2"] = api_logo2
+
+         # TheSportsDB bulamazsa ve Key varsa -> Smart Search
+         if (saat is None or gun is None) and ai_key:
+             saat_ai, gun_ai = smart_match_search(match["ev_sahibi"], match["deplasman"], ai_key)
+             if saat_ai and gun_ai:
+                 saat = saat_ai
+                 gun = gun_ai
+
+    return saat, gun
+
+def verify_team_names(match):
+    """
+    Canonical names and logo URLs for matches the time lookup did not
+    touch (e.g. manual date given).
+    """
+    # =========================================================================
+    # 📌 TAKIM İSMİ VE LOGO DOĞRULAMA (HER DURUMDA)
+    # =========================================================================
+    # Eğer yukarıdaki adımlarda (örneğin manuel tarih girildiği için) API'den 
+    # takım bilgileri çekilmediyse, şimdi sadece isim ve logo için çekelim.
+    if "api_logo1" not in match and "api_logo2" not in match:
+         print(f"ℹ️  Takım isimleri ve logoları için API kontrolü yapılıyor...")
+         try:
+             # Ev Sahibi
+             t1_info = sports_cli.get_team_info(match["ev_sahibi"])
+             if t1_info[0]: 
+                 print(f"   ✅ Ev Sahibi Güncellendi: {match['ev_sahibi']} -> {t1_info[0]}")
+                 match["ev_sahibi"] = t1_info[0]
+                 if t1_info[1]: match["api_logo1"] = t1_info[1]
+
+             # Deplasman
+             t2_info = sports_cli.get_team_info(match["deplasman"])
+             if t2_info[0]:
+                 print(f"   ✅ Deplasman Güncellendi: {match['deplasman']} -> {t2_info[0]}")
+                 match["deplasman"] = t2_info[0]
+                 if t2_info[1]: match["api_logo2"] = t2_info[1]
+         except Exception as e:
+             print(f"⚠️ API Hatası: {e}")
+
+def render_match(match, idx, psd_filename="Maclar.psd", wait=PHOTOSHOP_WAIT, scratch_dir=None):
+    """
+    Logos, output name, Photoshop trigger and the post-render wait for one
+    match that already has "saat" and "gun". Returns True on success.
+    Render pool workers pass their job's scratch_dir, as for
+    automation_engine.render_match_psd.
+    """
+    # Logo indirme - API URL'leri varsa öncelikli kullan
+    logo1, logo2 = download_logos(match["ev_sahibi"], match["deplasman"], url1=match.get("api_logo1"), url2=match.get("api_logo2"))
+    match["logo1"] = logo1
+    match["logo2"] = logo2
+    # Doğrulanan takımın logo dosyası kayda işlenir
+    registry = team_registry.get_registry()
+    registry.set_logo_file(match["ev_sahibi"], os.path.basename(logo1))
+    registry.set_logo_file(match["deplasman"], os.path.basename(logo2))
+    registry.save()
+
+    # Çıktı dosya adı (sıralı numara ile)
+    match["output_filename"] = create_output_filename(match["ev_sahibi"], match["deplasman"], idx)
+
+    is_basketball_mode = "basketbol" in psd_filename.lower()
+    jsx_path = os.path.join(scratch_dir, "psd_otomasyon.jsx") if scratch_dir else None
+    success = trigger_photoshop_for_match(match, psd_filename=psd_filename, is_basketball=is_basketball_mode, jsx_path=jsx_path)
+    if success and wait:
+        # Photoshop'un işlemi tamamlaması için bekleme (open komutu asenkron olduğu için artırıldı)
+        print(f"⏳ Photoshop'un işlemi tamamlaması bekleniyor ({wait} sn)...")
+        with tracer.span("photoshop_wait"):
+            time.sleep(wait)
+        print(f"\n📊 Photoshop'ta '{match['output_filename']}' dosyası oluşturuldu.")
+    return success
+
+def compress_outputs(directory=OUTPUT_DIR):
+    """Compresses the rendered mac-*.png files; returns compressor's results."""
+    import compressor
+    print("\n⏳ Görseller sıkıştırılıyor...")
+    tracer.bind(match=None, index=None)
+    with tracer.span("compress"):
+        return compressor.compress_and_rename_images(directory)
+
 # =============================================================================
 # MAIN FLOW
 # =============================================================================
 if __name__ == "__main__":
+    import batch_cli
+
+    # Alt komutla çağrılırsa (resolve, render, run-all …) etkileşimsiz toplu mod
+    if len(sys.argv) > 1 and sys.argv[1] in ("-h", "--help") + batch_cli.COMMANDS:
+        sys.exit(batch_cli.main(sys.argv[1:]))
+
+    # --profile / --profile=cprofile / MACBOT_PROFILE: tüm çalışma profillenir, çıkışta profiles/ altına yazılır
+    profile_mode = profiler.mode_from_args(sys.argv[1:])
+    if profile_mode:
+        profiler.start("cli", profile_mode)
+
     print("\n" + "="*60)
     print("PSD OTOMASYON BOTU BAŞLATILIYOR")
     print("="*60 + "\n")
@@ -1202,290 +1381,7 @@ if __name__ == "__main__":
             
             # Simulate user input by feeding lines into a processing logic
             print("⚡ Dosyadaki maçlar +0.20 Oran Artırma ile işleniyor.\n")
-            # Reuse logic by temporary mocking input or just parsing directly.
-            # Parsing directly is cleaner.
-            # Improved Parsing Logic: Supports both single-line and multi-line blocks
-            matches = []
-            raw_lines = [line.strip() for line in lines if line.strip()]
-            
-            i = 0
-            while i < len(raw_lines):
-                line = raw_lines[i]
-                found_match = False
-                
-                # 1. Try to parse as single-line match with optional Date/Time
-                separators = [" vs. ", " vs ", " - ", " / ", " VS. ", " VS ", " Vs. ", " Vs ", " v "]
-                for sep in separators:
-                    if sep in line:
-                        parts = line.split(sep, 1)
-                        if len(parts) == 2:
-                            ev_sahibi = parts[0].strip()
-                            remaining = parts[1].strip().split()
-                            
-                            # Akıllı Oran Bulucu (Smart Odds Parser)
-                            # Sondan başa değil, pattern tarayarak bulalım.
-                            # Football: [Float, Float, Float]
-                            # Basketball: [Float, Float]
-                            
-                            odds_found = False
-                            
-                            # Futbol (3 Oran) Tarama
-                            for k in range(len(remaining) - 2):
-                                try:
-                                    o1 = float(remaining[k])
-                                    ox = float(remaining[k+1])
-                                    o2 = float(remaining[k+2])
-                                    
-                                    # Bulundu!
-                                    # Deplasman ismini oluşturmadan önce, oranlardan önceki son kelimeye bak
-                                    # Eğer saat formatındaysa (20:00), onu al ve takımdan çıkar.
-                                    
-                                    pre_odds_tokens = remaining[:k]
-                                    dt_from_prev = None
-                                    
-                                    import re
-                                    import re
-                                    # Geriye doğru tarama (Backwards scan)
-                                    # Oranlardan hemen önceki tokenlar Tarih/Saat olabilir
-                                    # Örn: Freiburg 22:30 14 OCAK 1.79...
-                                    
-                                    found_datetime_parts = []
-                                    while pre_odds_tokens:
-                                        last_t = pre_odds_tokens[-1]
-                                        is_dt = False
-                                        
-                                        # Saat kontrolü
-                                        if re.match(r'^\d{1,2}[:.]\d{2}$', last_t): 
-                                            is_dt = True
-                                        
-                                        # Ay ismi kontrolü
-                                        elif re.search(r'(ocak|şubat|mart|nisan|mayıs|haziran|temmuz|ağustos|eylül|ekim|kasım|aralık|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)', last_t.lower()):
-                                            is_dt = True
-                                            
-                                        # Gün (sayı) ve Yıl kontrolü
-                                        elif last_t.isdigit():
-                                            if len(last_t) == 4 or int(last_t) <= 31:
-                                                is_dt = True
-                                        
-                                        if is_dt:
-                                            found_datetime_parts.insert(0, pre_odds_tokens.pop())
-                                        else:
-                                            # Tarih/Saat değilse, muhtemelen takım isminin son parçasıdır.
-                                            # Ancak bazen "14 OCAK" gibi arada boşluk olunca split ayrı token yapar.
-                                            # Bu döngü contiguous (bitişik) tarih bloğunu alır.
-                                            break
-                                            
-                                    dt_from_prev = " ".join(found_datetime_parts) if found_datetime_parts else None
-                                    
-                                    deplasman = " ".join(pre_odds_tokens)
-                                    
-                                    # Oranlardan sonra kalan kısım TARİH/SAAT olabilir
-                                    dt_from_post = " ".join(remaining[k+3:])
-                                    
-                                    # Hangisi varsa onu kullan (Öncelik: Explicit yazılan)
-                                    final_dt = dt_from_prev if dt_from_prev else (dt_from_post if dt_from_post.strip() else None)
-                                    
-                                    matches.append({
-                                        "ev_sahibi": ev_sahibi,
-                                        "deplasman": deplasman,
-                                        "oran_1": f"{o1 + 0.20:.2f}",
-                                        "oran_x": f"{ox + 0.20:.2f}",
-                                        "oran_2": f"{o2 + 0.20:.2f}",
-                                        "manual_datetime": final_dt
-                                    })
-                                    found_match = True
-                                    print(f"✅ Eklendi (BOOST +0.20): {ev_sahibi} vs {deplasman}" + (f" 🕒 {final_dt}" if final_dt else ""))
-                                    odds_found = True
-                                    break
-                                except: continue
-                            
-                            if odds_found: break
-
-                            # Basketbol (2 Oran) Tarama
-                            if not odds_found:
-                                for k in range(len(remaining) - 1):
-                                    try:
-                                        o1 = float(remaining[k])
-                                        o2 = float(remaining[k+1])
-                                        
-                                        # Deplasman ve Saat Ayrıştırma (Önceki kelime kontrolü)
-                                        pre_odds_tokens = remaining[:k]
-                                        dt_from_prev = None
-                                        
-                                        import re
-                                        if pre_odds_tokens and re.match(r'^\d{1,2}[:.]\d{2}$', pre_odds_tokens[-1]):
-                                            dt_from_prev = pre_odds_tokens.pop()
-                                            dt_from_prev = dt_from_prev.replace(".", ":")
-                                        
-                                        deplasman = " ".join(pre_odds_tokens)
-                                        dt_from_post = " ".join(remaining[k+2:])
-                                        
-                                        final_dt = dt_from_prev if dt_from_prev else (dt_from_post if dt_from_post.strip() else None)
-                                        
-                                        matches.append({
-                                            "ev_sahibi": ev_sahibi,
-                                            "deplasman": deplasman,
-                                            "oran_1": f"{o1 + 0.20:.2f}",
-                                            "oran_x": "",
-                                            "oran_2": f"{o2 + 0.20:.2f}",
-                                            "manual_datetime": final_dt
-                                        })
-                                        found_match = True
-                                        print(f"🏀 Basketbol Eklendi: {ev_sahibi} vs {deplasman}" + (f" 🕒 {final_dt}" if final_dt else ""))
-                                        odds_found = True
-                                        break
-                                    except: continue
-                            
-                            # C. No Odds (Single Line) Tarama
-                            # Eğer oran bulamadıysak, geri kalan kısmın tamamını Deplasman + Tarih olarak al
-                            # Örnek: Freiburg 22:30 14 OCAK
-                            if not odds_found:
-                                try:
-                                    # Sondan başa doğru tarih/saat parçalarını ayıkla
-                                    # Basit heuristic: Tarih/Saat formatına uyanları topla
-                                    date_tokens = []
-                                    team_tokens = list(remaining) # Copy
-                                    
-                                    while team_tokens:
-                                        last_token = team_tokens[-1]
-                                        # Basit kontrol: Sayı içeriyor mu veya ay ismi mi?
-                                        is_time = ":" in last_token or "." in last_token # 22:30, 22.30
-                                        is_date_part = False
-                                        
-                                        import re
-                                        # Ay isimleri kontrolü
-                                        months_regex = r'(ocak|şubat|mart|nisan|mayıs|haziran|temmuz|ağustos|eylül|ekim|kasım|aralık|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)'
-                                        if re.search(months_regex, last_token.lower()):
-                                            is_date_part = True
-                                        elif last_token.isdigit() and int(last_token) < 32: # Gün
-                                            is_date_part = True
-                                        elif re.match(r'^\d{4}$', last_token): # Yıl
-                                            is_date_part = True
-                                            
-                                        if is_time or is_date_part:
-                                            date_tokens.insert(0, team_tokens.pop())
-                                        else:
-                                            break
-                                    
-                                    if team_tokens: # En az bir kelime takım adı kalmalı
-                                        deplasman = " ".join(team_tokens)
-                                        manual_dt = " ".join(date_tokens) if date_tokens else None
-                                        
-                                        matches.append({
-                                            "ev_sahibi": ev_sahibi,
-                                            "deplasman": deplasman,
-                                            "oran_1": "",
-                                            "oran_x": "",
-                                            "oran_2": "",
-                                            "manual_datetime": manual_dt,
-                                            "hide_odds": True
-                                        })
-                                        found_match = True
-                                        print(f"✅ Eklendi (Oransız): {ev_sahibi} vs {deplasman}" + (f" 🕒 {manual_dt}" if manual_dt else ""))
-                                        break # Stop looking for separators
-                                except Exception as e:
-                                    print(e)
-                                    pass
-
-                if found_match:
-                    i += 1
-                    continue
-                    
-                # 2. Try to parse as multi-line block (Standard 5 lines or No Odds 3-5 lines)
-                if i + 2 < len(raw_lines):
-                    # A. Check for "No Odds" indicator at line 3 (index i+2)
-                    first_odd_line = raw_lines[i+2].lower().strip()
-                    if first_odd_line in ["yok", "-", "0", "oran_yok", "no_odds"]:
-                        consumed = 3
-                        # Dynamically check for 4th and 5th lines being placeholders too
-                        # Check line 4
-                        if i + 3 < len(raw_lines):
-                            l4 = raw_lines[i+3].lower().strip()
-                            is_placeholder = l4 in ["yok", "-", "0", "oran_yok", "no_odds"]
-                            if is_placeholder:
-                                consumed += 1
-                                # Check line 5 (only if line 4 was placeholder)
-                                if i + 4 < len(raw_lines):
-                                    l5 = raw_lines[i+4].lower().strip()
-                                    is_placeholder_5 = l5 in ["yok", "-", "0", "oran_yok", "no_odds"]
-                                    if is_placeholder_5:
-                                        consumed += 1
-                        
-                        matches.append({
-                            "ev_sahibi": raw_lines[i],
-                            "deplasman": raw_lines[i+1],
-                            "oran_1": "",
-                            "oran_x": "",
-                            "oran_2": "",
-                            "hide_odds": True
-                        })
-                        print(f"✅ Bloktan Eklendi (Oransız): {raw_lines[i]} vs {raw_lines[i+1]}")
-                        # Check for Optional Date/Time line (Tarih: ...)
-                        if i + consumed < len(raw_lines):
-                            next_line = raw_lines[i + consumed].strip()
-                            if next_line.lower().startswith(("tarih:", "date:", "saat:", "time:")):
-                                manual_dt = next_line.split(":", 1)[1].strip()
-                                last_match = matches[-1]
-                                last_match["manual_datetime"] = manual_dt
-                                print(f"📅 Manuel Tarih Bulundu: {manual_dt}")
-                                consumed += 1
-                        
-                        i += consumed
-                        continue
-
-                    # B. Check for Standard 5 Lines (Floats)
-                    if i + 4 < len(raw_lines):
-                        try:
-                            o1 = float(raw_lines[i+2])
-                            ox = float(raw_lines[i+3])
-                            o2 = float(raw_lines[i+4])
-                            matches.append({
-                                "ev_sahibi": raw_lines[i],
-                                "deplasman": raw_lines[i+1],
-                                "oran_1": f"{o1 + 0.20:.2f}",
-                                "oran_x": f"{ox + 0.20:.2f}",
-                                "oran_2": f"{o2 + 0.20:.2f}",
-                                "hide_odds": False
-                            })
-                            print(f"✅ Bloktan Eklendi (BOOST +0.20): {raw_lines[i]} vs {raw_lines[i+1]}")
-                            
-                            # Check for Optional Date/Time line
-                            if i + 5 < len(raw_lines):
-                                next_line = raw_lines[i+5].strip()
-                                if next_line.lower().startswith(("tarih:", "date:", "saat:", "time:")):
-                                    manual_dt = next_line.split(":", 1)[1].strip()
-                                    matches[-1]["manual_datetime"] = manual_dt
-                                    print(f"📅 Manuel Tarih Bulundu: {manual_dt}")
-                                    i += 6
-                                else:
-                                    i += 5
-                            else:
-                                i += 5
-                            continue
-                        except: pass
-
-                    
-                # 3. Try to parse as multi-line block (4 lines: T1, T2, O1, O2 - Basketball)
-                if i + 3 < len(raw_lines):
-                    try:
-                        o1 = float(raw_lines[i+2])
-                        o2 = float(raw_lines[i+3])
-                        matches.append({
-                            "ev_sahibi": raw_lines[i],
-                            "deplasman": raw_lines[i+1],
-                            "oran_1": f"{o1 + 0.20:.2f}",
-                            "oran_x": "",
-                            "oran_2": f"{o2 + 0.20:.2f}",
-                            "hide_odds": False
-                        })
-                        print(f"🏀 Bloktan Eklendi (Basketbol): {raw_lines[i]} vs {raw_lines[i+1]}")
-                        i += 4
-                        continue
-                    except: pass
-                
-                # If everything fails
-                print(f"⚠️ Format Hatası (Satır Atlandı veya Blok Geçersiz): {line}")
-                i += 1
+            matches = parse_match_lines(lines)
             
             for m in matches:
                 print(f"✅ Hazır: {m['ev_sahibi']} vs {m['deplasman']} ({m['oran_1']} {m['oran_x']} {m['oran_2']})")
@@ -1504,102 +1400,20 @@ if __name__ == "__main__":
         matches = get_demo_match_data()
     
     # Her maç için işlem yap
+    run_batch = tracer.start_batch("cli", matches=len(matches), template=selected_psd)
     for idx, match in enumerate(matches, 1):
+        # Bu maçtaki tüm span'ler maç etiketini taşır
+        tracer.bind(match=f"{match['ev_sahibi']} vs {match['deplasman']}", index=idx)
         print(f"\n{'='*60}")
         print(f"MAÇ {idx}/{len(matches)}: {match['ev_sahibi']} vs {match['deplasman']}")
         print(f"{'='*60}")
         
-        if match.get("manual_datetime"):
-             # Manuel tarih varsa onu kullan
-             mdt = match["manual_datetime"].strip()
-             
-
-             # SAAT Format Kontrolü (HH:MM)
-             # Önce tüm string içinde saat formatı (HH:MM veya HH.MM) ara
-             import re
-             # \b ensures word boundary, but note time can be at end of string
-             time_matches = re.findall(r'\b(\d{1,2}[:.]\d{2})\b', mdt)
-             
-             found_time = None
-             if time_matches:
-                 # Filter out things that look like years (2025) - but regex checks for : or .
-                 found_time = time_matches[-1].replace('.', ':')
-             
-             if found_time:
-                 saat = found_time
-                 # Tarih kısmını ayıkla: Saati sil
-                 # mdt'yi geçici olarak temizle
-                 clean_mdt = mdt.replace(time_matches[-1], "").strip()
-                 clean_mdt = re.sub(r'\s+', ' ', clean_mdt)
-                 gun = clean_mdt
-                 
-                 if not gun: # Sadece 22:30 yazıldıysa
-                     import datetime
-                     tr_days = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-                     tr_months = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran", "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
-                     now = datetime.datetime.now()
-                     gun = f"{tr_days[now.weekday()]}, {now.day} {tr_months[now.month-1]}"
-                     
-             else:
-                 # Saat bulunamadı, tamamı tarih
-                 gun = mdt
-                 saat = ""
-                 
-             print(f"👉 Manuel Tarih Kullanılıyor: {gun} {saat}")
-             
-             # Eğer saat boşsa, API'den saati bulmaya çalış
-             # DEBUG PRRINTS
-             print(f"DEBUG: Saat kontrolü. Şu anki saat değeri: '{saat}' (Tipi: {type(saat)})")
-             if not saat:
-                print(f"ℹ️  Manuel saat belirtilmedi (saat boş), API'den aranıyor...")
-                api_saat, api_gun, _, _, _, _ = scrape_match_time_sportsdb(match["ev_sahibi"], match["deplasman"], subtract_day_for_night=subtract_day)
-                 
-                # Fallback to AI if API fails for time
-                if not api_saat and openai_key:
-                    print("ℹ️  Standart API'de saat bulunamadı, AI deneniyor...")
-                    api_saat, _ = smart_match_search(match["ev_sahibi"], match["deplasman"], openai_key)
-
-                print(f"DEBUG: API (veya AI) Sonucu -> Saat: {api_saat}, Gün: {api_gun}")
-                
-                if api_saat:
-                    saat = api_saat
-                    print(f"✅ Saat API/AI'den eklendi: {saat}")
-                else:
-                    print("⚠️ Saat API'den bulunamadı.")
-
-        else:
-             # Saat ve gün - TheSportsDB (sports_cli.py)
-             # NOT: API'den gelen home_badge ve away_badge KULLANILMAZ
-             saat, gun, api_logo1, api_logo2, canon1, canon2 = scrape_match_time_sportsdb(match["ev_sahibi"], match["deplasman"], subtract_day_for_night=subtract_day)
-             
-             # API'den gelen verileri kullan
-             if canon1 and canon2:
-                 # Doğru isimlerle güncelle (Opsiyonel: Eğer çok farklıysa kullanıcıyı uyarabiliriz ama oto-düzeltme premium hissettirir)
-                 print(f"🔄 Takım isimleri güncelleniyor: {match['ev_sahibi']} -> {canon1} | {match['deplasman']} -> {canon2}")
-                 match["ev_sahibi"] = canon1
-                 match["deplasman"] = canon2
-                 
-             if api_logo1: match["api_logo1"] = api_logo1
-             if api_logo2: match["api_logo2"] = api_logo2
-
-             # TheSportsDB bulamazsa ve Key varsa -> Smart Search
-             if (saat is None or gun is None) and openai_key:
-                 saat_ai, gun_ai = smart_match_search(match["ev_sahibi"], match["deplasman"], openai_key)
-                 if saat_ai and gun_ai:
-                     saat = saat_ai
-                     gun = gun_ai
+        saat, gun = resolve_match_time(match, subtract_day, openai_key)
         
         if (saat is None or gun is None) and not match.get("manual_datetime"):
             print(f"⚠️ Kaynaklarda saat bulunamadı. Otomatik devam ediliyor (Varsayılan değerler).")
             
-            # Otomatik Varsayılan Atama (User Interaction Yok!)
-            import datetime
-            tr_days = ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"]
-            tr_months = ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran", "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"]
-            
-            now = datetime.datetime.now()
-            gun = f"{tr_days[now.weekday()]}, {now.day} {tr_months[now.month-1]}"
-            saat = "20:00" 
+            saat, gun = default_match_time()
             
             print(f"👉 Atanan: {gun} {saat}")
 
@@ -1620,29 +1434,7 @@ if __name__ == "__main__":
                             rem_match["manual_datetime"] = f"{gun} {saat}" # Flag as manually set
                     print(f"✅ Kalan tüm maçlara uygulandı: {gun} {saat}")
         
-        # =========================================================================
-        # 📌 TAKIM İSMİ VE LOGO DOĞRULAMA (HER DURUMDA)
-        # =========================================================================
-        # Eğer yukarıdaki adımlarda (örneğin manuel tarih girildiği için) API'den 
-        # takım bilgileri çekilmediyse, şimdi sadece isim ve logo için çekelim.
-        if "api_logo1" not in match and "api_logo2" not in match:
-             print(f"ℹ️  Takım isimleri ve logoları için API kontrolü yapılıyor...")
-             try:
-                 # Ev Sahibi
-                 t1_info = sports_cli.get_team_info(match["ev_sahibi"])
-                 if t1_info[0]: 
-                     print(f"   ✅ Ev Sahibi Güncellendi: {match['ev_sahibi']} -> {t1_info[0]}")
-                     match["ev_sahibi"] = t1_info[0]
-                     if t1_info[1]: match["api_logo1"] = t1_info[1]
-                 
-                 # Deplasman
-                 t2_info = sports_cli.get_team_info(match["deplasman"])
-                 if t2_info[0]:
-                     print(f"   ✅ Deplasman Güncellendi: {match['deplasman']} -> {t2_info[0]}")
-                     match["deplasman"] = t2_info[0]
-                     if t2_info[1]: match["api_logo2"] = t2_info[1]
-             except Exception as e:
-                 print(f"⚠️ API Hatası: {e}")
+        verify_team_names(match)
 
         # --- İNTERAKTİF DOĞRULAMA MODU ---
         if interactive_mode:
@@ -1669,35 +1461,10 @@ if __name__ == "__main__":
         match["saat"] = saat
         match["gun"] = gun
         
-        # Logo indirme - API URL'leri varsa öncelikli kullan
-        logo1, logo2 = download_logos(match["ev_sahibi"], match["deplasman"], url1=match.get("api_logo1"), url2=match.get("api_logo2"))
-        match["logo1"] = logo1
-        match["logo2"] = logo2
-        
-        # Çıktı dosya adı (sıralı numara ile)
-        match["output_filename"] = create_output_filename(match["ev_sahibi"], match["deplasman"], idx)
-        
-        # Photoshop'u tetikle
-        is_basketball_mode = (selected_psd == "basketbol.psd")
-        
         # Eğer oran yoksa ve basketbol değilse Maclar1.psd kullan - İPTAL EDİLDİ (Kullanıcı Talebi: Her zaman Maclar.psd)
-        current_psd = selected_psd
-        # if match.get("hide_odds") and not is_basketball_mode:
-        #      current_psd = "Maclar1.psd"
-        #      print(f"ℹ️  Oran yok, '{current_psd}' kullanılıyor.")
-
-        success = trigger_photoshop_for_match(match, psd_filename=current_psd, is_basketball=is_basketball_mode)
+        success = render_match(match, idx, psd_filename=selected_psd)
         
         if success:
-            # Photoshop'un işlemi tamamlaması için kısa bekleme
-            import time
-            # Photoshop'un işlemi tamamlaması için bekleme (open komutu asenkron olduğu için artırıldı)
-            import time
-            print("⏳ Photoshop'un işlemi tamamlaması bekleniyor (5 sn)...")
-            time.sleep(5)
-            
-            # Kullanıcıya bilgi ver
-            print(f"\n📊 Photoshop'ta '{match['output_filename']}' dosyası oluşturuldu.")
             print("✅ JPEG kaydedildi ve PSD kapatıldı.")
             
             # Bir sonraki maça geçmeden önce onay al
@@ -1712,10 +1479,10 @@ if __name__ == "__main__":
 
     # Otomatik Sıkıştırma İşlemi
     try:
-        import compressor
-        print("\n⏳ Görseller sıkıştırılıyor...")
-        compressor.compress_and_rename_images(OUTPUT_DIR)
+        compress_outputs(OUTPUT_DIR)
     except ImportError:
         print("⚠️ compressor.py bulunamadı, sıkıştırma atlandı.")
     except Exception as e:
         print(f"⚠️ Sıkıştırma hatası: {e}")
+
+    tracer.end_batch(run_batch)
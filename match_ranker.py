@@ -0,0 +1,97 @@
+from collections import namedtuple
+from datetime import date
+from difflib import SequenceMatcher
+from functools import lru_cache
+
+from fixture_store import normalize_team_name
+
+# Aday maç puanlama modeli: iki takımın isim benzerliği, ev/deplasman yönü ve tarih yakınlığı.
+NAME_WEIGHT = 0.8
+DATE_WEIGHT = 0.2
+SWAPPED_PENALTY = 0.95    # Kullanıcı takımları ters yazmışsa (deplasman önce) hafif ceza
+MIN_TEAM_SIMILARITY = 0.55
+MIN_CONFIDENCE = 0.5
+DATE_HALF_LIFE_DAYS = 7   # 7 gün sonraki maç, bugünkü maçın yarı tarih puanını alır
+
+RankedMatch = namedtuple("RankedMatch", ["confidence", "event", "swapped", "event_date"])
+
+_normalize = lru_cache(maxsize=4096)(normalize_team_name)
+
+@lru_cache(maxsize=16384)
+def name_similarity(query, candidate):
+    """
+    Similarity of two team names in [0, 1].
+    Exact normalized match = 1.0, containment ("Fener" / "Fenerbahce") = 0.9,
+    initials ("PSG" / "Paris Saint-Germain") = 0.85; otherwise the better of
+    the significant-word overlap and the difflib ratio, so that "Real Madrid"
+    only half-matches "Atletico Madrid".
+    """
+    q = _normalize(query)
+    c = _normalize(candidate)
+    if not q or not c:
+        return 0.0
+    if q == c:
+        return 1.0
+    if q in c or c in q:
+        return 0.9
+    c_words = c.split()
+    if len(q) <= 4 and " " not in q and len(c_words) > 1 and q == "".join(w[0] for w in c_words):
+        return 0.85
+    ratio = SequenceMatcher(None, q, c).ratio()
+    q_words = [w for w in q.split() if len(w) > 3]
+    if q_words:
+        overlap = sum(1 for w in q_words if w in c_words) / len(q_words)
+        if overlap:
+            return max(0.5 + 0.3 * overlap, ratio)
+    return ratio
+
+def _date_score(event_date, today):
+    days = (event_date - today).days
+    if days < 0:
+        return 0.0
+    return 1.0 / (1.0 + days / DATE_HALF_LIFE_DAYS)
+
+def score_event(home_name, away_name, event, today):
+    """
+    Returns a RankedMatch for one event, or None when the teams do not match
+    or the event date is unusable.
+    """
+    try:
+        event_date = date.fromisoformat(event.get("dateEvent") or "")
+    except ValueError:
+        return None
+
+    e_home = event.get("strHomeTeam") or ""
+    e_away = event.get("strAwayTeam") or ""
+
+    straight = (name_similarity(home_name, e_home), name_similarity(away_name, e_away))
+    swapped = (name_similarity(home_name, e_away), name_similarity(away_name, e_home))
+
+    straight_score = min(straight) if min(straight) >= MIN_TEAM_SIMILARITY else 0.0
+    swapped_score = min(swapped) * SWAPPED_PENALTY if min(swapped) >= MIN_TEAM_SIMILARITY else 0.0
+    if not straight_score and not swapped_score:
+        return None
+
+    is_swapped = swapped_score > straight_score
+    name_score = max(straight_score, swapped_score)
+    confidence = NAME_WEIGHT * name_score + DATE_WEIGHT * _date_score(event_date, today)
+    return RankedMatch(round(confidence, 4), event, is_swapped, event_date)
+
+def rank_candidates(home_name, away_name, events, today=None, min_confidence=MIN_CONFIDENCE):
+    """
+    Scores every event and returns RankedMatch tuples, best first.
+    Past events are dropped; duplicates (same idEvent) are scored once.
+    """
+    today = today or date.today()
+    ranked = []
+    seen = set()
+    for e in events:
+        event_id = e.get("idEvent")
+        if event_id in seen:
+            continue
+        seen.add(event_id)
+        r = score_event(home_name, away_name, e, today)
+        if r and r.event_date >= today and r.confidence >= min_confidence:
+            ranked.append(r)
+    ranked.sort(key=lambda r: (-r.confidence, r.event_date))
+    return ranked
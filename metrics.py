@@ -0,0 +1,305 @@
+import bisect
+import weakref
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+# Prometheus metin formatında metrikler (/metrics). Sıcak yolda kilit yok: her sayaç
+# iş parçacığı başına önceden ayrılmış bir dizi (shard) tutar, artırma sadece o
+# thread'in dizisine yazar; toplama sadece /metrics okunurken yapılır. Kilit yalnızca
+# yeni bir etiket kombinasyonu veya yeni bir thread ilk kez görüldüğünde alınır.
+# Diğer modüllerin stats() değerleri (önbellek isabetleri, kuyruk derinliği) okuma
+# anında collector fonksiyonlarıyla eklenir. Biten thread'in dizisi ana toplama
+# katlanıp bırakılır; kısa ömürlü thread havuzları dizi sayısını büyütmez.
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry = {}                  # ad -> metrik (kayıt sırası korunur)
+_collectors = []
+_lock = threading.Lock()
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+def _format_value(value):
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+class _ShardHolder:
+    # threading.local içinde tutulur; thread bitince silinir ve finalize tetiklenir
+    __slots__ = ("shard", "__weakref__")
+
+    def __init__(self, shard):
+        self.shard = shard
+
+class _Child:
+    __slots__ = ("_local", "_shards", "_base", "_size", "__weakref__")
+
+    def __init__(self, size):
+        self._local = threading.local()
+        self._shards = []
+        self._base = [0.0] * size     # bitmiş thread'lerden katlanan değerler
+        self._size = size
+
+    def _shard(self):
+        try:
+            return self._local.holder.shard
+        except AttributeError:
+            shard = [0.0] * self._size
+            holder = self._local.holder = _ShardHolder(shard)
+            weakref.finalize(holder, _retire, weakref.ref(self), shard)
+            with _lock:
+                self._shards.append(shard)
+            return shard
+
+    def _fold(self, shard):
+        with _lock:
+            for i, value in enumerate(shard):
+                self._base[i] += value
+            self._shards = [s for s in self._shards if s is not shard]
+
+    def _totals(self):
+        with _lock:
+            totals = list(self._base)
+            shards = list(self._shards)
+        for shard in shards:
+            for i, value in enumerate(shard):
+                totals[i] += value
+        return totals
+
+def _retire(child_ref, shard):
+    child = child_ref()
+    if child is not None:
+        child._fold(shard)
+
+class CounterChild(_Child):
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__(1)
+
+    def inc(self, amount=1):
+        self._shard()[0] += amount
+
+    def value(self):
+        return self._totals()[0]
+
+class HistogramChild(_Child):
+    # shard düzeni: [adet, toplam, kova_0 … kova_n, +Inf]
+    __slots__ = ("_buckets",)
+
+    def __init__(self, buckets):
+        super().__init__(3 + len(buckets))
+        self._buckets = buckets
+
+    def observe(self, value):
+        shard = self._shard()
+        shard[0] += 1
+        shard[1] += value
+        shard[2 + bisect.bisect_left(self._buckets, value)] += 1
+
+    @contextmanager
+    def time(self):
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(perf_counter() - start)
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._default = None if self.labelnames else self.labels()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        Returns the child for one label combination. Existing children
+        are a plain dict lookup; new ones are created once under a lock.
+        """
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: {len(self.labelnames)} etiket bekleniyor, {len(key)} verildi")
+            with _lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self):
+        for key, child in list(self._children.items()):
+            yield list(zip(self.labelnames, key)), child
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def render(self):
+        for labels, child in self._samples():
+            yield f"{self.name}{_format_labels(labels)} {_format_value(child.value())}"
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def render(self):
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, child in self._samples():
+            totals = child._totals()
+            cumulative = 0.0
+            for bound, count in zip(bounds, totals[2:]):
+                cumulative += count
+                yield f"{self.name}_bucket{_format_labels(labels + [('le', bound)])} {_format_value(cumulative)}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(totals[1])}"
+            yield f"{self.name}_count{_format_labels(labels)} {_format_value(totals[0])}"
+
+def _register(cls, name, documentation, labelnames, **kwargs):
+    with _lock:
+        metric = _registry.get(name)
+    if metric is not None:
+        return metric
+    metric = cls(name, documentation, labelnames, **kwargs)
+    with _lock:
+        return _registry.setdefault(name, metric)
+
+def counter(name, documentation, labelnames=()):
+    return _register(Counter, name, documentation, labelnames)
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return _register(Histogram, name, documentation, labelnames, buckets=buckets)
+
+def register_collector(func):
+    """
+    Adds a scrape-time callback returning [(name, type, help, [(labels
+    dict, value)])], for values other modules already keep in stats().
+    """
+    with _lock:
+        _collectors.append(func)
+    return func
+
+def render():
+    """Current metrics in Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        metrics = list(_registry.values())
+        collectors = list(_collectors)
+    lines = []
+    for metric in metrics:
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    for collect in collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            lines.append(f"# collector {getattr(collect, '__name__', '?')} hatası: {_escape(e)}")
+            continue
+        for name, kind, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                if value is not None:
+                    lines.append(f"{name}{_format_labels(sorted(labels.items()))} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# --- Süreçler arası aktarım ---
+# Render işçileri ve CLI ayrı süreçlerdir; sayaçları backend'in /metrics çıktısına
+# girmez. take_delta() son çağrıdan beri değişen serileri verir (işçi her işin sonucuyla,
+# CLI çıkışta event spool üzerinden gönderir), alan süreç merge() ile kendi serilerine ekler.
+_exported = {}                  # (ad, etiketler) -> son take_delta() anındaki toplamlar
+_export_lock = threading.Lock()
+
+def take_delta():
+    """
+    Changes of every series since the previous call in this process, as a
+    picklable and JSON-able list of [name, label values, totals delta].
+    """
+    with _lock:
+        metrics = list(_registry.values())
+    deltas = []
+    with _export_lock:
+        for metric in metrics:
+            for key, child in list(metric._children.items()):
+                totals = child._totals()
+                previous = _exported.get((metric.name, key)) or [0.0] * len(totals)
+                delta = [now - before for now, before in zip(totals, previous)]
+                if any(delta):
+                    deltas.append([metric.name, list(key), delta])
+                    _exported[(metric.name, key)] = totals
+    return deltas
+
+def merge(deltas):
+    """Adds another process's take_delta() output to this process's series."""
+    for name, key, delta in deltas or ():
+        with _lock:
+            metric = _registry.get(name)
+        if metric is None:
+            continue
+        child = metric.labels(*key)
+        if len(delta) != child._size:
+            continue
+        with _lock:
+            for i, value in enumerate(delta):
+                child._base[i] += value
+
+# --- Ortak metrikler (import anında ayrılır) ---
+OUTBOUND_SECONDS = histogram(
+    "macbot_outbound_request_duration_seconds", "Outbound API/HTTP call latency by host.", ("kind", "host"),
+)
+OUTBOUND_TOTAL = counter(
+    "macbot_outbound_requests_total", "Outbound API/HTTP calls by host and outcome.", ("kind", "host", "outcome"),
+)
+LOGO_SOURCE_TOTAL = counter(
+    "macbot_logo_source_attempts_total", "Logo source attempts by source and result.", ("source", "result"),
+)
+COMPRESS_BYTES_TOTAL = counter(
+    "macbot_compress_bytes_total", "Bytes before and after compression.", ("stage",),
+)
+COMPRESS_FILES_TOTAL = counter(
+    "macbot_compress_files_total", "Compressed files by result.", ("result",),
+)
+TEMPLATE_LOOKUPS_TOTAL = counter(
+    "macbot_psd_template_lookups_total", "PSD template cache lookups by result (hit, rehash, reload).", ("result",),
+)
+RENDER_SECONDS = histogram(
+    "macbot_render_duration_seconds", "Render job time from submit to result, by outcome.", ("outcome",),
+    buckets=(0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 180.0),
+)
+
+for _outcome in ("ok", "error"):
+    RENDER_SECONDS.labels(_outcome)
+    COMPRESS_FILES_TOTAL.labels(_outcome)
+for _stage in ("original", "compressed"):
+    COMPRESS_BYTES_TOTAL.labels(_stage)
+for _result in ("hit", "rehash", "reload"):
+    TEMPLATE_LOOKUPS_TOTAL.labels(_result)
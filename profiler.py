@@ -0,0 +1,215 @@
+import os
+import sys
+import time
+import atexit
+import pstats
+import cProfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from local_store import BASE_DIR
+
+# İsteğe bağlı profil alma. İki mod:
+#   cprofile : deterministik; .pstats dosyası + flamegraph için yaklaşık collapsed stack'ler
+#   sample   : örnekleme thread'i tüm thread'lerin stack'ini SAMPLE_INTERVAL aralıkla okur;
+#              profillenen kod yavaşlamaz, üretimde de açılabilir. Çıktı collapsed stack'ler.
+# Çıktılar profiles/ klasörüne yazılır; .collapsed dosyaları flamegraph.pl / speedscope
+# ile doğrudan açılabilir. Aynı anda tek profil alınır.
+PROFILES_DIR = os.getenv("MACBOT_PROFILES_DIR") or os.path.join(BASE_DIR, "profiles")
+MODES = ("cprofile", "sample")
+SAMPLE_INTERVAL = float(os.getenv("MACBOT_PROFILE_INTERVAL", "0.005"))
+MAX_DEPTH = 128
+TOP_N = 15
+
+class ProfilerBusy(Exception):
+    pass
+
+_active = threading.Lock()
+
+def _frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class Sampler:
+    """
+    Wall-clock stack sampler: collapsed stack -> sample count. The first
+    frame of every stack is the thread name.
+    """
+
+    def __init__(self, interval=SAMPLE_INTERVAL):
+        self.interval = interval
+        self.counts = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profiler_sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if frames.keys() - names.keys():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < MAX_DEPTH:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.append(names.get(ident, f"thread-{ident}"))
+                self.counts[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+def _func_label(func):
+    filename, line, name = func
+    if filename == "~":
+        return name
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+def pstats_to_collapsed(stats):
+    """
+    Approximate collapsed stacks from a cProfile: each function's own time
+    (µs) is attributed to the chain of its heaviest callers. cProfile does
+    not keep full stacks, so this is an estimate; use the sampler for exact
+    stacks.
+    """
+    entries = stats.stats
+    counts = Counter()
+    for func, (_, _, tottime, _, callers) in entries.items():
+        weight = int(tottime * 1_000_000)
+        if weight <= 0:
+            continue
+        stack, seen, current = [func], {func}, callers
+        while current and len(stack) < MAX_DEPTH:
+            parent = max(current, key=lambda caller: current[caller][3])
+            if parent in seen:
+                break
+            stack.append(parent)
+            seen.add(parent)
+            current = entries.get(parent, (None,) * 5)[4]
+        counts[";".join(_func_label(f) for f in reversed(stack))] += weight
+    return counts
+
+def _write_collapsed(path, counts):
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, count in counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+class Profile:
+    """
+    Result of one capture: `files` are the written paths, `top` the
+    hottest functions as (label, seconds or samples).
+    """
+
+    def __init__(self, label, mode):
+        self.label = label
+        self.mode = mode
+        self.started = time.time()
+        self.elapsed = None
+        self.files = []
+        self.top = []
+
+    def as_dict(self):
+        return {"label": self.label, "mode": self.mode, "elapsed": self.elapsed, "files": self.files, "top": self.top}
+
+def _base_path(label, mode):
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    safe = "".join(c if c.isalnum() or c in "-_" else "_" for c in label)
+    return os.path.join(PROFILES_DIR, f"{safe}-{time.strftime('%Y%m%d-%H%M%S')}-{mode}")
+
+def _save_cprofile(result, profiler):
+    base = _base_path(result.label, result.mode)
+    stats = pstats.Stats(profiler)
+    stats.dump_stats(base + ".pstats")
+    _write_collapsed(base + ".collapsed", pstats_to_collapsed(stats))
+    result.files = [base + ".pstats", base + ".collapsed"]
+    hottest = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:TOP_N]
+    result.top = [(_func_label(func), round(row[3], 4)) for func, row in hottest]
+
+def _save_samples(result, sampler):
+    base = _base_path(result.label, result.mode)
+    _write_collapsed(base + ".collapsed", sampler.counts)
+    result.files = [base + ".collapsed"]
+    # En çok görülen yaprak (o an çalışan) fonksiyonlar
+    leaves = Counter()
+    for stack, count in sampler.counts.items():
+        leaves[stack.rsplit(";", 1)[-1]] += count
+    result.top = leaves.most_common(TOP_N)
+
+@contextmanager
+def profile(label, mode="sample", interval=SAMPLE_INTERVAL, show=True):
+    """
+    Profiles the enclosed block and saves the output under profiles/.
+    cprofile mode only sees the calling thread (for async code: the event
+    loop thread); sample mode sees every thread. Raises ProfilerBusy when
+    another capture is running.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Geçersiz profil modu: {mode} (seçenekler: {', '.join(MODES)})")
+    if not _active.acquire(blocking=False):
+        raise ProfilerBusy("Başka bir profil alınıyor")
+    result = Profile(label, mode)
+    start = time.perf_counter()
+    try:
+        if mode == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield result
+            finally:
+                profiler.disable()
+                result.elapsed = round(time.perf_counter() - start, 3)
+                _save_cprofile(result, profiler)
+        else:
+            sampler = Sampler(interval)
+            sampler.start()
+            try:
+                yield result
+            finally:
+                sampler.stop()
+                result.elapsed = round(time.perf_counter() - start, 3)
+                _save_samples(result, sampler)
+    finally:
+        _active.release()
+    if show:
+        print_report(result)
+
+def print_report(result):
+    unit = "sn (kümülatif)" if result.mode == "cprofile" else "örnek"
+    print(f"\n🔬 Profil: {result.label} ({result.mode}, {result.elapsed} sn)")
+    for label, value in result.top:
+        print(f"   {value:>10} {unit}  {label}")
+    for path in result.files:
+        print(f"   💾 {path}")
+
+def mode_from_args(argv):
+    """
+    CLI profiling switch: "--profile" (sample), "--profile=cprofile", or
+    the MACBOT_PROFILE environment variable. Returns the mode or None.
+    """
+    for arg in argv:
+        if arg == "--profile":
+            return "sample"
+        if arg.startswith("--profile="):
+            return arg.split("=", 1)[1]
+    return os.getenv("MACBOT_PROFILE") or None
+
+def start(label, mode="sample"):
+    """
+    Starts a capture that ends at interpreter exit (for scripts whose main
+    flow may call sys.exit). Returns the Profile.
+    """
+    context = profile(label, mode)
+    result = context.__enter__()
+    atexit.register(context.__exit__, None, None, None)
+    return result
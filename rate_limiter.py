@@ -0,0 +1,225 @@
+import re
+import time
+import heapq
+import random
+import asyncio
+import threading
+import itertools
+import contextlib
+import contextvars
+import urllib.parse
+
+# Host bazlı, kendini ayarlayan token-bucket zamanlayıcı.
+# - Her host için saniyede `rate` token, en fazla `burst` birikir.
+# - 429/403 gelince hız yarıya iner ve üstel geri çekilme (jitter'lı) uygulanır;
+#   başarılı çağrılarla hız yavaşça tekrar artar (AIMD).
+# - Bekleyenler öncelik sırasına göre geçer: arayüzden gelen istekler toplu ön-yüklemenin önüne geçer.
+
+INTERACTIVE = 0
+NORMAL = 5
+BULK = 10
+
+THROTTLE_STATUSES = (429, 403)
+
+# Varsayılan limitler (istek/sn, burst). Listede olmayan hostlar sınırlanmaz.
+DEFAULT_LIMITS = {
+    "www.thesportsdb.com": (1.0, 10),   # Ücretsiz key dakikada ~30-100 istek
+    "duckduckgo.com": (0.5, 2),         # DDG arama / görsel arama
+}
+
+MIN_RATE = 0.05
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 60.0
+RECOVERY_STEP = 0.05        # her başarılı çağrıda eklenen istek/sn
+POLL_INTERVAL = 0.05        # sıradaki olmayan bekleyenlerin kontrol aralığı
+
+_priority = contextvars.ContextVar("rate_limit_priority", default=NORMAL)
+
+@contextlib.contextmanager
+def priority(level):
+    """
+    Sets the scheduling priority for calls made inside the block (also
+    inherited by asyncio tasks and asyncio.to_thread workers started in it).
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def status_from_error(exc):
+    """
+    Extracts an HTTP status from an exception: urllib HTTPError.code,
+    requests' response.status_code, or a 429/403 mentioned in the message
+    (DDG raises RatelimitException("... 403 Ratelimit")).
+    """
+    code = getattr(exc, "code", None) or getattr(getattr(exc, "response", None), "status_code", None)
+    if isinstance(code, int):
+        return code
+    text = str(exc).lower()
+    if "ratelimit" in text or "rate limit" in text:
+        return 429
+    m = re.search(r"\b(429|403)\b", text)
+    return int(m.group(1)) if m else None
+
+def retry_after_from_error(exc):
+    headers = getattr(exc, "headers", None) or getattr(getattr(exc, "response", None), "headers", None)
+    try:
+        return float(headers.get("Retry-After")) if headers and headers.get("Retry-After") else None
+    except (TypeError, ValueError):
+        return None
+
+class HostLimiter:
+    def __init__(self, host, rate, burst):
+        self.host = host
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.backoff_until = 0.0
+        self.failures = 0
+        self.throttled = 0
+        self._waiters = []                  # heap: (priority, seq)
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def _enqueue(self, level):
+        ticket = (level, next(self._seq))
+        with self._lock:
+            heapq.heappush(self._waiters, ticket)
+        return ticket
+
+    def _cancel(self, ticket):
+        with self._lock:
+            if ticket in self._waiters:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+
+    def _try_take(self, ticket):
+        """Returns 0 when the ticket got a token, otherwise seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if self._waiters[0] != ticket:
+                return POLL_INTERVAL
+            if now < self.backoff_until:
+                return self.backoff_until - now
+            self._refill(now)
+            if self.tokens >= 1:
+                self.tokens -= 1
+                heapq.heappop(self._waiters)
+                return 0
+            return (1 - self.tokens) / self.rate
+
+    async def acquire(self, level=None):
+        """
+        Waits (without blocking the event loop) until a request may be sent.
+        """
+        ticket = self._enqueue(_priority.get() if level is None else level)
+        granted = False
+        try:
+            while True:
+                wait = self._try_take(ticket)
+                if wait == 0:
+                    granted = True
+                    return
+                await asyncio.sleep(wait)
+        finally:
+            if not granted:
+                self._cancel(ticket)
+
+    def acquire_sync(self, level=None):
+        """
+        Blocking variant for code that already runs in a worker thread
+        (download_logos, sync smart_agent calls).
+        """
+        ticket = self._enqueue(_priority.get() if level is None else level)
+        granted = False
+        try:
+            while True:
+                wait = self._try_take(ticket)
+                if wait == 0:
+                    granted = True
+                    return
+                time.sleep(wait)
+        finally:
+            if not granted:
+                self._cancel(ticket)
+
+    def report(self, status, retry_after=None):
+        """
+        Feeds a response status back: 429/403 halve the rate and start an
+        exponential backoff with jitter, 2xx/3xx slowly restore it. Other
+        errors (e.g. a host stuck on 500) leave the rate unchanged.
+        """
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                self.failures += 1
+                self.throttled += 1
+                self.rate = max(MIN_RATE, self.rate / 2)
+                delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (self.failures - 1))
+                delay = max(delay, retry_after or 0) + random.uniform(0, delay / 2)
+                self.backoff_until = time.monotonic() + delay
+                self.tokens = 0
+            elif status is not None and status < 400:
+                self.failures = 0
+                self.rate = min(self.max_rate, self.rate + RECOVERY_STEP)
+
+    def report_error(self, exc):
+        self.report(status_from_error(exc), retry_after_from_error(exc))
+
+    def stats(self):
+        with self._lock:
+            return {
+                "rate": round(self.rate, 3),
+                "max_rate": self.max_rate,
+                "waiting": len(self._waiters),
+                "throttled": self.throttled,
+                "backoff_s": round(max(0.0, self.backoff_until - time.monotonic()), 2),
+            }
+
+class _Unlimited:
+    """Stand-in for hosts without a configured limit."""
+    async def acquire(self, level=None):
+        return
+
+    def acquire_sync(self, level=None):
+        return
+
+    def report(self, status, retry_after=None):
+        pass
+
+    def report_error(self, exc):
+        pass
+
+_UNLIMITED = _Unlimited()
+_limiters = {}
+_registry_lock = threading.Lock()
+
+def configure(host, rate, burst):
+    """Sets (or replaces) the limit for a host."""
+    with _registry_lock:
+        _limiters[host] = HostLimiter(host, rate, burst)
+        return _limiters[host]
+
+def for_host(host):
+    host = (host or "").lower()
+    limiter = _limiters.get(host)
+    if limiter is None and host in DEFAULT_LIMITS:
+        with _registry_lock:
+            limiter = _limiters.get(host)
+            if limiter is None:
+                limiter = _limiters[host] = HostLimiter(host, *DEFAULT_LIMITS[host])
+    return limiter or _UNLIMITED
+
+def for_url(url):
+    return for_host(urllib.parse.urlsplit(url).netloc)
+
+def stats():
+    with _registry_lock:
+        limiters = dict(_limiters)
+    return {host: limiter.stats() for host, limiter in limiters.items()}
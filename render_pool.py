@@ -0,0 +1,309 @@
+import os
+import sys
+import time
+import uuid
+import queue
+import shutil
+import threading
+import importlib
+import multiprocessing as mp
+from concurrent.futures import Future
+
+import metrics
+from local_store import BASE_DIR
+
+# Render işçi havuzu: N ayrı süreç, her biri render fonksiyonunu (ve modüllerini) bir kez
+# yükleyip ortak kuyruktan iş çeker. Her iş kendi scratch klasöründe çalışır, böylece
+# eşzamanlı render'lar aynı psd_otomasyon.jsx dosyası üzerinde yarışmaz. Ana süreç
+# işçilerin nabzını izler; çöken veya takılan işçi yeniden başlatılır.
+SCRATCH_ROOT = os.path.join(BASE_DIR, "render_scratch")
+DEFAULT_TARGET = "automation_engine:render_match_psd"
+DEFAULT_WARMUP = "template_cache:preload"     # işçi açılışında PSD şablonları belleğe alınır
+
+DEFAULT_WORKERS = int(os.getenv("MACBOT_RENDER_WORKERS", "0")) or min(4, os.cpu_count() or 1)
+QUEUE_SIZE = 16              # bekleyen iş sınırı; dolunca submit() RenderPoolBusy fırlatır
+HEARTBEAT_INTERVAL = 1.0     # işçinin nabız yazma aralığı (sn)
+HEARTBEAT_TIMEOUT = 10.0     # bu kadar nabız gelmezse işçi takılmış sayılır
+JOB_TIMEOUT = 180.0          # tek bir işin azami süresi
+SCRATCH_TTL = 600            # Photoshop JSX'i geç okuyabilir; scratch klasörleri bu kadar saklanır
+MAX_RESTARTS = 20            # havuz ömrü boyunca izin verilen yeniden başlatma
+
+class RenderPoolBusy(Exception):
+    pass
+
+class RenderWorkerError(Exception):
+    pass
+
+def _heartbeat(beat):
+    while True:
+        beat.value = time.time()
+        time.sleep(HEARTBEAT_INTERVAL)
+
+def _prune_scratch(root, now):
+    try:
+        entries = os.listdir(root)
+    except OSError:
+        return
+    for name in entries:
+        path = os.path.join(root, name)
+        try:
+            if now - os.path.getmtime(path) > SCRATCH_TTL:
+                shutil.rmtree(path, ignore_errors=True)
+        except OSError:
+            pass
+
+def _resolve(spec):
+    module_name, func_name = spec.split(":")
+    return getattr(importlib.import_module(module_name), func_name)
+
+def _worker_main(slot, target, warmup, jobs, results, state, sys_path, scratch_root):
+    beat, current, started = state
+    sys.path[:] = sys_path
+    threading.Thread(target=_heartbeat, args=(beat,), daemon=True).start()
+    # Sıcak başlangıç: render fonksiyonu, bağımlılıkları ve şablonlar işten önce yüklenir
+    func = _resolve(target)
+    if warmup:
+        try:
+            _resolve(warmup)()
+        except Exception as e:
+            print(f"⚠️ Render işçisi {slot} ısınma hatası: {e}")
+    # Isınmada sayılanlar (şablon yüklemeleri) da ana sürecin /metrics'ine aktarılır
+    results.put(("ready", slot, os.getpid(), metrics.take_delta()))
+
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+        job_id, args, kwargs = job
+        # Paylaşılan bellek (kuyruk değil): işçi aniden ölse de ana süreç hangi işin yarıda kaldığını bilir
+        current.value = job_id.encode()
+        started.value = time.time()
+        scratch = os.path.join(scratch_root, f"job-{job_id}")
+        os.makedirs(scratch, exist_ok=True)
+        try:
+            outcome = (True, func(*args, scratch_dir=scratch, **kwargs))
+        except Exception as e:
+            outcome = (False, f"{type(e).__name__}: {e}")
+        # İşin ürettiği sayaç değişimleri (logo kaynakları, dış çağrılar, şablon isabetleri) sonuçla gider
+        results.put(("done", slot, job_id, outcome + (metrics.take_delta(),)))
+        started.value = 0.0
+        _prune_scratch(scratch_root, time.time())
+
+class _Slot:
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.beat = None
+        self.current = None      # işlenen işin ID'si (işçi yazar)
+        self.started = None      # işin başlama zamanı, boşta 0
+        self.ready = False
+        self.restarts = 0
+        self.disabled = False
+
+class RenderPool:
+    """
+    submit(*args, **kwargs) -> concurrent.futures.Future of target(*args,
+    scratch_dir=..., **kwargs) run in a worker process.
+    """
+
+    def __init__(self, target=DEFAULT_TARGET, workers=DEFAULT_WORKERS, queue_size=QUEUE_SIZE,
+                 scratch_root=SCRATCH_ROOT, warmup=DEFAULT_WARMUP):
+        self.target = target
+        self.warmup = warmup
+        self.queue_size = queue_size
+        self.scratch_root = scratch_root
+        self._ctx = mp.get_context("spawn")
+        self._jobs = self._ctx.Queue(maxsize=queue_size)
+        self._results = self._ctx.Queue()
+        self._slots = [_Slot(i) for i in range(max(1, workers))]
+        self._pending = {}           # job_id -> (Future, gönderim zamanı)
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopping = False
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    # --- Yaşam döngüsü ---
+    def start(self):
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+        os.makedirs(self.scratch_root, exist_ok=True)
+        for slot in self._slots:
+            self._spawn(slot)
+        threading.Thread(target=self._collect, name="render_pool_results", daemon=True).start()
+        threading.Thread(target=self._monitor, name="render_pool_monitor", daemon=True).start()
+        return self
+
+    def _spawn(self, slot):
+        slot.beat = self._ctx.Value("d", time.time(), lock=False)
+        slot.current = self._ctx.Array("c", 16, lock=False)
+        slot.started = self._ctx.Value("d", 0.0, lock=False)
+        slot.ready = False
+        slot.process = self._ctx.Process(
+            target=_worker_main,
+            args=(slot.index, self.target, self.warmup, self._jobs, self._results,
+                  (slot.beat, slot.current, slot.started), list(sys.path), self.scratch_root),
+            name=f"render_worker_{slot.index}",
+            daemon=True,
+        )
+        slot.process.start()
+
+    def shutdown(self, timeout=5.0):
+        self._stopping = True
+        for _ in self._slots:
+            try:
+                self._jobs.put_nowait(None)
+            except queue.Full:
+                break
+        deadline = time.time() + timeout
+        for slot in self._slots:
+            if slot.process is not None:
+                slot.process.join(max(0.0, deadline - time.time()))
+                if slot.process.is_alive():
+                    slot.process.terminate()
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for fut, _ in pending.values():
+            if not fut.done():
+                fut.set_exception(RenderWorkerError("Render havuzu kapatıldı"))
+
+    # --- İş gönderme ---
+    def submit(self, *args, timeout=None, **kwargs):
+        """
+        Queues a job. With timeout=None a full queue raises RenderPoolBusy
+        immediately (backpressure); otherwise waits up to `timeout` seconds.
+        """
+        if not self._started:
+            self.start()
+        job_id = uuid.uuid4().hex[:12]
+        fut = Future()
+        with self._lock:
+            self._pending[job_id] = (fut, time.monotonic())
+        try:
+            if timeout is None:
+                self._jobs.put_nowait((job_id, args, kwargs))
+            else:
+                self._jobs.put((job_id, args, kwargs), timeout=timeout)
+        except queue.Full:
+            with self._lock:
+                self._pending.pop(job_id, None)
+                self.rejected += 1
+            raise RenderPoolBusy(f"Render kuyruğu dolu ({self.queue_size} iş bekliyor)")
+        with self._lock:
+            self.submitted += 1
+        return fut
+
+    def render(self, *args, timeout=JOB_TIMEOUT, **kwargs):
+        return self.submit(*args, timeout=timeout, **kwargs).result(timeout)
+
+    # --- Sonuçlar ve sağlık kontrolü ---
+    def _finish(self, job_id, ok, value, deltas=None):
+        metrics.merge(deltas)
+        with self._lock:
+            entry = self._pending.pop(job_id, None)
+            if entry is None:
+                return
+            fut, submitted = entry
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        metrics.RENDER_SECONDS.labels("ok" if ok else "error").observe(time.monotonic() - submitted)
+        if fut.done():
+            return
+        if ok:
+            fut.set_result(value)
+        else:
+            fut.set_exception(RenderWorkerError(value))
+
+    def _collect(self):
+        while not self._stopping:
+            try:
+                kind, slot_index, a, b = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            if kind == "ready":
+                self._slots[slot_index].ready = True
+                metrics.merge(b)
+            elif kind == "done":
+                self._finish(a, *b)
+
+    def _monitor(self):
+        while not self._stopping:
+            time.sleep(HEARTBEAT_INTERVAL)
+            now = time.time()
+            for slot in self._slots:
+                if self._stopping:
+                    return
+                if slot.disabled:
+                    continue
+                process = slot.process
+                reason = None
+                if process is None or not process.is_alive():
+                    reason = f"süreç sonlandı (kod {process.exitcode if process else '?'})"
+                elif now - slot.beat.value > HEARTBEAT_TIMEOUT:
+                    reason = "nabız alınamıyor"
+                elif slot.started.value and now - slot.started.value > JOB_TIMEOUT:
+                    reason = f"iş {JOB_TIMEOUT:.0f} sn'yi aştı"
+                if reason:
+                    self._restart(slot, reason)
+
+    def _restart(self, slot, reason):
+        job_id = slot.current.value.decode() if slot.started.value else None
+        print(f"⚠️ Render işçisi {slot.index} yeniden başlatılıyor: {reason}")
+        if slot.process is not None and slot.process.is_alive():
+            slot.process.terminate()
+            slot.process.join(2.0)
+        if job_id:
+            self._finish(job_id, False, f"İşçi {slot.index} çöktü: {reason}")
+        if sum(s.restarts for s in self._slots) >= MAX_RESTARTS:
+            print("❌ Render havuzu: yeniden başlatma sınırı aşıldı, işçi kapalı bırakılıyor.")
+            slot.disabled = True
+            return
+        slot.restarts += 1
+        self._spawn(slot)
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            pending = len(self._pending)
+            counts = {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+        busy = sum(1 for s in self._slots if s.started and s.started.value)
+        return {
+            **counts,
+            "queued": max(0, pending - busy),
+            "workers": [
+                {
+                    "index": s.index,
+                    "pid": s.process.pid if s.process else None,
+                    "alive": bool(s.process and s.process.is_alive()) and not s.disabled,
+                    "ready": s.ready,
+                    "busy": bool(s.started and s.started.value),
+                    "heartbeat_age": round(now - s.beat.value, 1) if s.beat else None,
+                    "restarts": s.restarts,
+                }
+                for s in self._slots
+            ],
+        }
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_render_pool():
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = RenderPool()
+    return _pool
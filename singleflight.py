@@ -0,0 +1,116 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+# Aynı anda yapılan özdeş istekleri tek bir uçuşta birleştirir (single-flight).
+# İlk çağıran (lider) işi yapar; aynı anahtarla gelen diğerleri onun sonucunu bekler.
+# Sonuç önbelleğe alınmaz: iş bittiği an anahtar serbest kalır.
+# Bekleyen birinin iptali ortak işi etkilemez; lider iptal edilirse iptal diğerlerine
+# aktarılmaz, bekleyenlerden biri anahtarı devralıp işi kendisi yapar.
+
+_registry = {}
+
+class _LeaderGone(Exception):
+    """Set on a flight whose leader was cancelled; followers claim the key again."""
+
+class SingleFlight:
+    def __init__(self, name):
+        self.name = name
+        self._inflight = {}   # key -> concurrent.futures.Future
+        self._lock = threading.Lock()
+        self.calls = 0        # toplam çağrı
+        self.executed = 0     # gerçekten çalıştırılan iş
+        _registry[name] = self
+
+    @property
+    def shared(self):
+        """Calls that were served by another caller's in-flight request."""
+        return self.calls - self.executed
+
+    def _claim(self, key, retry=False):
+        with self._lock:
+            if not retry:
+                self.calls += 1
+            fut = self._inflight.get(key)
+            if fut is not None:
+                return fut, False
+            fut = Future()
+            self._inflight[key] = fut
+            self.executed += 1
+            return fut, True
+
+    def _finish(self, key, fut, result=None, exc=None):
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+        if fut.done():
+            return
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    async def do(self, key, coro_fn):
+        """
+        Awaits `coro_fn()` once per key across all concurrent callers, even
+        callers running on different event loops (sync wrappers use their own).
+        """
+        retry = False
+        while True:
+            fut, leader = self._claim(key, retry)
+            if leader:
+                break
+            try:
+                # shield: bu çağıranın iptali ortak Future'ı (ve diğer bekleyenleri) iptal etmesin
+                return await asyncio.shield(asyncio.wrap_future(fut))
+            except _LeaderGone:
+                retry = True
+        try:
+            result = await coro_fn()
+        except Exception as e:
+            self._finish(key, fut, exc=e)
+            raise
+        except BaseException:
+            self._finish(key, fut, exc=_LeaderGone())
+            raise
+        self._finish(key, fut, result)
+        return result
+
+    def do_sync(self, key, fn):
+        """
+        Thread-based counterpart of do() for blocking callers (logo downloads).
+        """
+        retry = False
+        while True:
+            fut, leader = self._claim(key, retry)
+            if leader:
+                break
+            try:
+                return fut.result()
+            except _LeaderGone:
+                retry = True
+        try:
+            result = fn()
+        except Exception as e:
+            self._finish(key, fut, exc=e)
+            raise
+        except BaseException:
+            self._finish(key, fut, exc=_LeaderGone())
+            raise
+        self._finish(key, fut, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "executed": self.executed,
+                "saved": self.calls - self.executed,
+                "inflight": len(self._inflight),
+            }
+
+def stats():
+    """
+    Metrics for every single-flight group, e.g. {"sports_api": {"calls": 12, "saved": 4, ...}}.
+    """
+    return {name: flight.stats() for name, flight in _registry.items()}
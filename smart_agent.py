@@ -1,125 +1,166 @@
 
 import os
 import json
+import asyncio
 import datetime
 import re
-from duckduckgo_search import DDGS
+import hashlib
+from functools import lru_cache
 
-# Opsiyonel: OpenAI ve Gemini importları
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
+import ai_cache
+import http_replay
+import rate_limiter
+import time_extractor
+import tracer
+from lazy_imports import lazy
 
-try:
-    import google.generativeai as genai
-except ImportError:
-    genai = None
+# Ağır paketler ilk kullanımda yüklenir (backend açılışını yavaşlatmasın)
+duckduckgo_search = lazy("duckduckgo_search")
+
+# Opsiyonel: OpenAI ve Gemini (yüklü değilse `if not openai:` False döner)
+openai = lazy("openai", optional=True)
+genai = lazy("google.generativeai", optional=True)
+
+def _ddg_text(query, max_results, backend=None):
+    """
+    DDGS().text çağrısı (http_replay üzerinden kaydedilebilir).
+    Sabit sleep yerine host limiter'ı bekler; 403/Ratelimit hatası limiter'ı yavaşlatır.
+    """
+    kwargs = {"backend": backend} if backend else {}
+    key = f"duckduckgo.com|text|{backend or 'auto'}|{max_results}|{query}"
+    limiter = rate_limiter.for_host("duckduckgo.com")
+    limiter.acquire_sync()
+    try:
+        results = http_replay.session().call("ddg", key, lambda: duckduckgo_search.DDGS().text(query, max_results=max_results, **kwargs))
+    except Exception as e:
+        limiter.report_error(e)
+        raise
+    limiter.report(200)
+    return results
+
+def _llm_key(provider, model, *parts):
+    digest = hashlib.sha1("\x00".join(parts).encode("utf-8")).hexdigest()
+    return f"{provider}|{model}|{digest}"
+
+# İstemciler API key başına bir kez oluşturulur (her maçta yeni OpenAI(...) / genai.configure yok)
+GEMINI_MODEL = "gemini-2.0-flash"
+OPENAI_MODEL = "gpt-4o"
+
+@lru_cache(maxsize=4)
+def _openai_client(api_key):
+    return openai.OpenAI(api_key=api_key)
+
+@lru_cache(maxsize=4)
+def _async_openai_client(api_key):
+    return openai.AsyncOpenAI(api_key=api_key)
+
+@lru_cache(maxsize=4)
+def _gemini_model(api_key, model_name=GEMINI_MODEL):
+    # genai.configure süreç genelidir; aynı key ile tekrar çağırmaya gerek yok
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel(model_name)
 
 def safe_search(query, max_results=5):
     """
     DuckDuckGo üzerinden güvenli arama yapar.
     Hata durumunda veya sonuç yoksa farklı varyasyonları dener.
+    Denemeler arası bekleme rate_limiter tarafından yönetilir.
     """
-    from time import sleep
-    
     # 1. İlk Deneme (Standart)
     try:
-        results = DDGS().text(query, max_results=max_results)
+        results = _ddg_text(query, max_results)
         if results: return results
     except Exception as e:
         print(f"⚠️ Arama hatası (Standart): {e}")
 
-    sleep(1)
-
     # 2. İkinci Deneme (Backend: html - daha yavaş ama bazen daha stabil)
     try:
-        results = DDGS().text(query, max_results=max_results, backend='html')
+        results = _ddg_text(query, max_results, backend='html')
         if results: return results
     except Exception as e:
         print(f"⚠️ Arama hatası (HTML Backend): {e}")
         
     return []
 
-def heuristic_parse_match_time(search_results):
+def heuristic_parse_match_time(search_results, home_team=None, away_team=None):
+    """
+    Yerel (LLM'siz) tarih/saat çıkarımı; bkz. time_extractor.
+    Takım isimleri verilirse başka maçlara ait saatler elenir.
+    Returns (time, date).
+    """
     print("⚠️ AI kullanılamadı, arama sonuçları manuel analiz ediliyor...")
+    result = time_extractor.extract_match_time(home_team, away_team, search_results)
     
-    # Saat Regex (HH:MM)
-    time_pattern = re.compile(r'\b([0-1]?[0-9]|2[0-3]):([0-5][0-9])\b')
-    
-    # Tarih Regex (DD Mod) - Türkçe ve İngilizce Aylar
-    months_str = "Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec|January|February|March|April|June|July|August|September|October|November|December|Ocak|Şubat|Mart|Nisan|Mayıs|Haziran|Temmuz|Ağustos|Eylül|Ekim|Kasım|Aralık"
-    date_pattern = re.compile(r'\b([1-9]|[12][0-9]|3[01])\s+(' + months_str + r')\b', re.IGNORECASE)
-    
-    found_time = None
-    found_date = None
-    
-    for r in search_results:
-        text = (r['title'] + " " + r['body'])
-        
-        # Saat Ara
-        if not found_time:
-            t_match = time_pattern.search(text)
-            if t_match:
-                found_time = t_match.group(0)
-        
-        # Tarih Ara
-        if not found_date:
-            d_match = date_pattern.search(text)
-            if d_match:
-                day, month = d_match.groups()
-                # Ay ismini Türkçeye/Büyük harfe çevir (Basit mapping)
-                tr_map = {
-                    "jan": "OCAK", "january": "OCAK",
-                    "feb": "ŞUBAT", "february": "ŞUBAT",
-                    "mar": "MART", "march": "MART",
-                    "apr": "NİSAN", "april": "NİSAN",
-                    "may": "MAYIS",
-                    "jun": "HAZİRAN", "june": "HAZİRAN",
-                    "jul": "TEMMUZ", "july": "TEMMUZ",
-                    "aug": "AĞUSTOS", "august": "AĞUSTOS",
-                    "sep": "EYLÜL", "september": "EYLÜL",
-                    "oct": "EKİM", "october": "EKİM",
-                    "nov": "KASIM", "november": "KASIM",
-                    "dec": "ARALIK", "december": "ARALIK"
-                }
-                m_lower = month.lower()
-                final_month = tr_map.get(m_lower, month.upper())
-                found_date = f"{day} {final_month}"
-        
-        if found_time and found_date:
-            break
-            
-    if found_time or found_date:
-        print(f"🤖 Manuel Analiz Sonucu: Tarih={found_date}, Saat={found_time}")
-        return found_time, found_date
+    if result.time or result.date:
+        print(f"🤖 Manuel Analiz Sonucu: Tarih={result.date}, Saat={result.time} (güven {result.confidence:.2f})")
+        return result.time, result.date
     
     return None, None
 
-def ask_gpt_for_match_time(home_team, away_team, api_key):
+# Sorgu varyasyonları: İngilizce, Türkçe ve çok basit sorgu
+def _query_variants(home_team, away_team):
+    return [
+        f"{home_team} vs {away_team} match date time 2026 fixture",
+        f"{home_team} {away_team} maç tarihi saati 2026",
+        f"{home_team} {away_team} match",
+    ]
+
+def _context_text(search_results):
+    return "\n".join([f"- {r['title']}: {r['body']}" for r in search_results])
+
+# Cevap güven değerleri (ai_cache ile birlikte saklanır); yerel çıkarımın güveni time_extractor'dan gelir
+LLM_CONFIDENCE = 0.7
+LLM_REASONED_CONFIDENCE = 0.8
+
+def _answer(date_str, time_str, source, confidence, reason="", snippets=None):
+    return {
+        "date": date_str, "time": time_str, "source": source,
+        "confidence": confidence, "reason": reason, "snippets": snippets or [],
+    }
+
+def _heuristic_answer(search_results, home_team=None, away_team=None):
+    result = time_extractor.extract_match_time(home_team, away_team, search_results)
+    confidence = result.confidence if result.date and result.time else 0.0
+    return _answer(result.date, result.time, "heuristic", confidence, snippets=search_results)
+
+def _local_answer(home_team, away_team, search_results):
     """
-    OpenAI API kullanarak verilen maçın tarih ve saatini bulur.
+    Returns the extractor's answer when it is confident enough to skip
+    the LLM call, otherwise None.
     """
-    if not OpenAI:
-        print("❌ OpenAI paketi yüklü değil.")
-        return None, None
+    result = time_extractor.extract_match_time(home_team, away_team, search_results)
+    if result.date and result.time and result.confidence >= time_extractor.CONFIDENT:
+        print(f"⚡ Yerel çıkarım yeterli: {result.date} {result.time} (güven {result.confidence:.2f}, {result.votes} oy)")
+        return _answer(result.date, result.time, "extractor", result.confidence, snippets=search_results)
+    return None
 
-    # 1. İnternet Araması
-    query = f"{home_team} vs {away_team} match date time 2026 fixture"
-    print(f"🤖 İnternet taranıyor (OpenAI Modu): '{query}'...")
-    
-    search_results = safe_search(query, max_results=5)
-    
-    if not search_results:
+def _llm_answer(data, source, search_results, home_team=None, away_team=None):
+    d = (data.get("date") or "").strip()
+    t = (data.get("time") or "").strip()
+    reason = (data.get("reason") or "").strip()
+    if not d or not t:
+        print(f"⚠️ {source} tarih veya saati bulamadı.")
+        return _heuristic_answer(search_results, home_team, away_team)
+    confidence = LLM_REASONED_CONFIDENCE if reason else LLM_CONFIDENCE
+    return _answer(d, t, source, confidence, reason, search_results)
+
+def _cached_date_time(home_team, away_team):
+    entry = ai_cache.get_answer_cache().get(home_team, away_team)
+    if entry is None:
+        return None
+    print(f"💾 AI önbelleğinden: {home_team} vs {away_team} -> {entry['date']} {entry['time']} ({entry['source']})")
+    return entry["date"], entry["time"]
+
+def _remember(home_team, away_team, answer):
+    # answer None ise (paket yok vb.) önbelleğe yazılmaz
+    if answer is None:
         return None, None
+    cache = ai_cache.get_answer_cache()
+    cache.put(home_team, away_team, answer)
+    cache.save()
+    return answer["date"], answer["time"]
 
-    context_text = "\n".join([f"- {r['title']}: {r['body']}" for r in search_results])
-    
-    # 2. OpenAI Parse İşlemi
-    try:
-        client = OpenAI(api_key=api_key)
-        
-        system_prompt = """
+OPENAI_SYSTEM_PROMPT = """
         Sen uzman bir spor asistanısın. Görevin, sana verilen arama sonuçlarını analiz ederek 
         belirtilen futbol maçının TARİHİNİ ve SAATİNİ (Türkiye Saati - TSİ/TRT) bulmaktır.
         
@@ -134,115 +175,516 @@ def ask_gpt_for_match_time(home_team, away_team, api_key):
         - Saat formatı: HH:MM.
         - Türkiye saatini hesapla (gerekirse +3 ekle).
         """
+
+def _openai_messages(home_team, away_team, search_results):
+    user_prompt = f"Maç: {home_team} vs {away_team}\n\nArama Sonuçları:\n{_context_text(search_results)}"
+    return [
+        {"role": "system", "content": OPENAI_SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+
+def _gemini_prompt(home_team, away_team, search_results):
+    return f"""
+        Sen uzman bir spor asistanısın. Aşağıdaki arama sonuçlarına bakarak
+        {home_team} vs {away_team} maçının BUGÜN (Varsayıyoruz ki bugün 10 OCAK 2026) oynanıp oynanmadığını kontrol et.
+        Sadece bugünün maçını arıyoruz.
+
+        Eğer bugüne ait (10 Ocak 2026) bir maç varsa saatini TSİ olarak ver.
+        Eğer maç başka bir gündeyse (örneğin Şubat, Nisan vb.), tarih ve saati BOŞ bırak.
         
-        user_prompt = f"Maç: {home_team} vs {away_team}\n\nArama Sonuçları:\n{context_text}"
+        ÖNEMLİ: Sadece JSON formatında yanıt ver. Başka bir şey yazma.
         
-        response = client.chat.completions.create(
-            model="gpt-4o", 
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            response_format={ "type": "json_object" },
-            temperature=0
-        )
+        JSON Formatı:
+        {{
+            "date": "GÜN AY_İSMİ", 
+            "time": "HH:MM",
+            "reason": "Neden bu tarihi seçtin?"
+        }}
         
-        content = response.choices[0].message.content
-        data = json.loads(content)
+        Örnek: {{ "date": "10 OCAK", "time": "20:00", "reason": "TFF sitesinde 10 Ocak yazıyor" }}
+        Not: Ay ismi Türkçe ve BÜYÜK HARF olmalı. Saat Türkiye saati olmalı.
+
+        Arama Sonuçları:
+        {_context_text(search_results)}
+        """
+
+def _parse_gemini_text(text, search_results, home_team=None, away_team=None):
+    print(f"DEBUG: Gemini Yanıtı: {text}")
+    
+    # JSON temizliği (Gemini markdown ```json ... ``` dönebilir)
+    text = text.replace("```json", "").replace("```", "").strip()
+    
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+         # Bazen düz metin dönebilir, basitçe regex ile ayıklamayı dene veya hata ver
+         print("⚠️ Gemini JSON döndürmedi.")
+         return _heuristic_answer(search_results, home_team, away_team)
+    
+    return _llm_answer(data, "gemini", search_results, home_team, away_team)
+
+@tracer.traced("ai_fallback", provider="openai")
+def ask_gpt_for_match_time(home_team, away_team, api_key):
+    """
+    OpenAI API kullanarak verilen maçın tarih ve saatini bulur.
+    Returns (date, time); answers are cached in ai_cache.
+    """
+    cached = _cached_date_time(home_team, away_team)
+    if cached:
+        return cached
+    return _remember(home_team, away_team, _ask_gpt(home_team, away_team, api_key))
+
+def _ask_gpt(home_team, away_team, api_key):
+    if not openai:
+        print("❌ OpenAI paketi yüklü değil.")
+        return None
+
+    # 1. İnternet Araması
+    query = _query_variants(home_team, away_team)[0]
+    print(f"🤖 İnternet taranıyor (OpenAI Modu): '{query}'...")
+    
+    search_results = safe_search(query, max_results=5)
+    
+    if not search_results:
+        return _answer(None, None, "search", 0.0)
+
+    local = _local_answer(home_team, away_team, search_results)
+    if local:
+        return local
+
+    # 2. OpenAI Parse İşlemi
+    try:
+        client = _openai_client(api_key)
+        messages = _openai_messages(home_team, away_team, search_results)
         
-        return data.get("date", "").strip(), data.get("time", "").strip()
+        def _complete():
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL, 
+                messages=messages,
+                response_format={ "type": "json_object" },
+                temperature=0
+            )
+            return response.choices[0].message.content
+
+        key = _llm_key("api.openai.com", OPENAI_MODEL, *(m["content"] for m in messages))
+        content = http_replay.session().call("llm", key, _complete)
+        return _llm_answer(json.loads(content), "openai", search_results, home_team, away_team)
         
     except Exception as e:
         print(f"❌ OpenAI Hatası: {e}")
-        return heuristic_parse_match_time(search_results)
+        return _heuristic_answer(search_results, home_team, away_team)
 
+@tracer.traced("ai_fallback", provider="gemini")
 def ask_gemini_for_match_time(home_team, away_team, api_key):
     """
     Gemini API kullanarak verilen maçın tarih ve saatini bulur.
+    Returns (date, time); answers are cached in ai_cache.
     """
+    cached = _cached_date_time(home_team, away_team)
+    if cached:
+        return cached
+    return _remember(home_team, away_team, _ask_gemini(home_team, away_team, api_key))
+
+def _ask_gemini(home_team, away_team, api_key):
     if not genai:
         print("❌ google-generativeai paketi yüklü değil.")
-        return None, None
+        return None
 
     # 1. İnternet Araması
     # Hem İngilizce Hem Türkçe Ara
-    query = f"{home_team} vs {away_team} match date time 2026 fixture"
-    print(f"🤖 İnternet taranıyor (Gemini Modu): '{query}'...")
-    
-    search_results = safe_search(query, max_results=5)
-    
-    if not search_results:
-        # Türkçe deneme
-        query_tr = f"{home_team} {away_team} maç tarihi saati 2026"
-        print(f"🤖 Türkçe taranıyor: '{query_tr}'...")
-        search_results = safe_search(query_tr, max_results=5)
-
-    if not search_results:
-        # Son çare: Çok basit sorgu
-        query_simple = f"{home_team} {away_team} match"
-        print(f"🤖 Geniş kapsamlı taranıyor: '{query_simple}'...")
-        search_results = safe_search(query_simple, max_results=5)
+    search_results = []
+    for label, query in zip(("Gemini Modu", "Türkçe", "Geniş kapsamlı"), _query_variants(home_team, away_team)):
+        print(f"🤖 İnternet taranıyor ({label}): '{query}'...")
+        search_results = safe_search(query, max_results=5)
+        if search_results:
+            break
 
     if not search_results:
         print("❌ İnternette hiç sonuç bulunamadı.")
-        return None, None
+        return _answer(None, None, "search", 0.0)
     
     print(f"DEBUG: {len(search_results)} sonuç bulundu. Analiz ediliyor...")
 
-    context_text = "\n".join([f"- {r['title']}: {r['body']}" for r in search_results])
-    
+    local = _local_answer(home_team, away_team, search_results)
+    if local:
+        return local
+
     # 2. Gemini Parse İşlemi
     try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash')
-        
-        prompt = f"""
-        Sen uzman bir spor asistanısın. Aşağıdaki arama sonuçlarına bakarak
-        {home_team} vs {away_team} maçının BUGÜN (Varsayıyoruz ki bugün 10 OCAK 2026) oynanıp oynanmadığını kontrol et.
-        Sadece bugünün maçını arıyoruz.
+        model = _gemini_model(api_key)
+        prompt = _gemini_prompt(home_team, away_team, search_results)
+
+        key = _llm_key("generativelanguage.googleapis.com", GEMINI_MODEL, prompt)
+        text = http_replay.session().call("llm", key, lambda: model.generate_content(prompt).text)
+        return _parse_gemini_text(text, search_results, home_team, away_team)
+
+    except Exception as e:
+        print(f"❌ Gemini Hatası: {e}")
+        return _heuristic_answer(search_results, home_team, away_team)
+
+# =============================================================================
+# ASYNC API (FastAPI event loop'unu bloklamaz)
+# =============================================================================
+# DDGS'nin async istemcisi yok; çağrı thread'de çalışır, bekleme/limit event loop üzerinde yapılır.
+SEARCH_DEADLINE = 15.0   # tüm sorgu varyasyonları için toplam süre (sn)
+LLM_DEADLINE = 25.0      # tek model çağrısı için süre (sn)
+
+async def _ddg_text_async(query, max_results, backend=None):
+    kwargs = {"backend": backend} if backend else {}
+    key = f"duckduckgo.com|text|{backend or 'auto'}|{max_results}|{query}"
+    limiter = rate_limiter.for_host("duckduckgo.com")
+    await limiter.acquire()
+    try:
+        results = await http_replay.session().call_async(
+            "ddg", key, lambda: asyncio.to_thread(lambda: duckduckgo_search.DDGS().text(query, max_results=max_results, **kwargs))
+        )
+    except Exception as e:
+        limiter.report_error(e)
+        raise
+    limiter.report(200)
+    return results
+
+async def safe_search_async(query, max_results=5):
+    """
+    Async safe_search: standart backend, sonra html backend.
+    """
+    for backend in (None, "html"):
+        try:
+            results = await _ddg_text_async(query, max_results, backend=backend)
+            if results:
+                return results
+        except Exception as e:
+            print(f"⚠️ Arama hatası ({backend or 'Standart'}): {e}")
+    return []
+
+async def search_match_async(home_team, away_team, max_results=5, deadline=SEARCH_DEADLINE):
+    """
+    Runs the English, Turkish and simple query variants concurrently and
+    returns the first non-empty result list (or [] after `deadline` seconds).
+    """
+    queries = _query_variants(home_team, away_team)
+    print(f"🤖 İnternet taranıyor ({len(queries)} sorgu paralel): {home_team} vs {away_team}")
+    tasks = [asyncio.create_task(safe_search_async(q, max_results)) for q in queries]
+    try:
+        async with asyncio.timeout(deadline):
+            for next_done in asyncio.as_completed(tasks):
+                results = await next_done
+                if results:
+                    return results
+    except TimeoutError:
+        print(f"⚠️ Arama süresi aşıldı ({deadline:.0f} sn).")
+    finally:
+        for task in tasks:
+            task.cancel()
+    return []
+
+@tracer.traced("ai_fallback", provider="openai")
+async def ask_gpt_for_match_time_async(home_team, away_team, api_key, search_results=None):
+    """
+    Async ask_gpt_for_match_time. Returns (date, time).
+    """
+    cached = _cached_date_time(home_team, away_team)
+    if cached:
+        return cached
+    return _remember(home_team, away_team, await _ask_gpt_async(home_team, away_team, api_key, search_results))
+
+async def _ask_gpt_async(home_team, away_team, api_key, search_results=None):
+    if not openai:
+        print("❌ OpenAI paketi yüklü değil.")
+        return None
+
+    search_results = search_results or await search_match_async(home_team, away_team)
+    if not search_results:
+        return _answer(None, None, "search", 0.0)
+
+    local = _local_answer(home_team, away_team, search_results)
+    if local:
+        return local
+
+    try:
+        client = _async_openai_client(api_key)
+        messages = _openai_messages(home_team, away_team, search_results)
+
+        async def _complete():
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                response_format={ "type": "json_object" },
+                temperature=0
+            )
+            return response.choices[0].message.content
+
+        key = _llm_key("api.openai.com", OPENAI_MODEL, *(m["content"] for m in messages))
+        content = await asyncio.wait_for(http_replay.session().call_async("llm", key, _complete), LLM_DEADLINE)
+        return _llm_answer(json.loads(content), "openai", search_results, home_team, away_team)
+
+    except Exception as e:
+        print(f"❌ OpenAI Hatası: {e!r}")
+        return _heuristic_answer(search_results, home_team, away_team)
+
+@tracer.traced("ai_fallback", provider="gemini")
+async def ask_gemini_for_match_time_async(home_team, away_team, api_key, search_results=None):
+    """
+    Async ask_gemini_for_match_time. Returns (date, time).
+    """
+    cached = _cached_date_time(home_team, away_team)
+    if cached:
+        return cached
+    return _remember(home_team, away_team, await _ask_gemini_async(home_team, away_team, api_key, search_results))
+
+async def _ask_gemini_async(home_team, away_team, api_key, search_results=None):
+    if not genai:
+        print("❌ google-generativeai paketi yüklü değil.")
+        return None
+
+    search_results = search_results or await search_match_async(home_team, away_team)
+    if not search_results:
+        print("❌ İnternette hiç sonuç bulunamadı.")
+        return _answer(None, None, "search", 0.0)
+
+    local = _local_answer(home_team, away_team, search_results)
+    if local:
+        return local
+
+    try:
+        model = _gemini_model(api_key)
+        prompt = _gemini_prompt(home_team, away_team, search_results)
+
+        async def _generate():
+            response = await model.generate_content_async(prompt)
+            return response.text
+
+        key = _llm_key("generativelanguage.googleapis.com", GEMINI_MODEL, prompt)
+        text = await asyncio.wait_for(http_replay.session().call_async("llm", key, _generate), LLM_DEADLINE)
+        return _parse_gemini_text(text, search_results, home_team, away_team)
+
+    except Exception as e:
+        print(f"❌ Gemini Hatası: {e!r}")
+        return _heuristic_answer(search_results, home_team, away_team)
+
+# =============================================================================
+# TOPLU (BATCH) ÇIKARIM: birden çok maç için tek yapılandırılmış prompt
+# =============================================================================
+BATCH_TOKEN_BUDGET = 6000     # tek istekteki tahmini prompt token üst sınırı
+BATCH_SNIPPETS_PER_MATCH = 5
+# Toplu aramada tüm maçlar tek bir süre bütçesini paylaşır; bütçe maç sayısıyla büyür.
+# DDG 0.5 istek/sn ile sınırlı, maç başına bir varyasyon en fazla 2 çağrı (standart + html).
+BATCH_SEARCH_SECONDS = 4.0    # maç başına eklenen arama süresi (sn)
+CHARS_PER_TOKEN = 4           # kaba tahmin; tokenizer bağımlılığı eklemiyoruz
+
+# Modelden beklenen yanıt: [{"id": 0, "date": "10 OCAK", "time": "20:00"}, ...]
+BATCH_RESULT_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "required": ["id", "date", "time"],
+        "properties": {
+            "id": {"type": "integer"},
+            "date": {"type": "string", "pattern": r"^(\d{1,2} [A-ZÇĞİÖŞÜ]+)?$"},
+            "time": {"type": "string", "pattern": r"^(([01]?\d|2[0-3]):[0-5]\d)?$"},
+            "reason": {"type": "string"},
+        },
+    },
+}
+_BATCH_DATE_RE = re.compile(BATCH_RESULT_SCHEMA["items"]["properties"]["date"]["pattern"])
+_BATCH_TIME_RE = re.compile(BATCH_RESULT_SCHEMA["items"]["properties"]["time"]["pattern"])
+
+BATCH_SYSTEM_PROMPT = """
+        Sen uzman bir spor asistanısın. Aşağıda numaralandırılmış birden fazla maç ve
+        her biri için internet arama sonuçları var. Her maçın TARİHİNİ ve SAATİNİ
+        (Türkiye Saati - TSİ) bul.
+
+        ÖNEMLİ: Sadece JSON dizisi döndür. Başka bir şey yazma. Her maç için tam bir eleman olmalı.
 
-        Eğer bugüne ait (10 Ocak 2026) bir maç varsa saatini TSİ olarak ver.
-        Eğer maç başka bir gündeyse (örneğin Şubat, Nisan vb.), tarih ve saati BOŞ bırak.
-        
-        ÖNEMLİ: Sadece JSON formatında yanıt ver. Başka bir şey yazma.
-        
         JSON Formatı:
-        {{
-            "date": "GÜN AY_İSMİ", 
-            "time": "HH:MM",
-            "reason": "Neden bu tarihi seçtin?"
-        }}
-        
-        Örnek: {{ "date": "10 OCAK", "time": "20:00", "reason": "TFF sitesinde 10 Ocak yazıyor" }}
-        Not: Ay ismi Türkçe ve BÜYÜK HARF olmalı. Saat Türkiye saati olmalı.
+        [
+            {"id": 0, "date": "10 OCAK", "time": "20:00", "reason": "kısa gerekçe"}
+        ]
 
-        Arama Sonuçları:
-        {context_text}
+        Kurallar:
+        - id: maçın numarası (değiştirme).
+        - Tarih formatı: GÜN ve AY İSMİ (Büyük harf, Türkçe). Örn: 10 OCAK.
+        - Saat formatı: HH:MM, Türkiye saati.
+        - Bulamadığın maç için date ve time boş string olsun.
         """
 
-        response = model.generate_content(prompt)
-        text = response.text
-        print(f"DEBUG: Gemini Yanıtı: {text}")
-        
-        # JSON temizliği (Gemini markdown ```json ... ``` dönebilir)
-        text = text.replace("```json", "").replace("```", "").strip()
-        
+async def search_matches_async(matches, max_results=5, deadline=None):
+    """
+    Searches many (home, away) matches under one shared deadline
+    (SEARCH_DEADLINE + BATCH_SEARCH_SECONDS per match). Every match gets
+    its first query variant before any match gets the next one, and later
+    variants only run for matches still without results while the budget
+    lasts. Returns result lists in input order ([] where nothing was found).
+    """
+    if deadline is None:
+        deadline = SEARCH_DEADLINE + BATCH_SEARCH_SECONDS * len(matches)
+    variants = [_query_variants(home, away) for home, away in matches]
+    results = [[] for _ in matches]
+
+    async def run(i, query):
+        results[i] = await safe_search_async(query, max_results)
+
+    print(f"🤖 İnternet taranıyor: {len(matches)} maç, ortak süre {deadline:.0f} sn")
+    try:
+        async with asyncio.timeout(deadline):
+            for level in range(max(map(len, variants), default=0)):
+                todo = [i for i, found in enumerate(results) if not found and level < len(variants[i])]
+                if not todo:
+                    break
+                await asyncio.gather(*(run(i, variants[i][level]) for i in todo), return_exceptions=True)
+    except TimeoutError:
+        missing = sum(1 for found in results if not found)
+        print(f"⚠️ Toplu arama süresi aşıldı ({deadline:.0f} sn); {missing} maç sonuçsuz.")
+    return results
+
+def _batch_item_text(item_id, home_team, away_team, search_results):
+    snippets = _context_text(search_results[:BATCH_SNIPPETS_PER_MATCH]) or "- (sonuç yok)"
+    return f"### Maç {item_id}: {home_team} vs {away_team}\n{snippets}\n"
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def chunk_by_token_budget(items, budget=BATCH_TOKEN_BUDGET):
+    """
+    Splits (item_id, text) pairs into consecutive chunks whose estimated
+    token total stays under `budget`. An item larger than the budget gets
+    a chunk of its own.
+    """
+    overhead = estimate_tokens(BATCH_SYSTEM_PROMPT)
+    chunks, current, used = [], [], overhead
+    for item in items:
+        cost = estimate_tokens(item[1])
+        if current and used + cost > budget:
+            chunks.append(current)
+            current, used = [], overhead
+        current.append(item)
+        used += cost
+    if current:
+        chunks.append(current)
+    return chunks
+
+def validate_batch_results(data, expected_ids):
+    """
+    Checks a parsed model response against BATCH_RESULT_SCHEMA and returns
+    {id: {"date", "time", "reason"}} for the valid entries. Unknown ids, malformed
+    entries and empty answers are dropped; a non-list raises ValueError.
+    """
+    if isinstance(data, dict):
+        # Bazı modeller diziyi {"results": [...]} içine sarar
+        data = next((v for v in data.values() if isinstance(v, list)), None)
+    if not isinstance(data, list):
+        raise ValueError("Toplu yanıt JSON dizisi değil")
+
+    valid = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        item_id, d, t = entry.get("id"), entry.get("date"), entry.get("time")
+        if isinstance(item_id, str) and item_id.isdigit():
+            item_id = int(item_id)
+        if item_id not in expected_ids or not isinstance(d, str) or not isinstance(t, str):
+            continue
+        d, t = d.strip().upper(), t.strip()
+        if not d or not t or not _BATCH_DATE_RE.match(d) or not _BATCH_TIME_RE.match(t):
+            continue
+        reason = entry.get("reason")
+        valid[item_id] = {"date": d, "time": t, "reason": reason.strip() if isinstance(reason, str) else ""}
+    return valid
+
+def _strip_code_fence(text):
+    return text.replace("```json", "").replace("```", "").strip()
+
+async def _batch_llm_call(chunk, api_key):
+    body = "\n".join(text for _, text in chunk)
+    if api_key.startswith("sk-"):
+        if not openai:
+            raise RuntimeError("OpenAI paketi yüklü değil")
+        client = _async_openai_client(api_key)
+        messages = [
+            {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+            {"role": "user", "content": body},
+        ]
+
+        async def _complete():
+            response = await client.chat.completions.create(
+                model=OPENAI_MODEL, messages=messages, temperature=0
+            )
+            return response.choices[0].message.content
+
+        key = _llm_key("api.openai.com", OPENAI_MODEL, "batch", BATCH_SYSTEM_PROMPT, body)
+    else:
+        if not genai:
+            raise RuntimeError("google-generativeai paketi yüklü değil")
+        model = _gemini_model(api_key)
+        prompt = f"{BATCH_SYSTEM_PROMPT}\n\n{body}"
+
+        async def _complete():
+            response = await model.generate_content_async(
+                prompt, generation_config={"response_mime_type": "application/json"}
+            )
+            return response.text
+
+        key = _llm_key("generativelanguage.googleapis.com", GEMINI_MODEL, "batch", prompt)
+    return await asyncio.wait_for(http_replay.session().call_async("llm", key, _complete), LLM_DEADLINE)
+
+@tracer.traced("ai_batch")
+async def ask_batch_for_match_times_async(matches, api_key, budget=BATCH_TOKEN_BUDGET):
+    """
+    Resolves many matches with one LLM call per token-budget chunk.
+    `matches` is a list of (home_team, away_team); returns a list of
+    (date, time) in the same order, (None, None) where nothing was found.
+    Cached answers are reused; matches the model skips or answers
+    invalidly fall back to the heuristic parser on their own snippets.
+    """
+    if not matches:
+        return []
+
+    results = [_cached_date_time(home, away) for home, away in matches]
+    pending = [i for i, cached in enumerate(results) if cached is None]
+    if not pending:
+        return results
+
+    # 1. Önbellekte olmayan maçlar için arama: önce her maçın ilk varyasyonu, kalan
+    #    varyasyonlar sadece bütçe elverdikçe (limiter DDG hızını zaten sınırlıyor)
+    found = await search_matches_async([matches[i] for i in pending])
+    searches = dict(zip(pending, found))
+
+    # Yerel çıkarımın emin olduğu maçlar LLM'e gönderilmez
+    local = {i: _local_answer(*matches[i], searches[i]) for i in pending if searches[i]}
+    items = [
+        (i, _batch_item_text(i, *matches[i], searches[i]))
+        for i in pending if searches[i] and not local[i]
+    ]
+    chunks = chunk_by_token_budget(items, budget) if items else []
+    print(f"🤖 Toplu AI çıkarımı: {len(items)} maç, {len(chunks)} istek")
+
+    # 2. Her parça için tek istek, parçalar paralel
+    async def run_chunk(chunk):
+        ids = {item_id for item_id, _ in chunk}
         try:
-            data = json.loads(text)
-        except json.JSONDecodeError:
-             # Bazen düz metin dönebilir, basitçe regex ile ayıklamayı dene veya hata ver
-             print("⚠️ Gemini JSON döndürmedi.")
-             return heuristic_parse_match_time(search_results)
-        
-        d = data.get("date", "").strip()
-        t = data.get("time", "").strip()
-        
-        if not d or not t:
-            print("⚠️ Gemini tarih veya saati bulamadı.")
-            return heuristic_parse_match_time(search_results)
-            
-        return d, t
+            text = await _batch_llm_call(chunk, api_key)
+            return validate_batch_results(json.loads(_strip_code_fence(text)), ids)
+        except Exception as e:
+            print(f"❌ Toplu AI Hatası ({len(chunk)} maç): {e!r}")
+            return {}
 
-    except Exception as e:
-        print(f"❌ Gemini Hatası: {e}")
-        return heuristic_parse_match_time(search_results)
+    answers = {}
+    for part in await asyncio.gather(*(run_chunk(c) for c in chunks)):
+        answers.update(part)
+
+    # 3. Modelin çözemediği maçlar için sezgisel ayrıştırma; hepsi önbelleğe yazılır
+    source = "openai" if api_key.startswith("sk-") else "gemini"
+    cache = ai_cache.get_answer_cache()
+    for i in pending:
+        if local.get(i):
+            answer = local[i]
+        elif i in answers:
+            answer = _llm_answer(answers[i], source, searches[i], *matches[i])
+        elif searches[i]:
+            answer = _heuristic_answer(searches[i], *matches[i])
+        else:
+            answer = _answer(None, None, "search", 0.0)
+        cache.put(*matches[i], answer)
+        results[i] = (answer["date"], answer["time"])
+    cache.save()
+    return results
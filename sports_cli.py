@@ -2,34 +2,105 @@
 import json
 import urllib.request
 import urllib.parse
-from datetime import datetime
+from datetime import datetime, date, timedelta
 import asyncio
 
+import http_replay
+import loop_runner
+import match_ranker
+import rate_limiter
+import team_registry
+import tracer
+from fixture_store import FixtureStore
+from singleflight import SingleFlight
+
 # TheSportsDB API Configuration
 # BURAYA YENİ PREMİUM KEYİNİZİ YAZIN (Varsayılan test key: 478143 ama sınırlıdır)
 API_KEY = "478143" 
 BASE_URL = f"https://www.thesportsdb.com/api/v1/json/{API_KEY}"
 
+# 429/403 sonrası kaç kez yeniden denenecek (bekleme süresini rate_limiter belirler)
+RATE_LIMIT_RETRIES = 3
+
+# Aynı anda gelen özdeş API istekleri (örn: iki maçta aynı takım) tek çağrıda birleşir
+API_FLIGHT = SingleFlight("sports_api")
+
+TR_MONTHS = ["OCAK", "ŞUBAT", "MART", "NİSAN", "MAYIS", "HAZİRAN", "TEMMUZ", "AĞUSTOS", "EYLÜL", "EKİM", "KASIM", "ARALIK"]
+
+def _fetch_json_live(url):
+    with urllib.request.urlopen(url) as response:
+        if response.status == 200:
+            data = response.read().decode('utf-8')
+            return json.loads(data)
+    return {}
+
+def fetch_json_checked(url):
+    """
+    Like fetch_json but lets HTTP errors propagate (needed to detect 429/403).
+    Goes through http_replay so benchmarks can record/replay the API.
+    """
+    key = http_replay.normalize_url(url)
+    return http_replay.session().call("json", key, lambda: _fetch_json_live(url))
+
 def fetch_json(url):
     """
     Synchronous helper to fetch JSON from a URL using standard library.
     Using standard library avoids extra pip dependencies for the user.
     """
     try:
-        with urllib.request.urlopen(url) as response:
-            if response.status == 200:
-                data = response.read().decode('utf-8')
-                return json.loads(data)
+        return fetch_json_checked(url)
     except Exception as e:
         # print(f"DEBUG: Error fetching {url}: {e}")
         pass
     return {}
 
+async def _fetch_json_scheduled(url):
+    """
+    Fetches through the per-host rate limiter; throttled responses (429/403)
+    slow the host down and are retried after the limiter's backoff. The
+    last error is raised.
+    """
+    limiter = rate_limiter.for_url(url)
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        await limiter.acquire()
+        try:
+            data = await asyncio.to_thread(fetch_json_checked, url)
+        except Exception as e:
+            limiter.report_error(e)
+            if attempt < RATE_LIMIT_RETRIES and rate_limiter.status_from_error(e) in rate_limiter.THROTTLE_STATUSES:
+                continue
+            raise
+        limiter.report(200)
+        return data
+
+async def fetch_json_checked_async(url):
+    """
+    Like fetch_json_async but raises on network and HTTP errors, so callers
+    can tell a failed request from an empty answer.
+    """
+    key = http_replay.normalize_url(url)
+    return await API_FLIGHT.do(key, lambda: _fetch_json_scheduled(url))
+
 async def fetch_json_async(url):
     """
     Async wrapper for the fetch function to allow parallel execution.
+    Concurrent callers asking for the same URL share one request.
     """
-    return await asyncio.to_thread(fetch_json, url)
+    try:
+        return await fetch_json_checked_async(url)
+    except Exception:
+        return {}
+
+_fixture_store = None
+
+def get_fixture_store():
+    """
+    Returns the process-wide fixture store (loaded from cache/fixtures.json on first use).
+    """
+    global _fixture_store
+    if _fixture_store is None:
+        _fixture_store = FixtureStore(BASE_URL, fetch_json_checked_async)
+    return _fixture_store
 
 async def search_with_fallback(query):
     """
@@ -114,43 +185,55 @@ async def search_with_fallback(query):
         return res["teams"][0].get("strBadge")
     return None
 
+def _lookup_team(team_name):
+    """
+    Returns the best search_with_fallback result for a name, recording it
+    in the alias registry so the next lookup of the same spelling is local.
+    """
+    teams = loop_runner.run(search_with_fallback(team_name))
+    if not teams:
+        return None
+    registry = team_registry.get_registry()
+    registry.learn(teams[0], team_name)
+    registry.save()
+    return teams[0]
+
 def get_team_logo_url(team_name):
     """
     Synchronous helper to get just the logo URL for a team name.
     Useful when match is not found but we need the logo.
     """
-    async def _get():
-        teams = await search_with_fallback(team_name)
-        if teams:
-            # En iyi eşleşmeyi bul (örn: tam isim)
-            # Şimdilik ilkini döndür
-            return teams[0].get("strBadge") or teams[0].get("strTeamBadge")
-        return None
-    
-    return asyncio.run(_get())
+    known = team_registry.get_registry().lookup(team_name)
+    if known and known["badge"]:
+        return known["badge"]
+    # En iyi eşleşmeyi bul (örn: tam isim) - şimdilik ilk sonuç
+    t = _lookup_team(team_name)
+    return (t.get("strBadge") or t.get("strTeamBadge")) if t else None
 
+@tracer.traced("api_team_info")
 def get_team_info(team_name):
     """
     Synchronous helper to get (canonical_name, logo_url) for a team.
+    Spellings seen before are answered from the alias registry.
     """
-    async def _get():
-        teams = await search_with_fallback(team_name)
-        if teams:
-            t = teams[0]
-            return t.get("strTeam"), t.get("strBadge") or t.get("strTeamBadge")
-        return None, None
-    
-    return asyncio.run(_get())
+    known = team_registry.get_registry().lookup(team_name)
+    # Rozeti olmayan kayıt kısa devre yapmaz (get_team_logo_url ile aynı): API'ye sorulur
+    if known and known["badge"]:
+        return known["name"], known["badge"]
+    t = _lookup_team(team_name)
+    if t:
+        return t.get("strTeam"), t.get("strBadge") or t.get("strTeamBadge")
+    if known:
+        return known["name"], None
+    return None, None
 
 def convert_to_tr_time(date_str, time_str):
     if not date_str or not time_str:
         return ""
     
     try:
-        dt_str = f"{date_str}T{time_str}"
-        dt = datetime.strptime(dt_str, "%Y-%m-%dT%H:%M:%S")
-        import datetime as dt_module
-        tr_time = dt + dt_module.timedelta(hours=3)
+        dt = datetime.fromisoformat(f"{date_str}T{time_str}")
+        tr_time = dt + timedelta(hours=3)
         return tr_time.strftime("%H:%M")
     except:
         return time_str
@@ -223,162 +306,100 @@ async def display_match(e):
     print(f"✈️  Deplasman Logo : {final_away_badge or 'Bulunamadı'}")
     print("==========================================")
 
-async def find_match_by_names(home_name, away_name, subtract_day_for_night=False):
+async def find_match_candidates(home_name, away_name, today=None):
     """
-    Finds a match between two team names.
-    Returns (time_str, date_str, home_badge, away_badge) or (None, None, None, None).
+    Returns ranked candidate events for a home/away pair (best first) as
+    match_ranker.RankedMatch tuples carrying a confidence value.
+
+    Candidates come from the local fixture store; the network is only used
+    to fill the store when it has no matching event yet. The top 3 team
+    search results are refreshed concurrently.
     """
+    store = get_fixture_store()
+    today = today or date.today()
+    today_str = today.isoformat()
+
+    def ranked_for(team_ids):
+        events = []
+        for team_id in dict.fromkeys(team_ids):
+            events.extend(store.events_for_team(team_id, from_date=today_str))
+        return match_ranker.rank_candidates(home_name, away_name, events, today)
+
+    # 0. Sıcak depo: indeksli arama, ağ çağrısı yok. En iyi adayın kaynağı TTL'i
+    # geçmişse (örn. ertelenen maçın eski tarihi) aşağıda yenilenip yeniden sıralanır.
+    ranked = ranked_for(store.team_ids_for_name(home_name) + store.team_ids_for_name(away_name))
+    if ranked and store.event_is_fresh(ranked[0].event):
+        return ranked
+
     # 1. Search for Home Team
     teams = await search_with_fallback(home_name)
     if not teams:
-        return None, None, None, None
-    
+        return []
+
     # Check top 3 results
+    team_ids = []
     for team in teams[:3]:
-        team_id = team["idTeam"]
-        
-        # 2. Get next 15 events for this team
-        url = f"{BASE_URL}/eventsnext.php?id={team_id}"
-        res = await fetch_json_async(url)
-        
-        events = res.get("events", [])
-        
-        if not events:
-            # Try season search immediately if no next events
+        store.remember_team(team)
+        team_ids.append(team["idTeam"])
+
+    # 2. Next events first, then the whole season (each fetched at most once per TTL)
+    await asyncio.gather(*(store.refresh_team_next(team_id) for team_id in team_ids))
+    ranked = ranked_for(team_ids)
+    if not ranked:
+        await asyncio.gather(*(store.refresh_season(team_id) for team_id in team_ids))
+        ranked = ranked_for(team_ids)
+
+    if ranked:
+        # Kullanıcının yazdığı ismi de bu takıma bağla (örn: "Fener")
+        best = ranked[0]
+        home_id = best.event.get("idAwayTeam" if best.swapped else "idHomeTeam")
+        store.remember_team({"idTeam": home_id, "strTeam": home_name})
+
+    store.save()
+    return ranked
+
+@tracer.traced("api_lookup")
+async def find_match_by_names(home_name, away_name, subtract_day_for_night=False):
+    """
+    Finds a match between two team names.
+    Returns (time_str, date_str, home_badge, away_badge, canon_home, canon_away)
+    or a tuple of Nones. Badges and canonical names follow the order the
+    user typed, even when the API lists the teams the other way round.
+    """
+    ranked = await find_match_candidates(home_name, away_name)
+    if not ranked:
+        return None, None, None, None, None, None
+
+    best = ranked[0]
+    e = best.event
+    tr_time = convert_to_tr_time(e.get("dateEvent"), e.get("strTime"))
+
+    if best.swapped:
+        ret_home_badge, ret_away_badge = e.get("strAwayTeamBadge"), e.get("strHomeTeamBadge")
+        canon_home, canon_away = e.get("strAwayTeam"), e.get("strHomeTeam")
+    else:
+        ret_home_badge, ret_away_badge = e.get("strHomeTeamBadge"), e.get("strAwayTeamBadge")
+        canon_home, canon_away = e.get("strHomeTeam"), e.get("strAwayTeam")
+
+    dt_obj = best.event_date
+
+    # Night Mode Logic
+    if subtract_day_for_night:
+        try:
+            hour = int(tr_time.split(":")[0])
+            if 0 <= hour < 6:
+                dt_obj = dt_obj - timedelta(days=1)
+        except ValueError:
             pass
-             
-            # Collect all candidates first
-            candidates = []
-            
-            # Check eventsnext
-            for e in events:
-                e_away = e.get("strAwayTeam", "").lower()
-                e_home = e.get("strHomeTeam", "").lower()
-                target_away = away_name.lower()
-                
-                match_found = False
-                if target_away in e_away or target_away in e_home:
-                    match_found = True
-                elif e_away in target_away or e_home in target_away:
-                    match_found = True
-                else:
-                    target_words = [w for w in target_away.split() if len(w) > 3]
-                    for word in target_words:
-                        if word in e_away or word in e_home:
-                            match_found = True
-                            break
-                
-                if match_found:
-                    candidates.append(e)
-
-            # Check season events if needed (or combine)
-            # Assuming eventsnext covers near future, but if empty, check season
-            if not candidates:
-                now = datetime.now()
-                if now.month > 6: season = f"{now.year}-{now.year+1}"
-                else: season = f"{now.year-1}-{now.year}"
-                
-                url_season = f"{BASE_URL}/eventsseason.php?id={team_id}&s={season}"
-                res_season = await fetch_json_async(url_season)
-                season_events = res_season.get("events", [])
-                
-                if season_events:
-                     today_str = datetime.now().strftime("%Y-%m-%d")
-                     future_events = [e for e in season_events if e.get("dateEvent") >= today_str]
-                     
-                     for e in future_events:
-                         e_away = e.get("strAwayTeam", "").lower()
-                         e_home = e.get("strHomeTeam", "").lower()
-                         target_away = away_name.lower()
-                         
-                         match_found = False
-                         if target_away in e_away or target_away in e_home:
-                            match_found = True
-                         
-                         if match_found:
-                             candidates.append(e)
-
-            # Process candidates: Extract date and sort by proximity to today
-            if candidates:
-                from datetime import datetime
-                today = datetime.now()
-                
-                best_candidate = None
-                min_diff = float('inf')
-                
-                for cand in candidates:
-                    try:
-                        edate = datetime.strptime(cand.get("dateEvent"), "%Y-%m-%d")
-                        diff = abs((edate - today).days)
-                        if diff < min_diff:
-                            min_diff = diff
-                            best_candidate = cand
-                    except: pass
-                
-                if best_candidate:
-                     e = best_candidate
-                     # Found the match
-                     date_event = e.get("dateEvent")
-                     time_event = e.get("strTime")
-                     
-                     # Convert time
-                     tr_time = convert_to_tr_time(date_event, time_event)
-                     
-                     # Determine correct badge order
-                     api_home_name = e.get("strHomeTeam", "").lower()
-                     requested_home_name = home_name.lower()
-                     
-                     is_home_match = False
-                     if requested_home_name in api_home_name or api_home_name in requested_home_name:
-                         is_home_match = True
-                     else:
-                         req_words = [w for w in requested_home_name.split() if len(w) > 3]
-                         for w in req_words:
-                             if w in api_home_name:
-                                 is_home_match = True
-                                 break
-                     
-                     if is_home_match:
-                         ret_home_badge = e.get("strHomeTeamBadge")
-                         ret_away_badge = e.get("strAwayTeamBadge")
-                     else:
-                         ret_home_badge = e.get("strAwayTeamBadge")
-                         ret_away_badge = e.get("strHomeTeamBadge")
-                     
-                    # Format date
-                     try:
-                         dt_obj = datetime.strptime(date_event, "%Y-%m-%d")
-                         
-                         # Night Mode Logic
-                         if subtract_day_for_night:
-                             try:
-                                 hour = int(tr_time.split(":")[0])
-                                 if 0 <= hour < 6:
-                                     from datetime import timedelta
-                                     dt_obj = dt_obj - timedelta(days=1)
-                             except: pass
-
-                         months = ["OCAK", "ŞUBAT", "MART", "NİSAN", "MAYIS", "HAZİRAN", "TEMMUZ", "AĞUSTOS", "EYLÜL", "EKİM", "KASIM", "ARALIK"]
-                         month_name = months[dt_obj.month - 1]
-                         tr_date = f"{dt_obj.day} {month_name}"
-                         
-                         # Canonical Names for correcting typos
-                         canon_home = e.get("strHomeTeam")
-                         canon_away = e.get("strAwayTeam")
-                         
-                         return tr_time, tr_date, ret_home_badge, ret_away_badge, canon_home, canon_away
-                     except:
-                         canon_home = e.get("strHomeTeam")
-                         canon_away = e.get("strAwayTeam")
-                         return tr_time, date_event, ret_home_badge, ret_away_badge, canon_home, canon_away
-    
-    return None, None, None, None, None, None
+
+    tr_date = f"{dt_obj.day} {TR_MONTHS[dt_obj.month - 1]}"
+    return tr_time, tr_date, ret_home_badge, ret_away_badge, canon_home, canon_away
 
 def get_match_details(home, away, subtract_day_for_night=False):
     """
     Synchronous wrapper for external use.
     """
-    return asyncio.run(find_match_by_names(home, away, subtract_day_for_night))
+    return loop_runner.run(find_match_by_names(home, away, subtract_day_for_night))
 
 async def main():
     # Clear screen (OS dependent, simple newlines for compatibility)
@@ -444,29 +465,29 @@ async def main():
             
             match_found = None
             
-            # Method A: Check eventsday
-            day_url = f"{BASE_URL}/eventsday.php?d={final_date}"
-            day_res = await fetch_json_async(day_url)
-            
+            store = get_fixture_store()
             tid = selected_team.get("idTeam")
-            if day_res.get("events"):
-                for e in day_res["events"]:
-                    if e.get("idHomeTeam") == tid or e.get("idAwayTeam") == tid:
-                        match_found = e
-                        break
+            store.remember_team(selected_team)
+
+            # Method A: Check eventsday (depo üzerinden, günde bir kez indirilir)
+            await store.refresh_day(final_date)
+            for e in store.events_on(final_date):
+                if e.get("idHomeTeam") == tid or e.get("idAwayTeam") == tid:
+                    match_found = e
+                    break
             
             # Method B: Check seasons
             if not match_found:
                 seasons = ["2025-2026", "2024-2025"]
                 for s in seasons:
                     if match_found: break
-                    s_url = f"{BASE_URL}/eventsseason.php?id={tid}&s={s}"
-                    s_res = await fetch_json_async(s_url)
-                    if s_res.get("events"):
-                        for e in s_res["events"]:
-                            if e.get("dateEvent") == final_date:
-                                match_found = e
-                                break
+                    await store.refresh_season(tid, s)
+                    for e in store.events_for_team(tid):
+                        if e.get("dateEvent") == final_date:
+                            match_found = e
+                            break
+
+            store.save()
             
             if match_found:
                 await display_match(match_found)
@@ -0,0 +1,255 @@
+import os
+import sys
+import time
+import argparse
+import threading
+
+from fixture_store import normalize_team_name
+from local_store import cache_path, load_json, save_json_atomic
+from logo_index import safe_filename
+
+# Takım takma ad kaydı: kullanıcı yazımları, API isimleri, TR/EN varyantları ve logo
+# dosya adı tek bir kanonik takım ID'sine bağlanır. Daha önce görülmüş her takım
+# ağ çağrısı yapmadan kanonik isme çevrilir. CLI ve backend aynı dosyayı kullanır.
+REGISTRY_PATH = cache_path("team_aliases.json")
+
+class TeamRegistry:
+    """
+    teams   : canonical id ("tsdb:<idTeam>" / "name:<normalized>") -> {
+        "name", "badge", "sport", "logo_file", "aliases": [normalized], "updated_at"
+    }
+    aliases : normalized spelling -> canonical id (teams'ten türetilir)
+    """
+
+    def __init__(self, path=REGISTRY_PATH):
+        self.path = path
+        self.teams = {}
+        self.aliases = {}
+        self.hits = 0
+        self.misses = 0
+        self._mtime = None
+        self._dirty = set()
+        self._lock = threading.Lock()
+        self._reload_if_changed()
+
+    # --- Kalıcılık ---
+    def _disk_mtime(self):
+        try:
+            return os.path.getmtime(self.path)
+        except OSError:
+            return None
+
+    def _reload_if_changed(self):
+        mtime = self._disk_mtime()
+        if mtime is None or mtime == self._mtime:
+            return
+        data = load_json(self.path, default={}) or {}
+        teams = data.get("teams", {})
+        # Kaydedilmemiş yerel öğrenmeler diskteki sürümü ezer
+        for team_id in self._dirty:
+            if team_id in self.teams:
+                teams[team_id] = self.teams[team_id]
+        self._set_teams(teams)
+        self._mtime = mtime
+
+    def _set_teams(self, teams):
+        self.teams = teams
+        self.aliases = {}
+        for team_id, entry in teams.items():
+            for alias in entry.get("aliases", []):
+                self.aliases[alias] = team_id
+
+    def save(self):
+        """
+        Merges unsaved entries into the file written by other processes and
+        writes atomically.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            self._mtime = None
+            self._reload_if_changed()
+            self._dirty.clear()
+            teams = dict(self.teams)
+        try:
+            save_json_atomic(self.path, {"version": 1, "teams": teams})
+        except OSError as e:
+            print(f"⚠️ Takım kaydı kaydedilemedi: {e}")
+            return
+        with self._lock:
+            self._mtime = self._disk_mtime()
+
+    # --- Öğrenme ---
+    def _upsert(self, team_id, fields, spellings):
+        entry = self.teams.get(team_id) or {"aliases": []}
+        changed = team_id not in self.teams
+        for key, value in fields.items():
+            if value and entry.get(key) != value:
+                entry[key] = value
+                changed = True
+        for spelling in spellings:
+            alias = normalize_team_name(spelling)
+            if not alias:
+                continue
+            owner = self.aliases.get(alias)
+            if owner != team_id:
+                # Yazım başka bir takıma bağlıysa en son doğrulanan kazanır
+                if owner in self.teams:
+                    self.teams[owner]["aliases"] = [a for a in self.teams[owner]["aliases"] if a != alias]
+                    self._dirty.add(owner)
+                self.aliases[alias] = team_id
+            if alias not in entry["aliases"]:
+                entry["aliases"].append(alias)
+                changed = True
+        if changed:
+            entry["updated_at"] = time.time()
+            self.teams[team_id] = entry
+            self._dirty.add(team_id)
+        return entry
+
+    def learn(self, team, *spellings):
+        """
+        Records a searchteams.php result under "tsdb:<idTeam>", linking its
+        API names (strTeam, strTeamShort, strAlternate), the logo filename
+        and the spellings that resolved to it. Returns the entry.
+        """
+        name = team.get("strTeam")
+        if not team.get("idTeam") or not name:
+            return None
+        names = [name, team.get("strTeamShort") or ""]
+        names += (team.get("strAlternate") or "").split(",")
+        fields = {
+            "name": name,
+            "badge": team.get("strBadge") or team.get("strTeamBadge"),
+            "sport": team.get("strSport"),
+            "logo_file": f"{safe_filename(name)}.png",
+        }
+        with self._lock:
+            self._reload_if_changed()
+            return self._upsert(f"tsdb:{team['idTeam']}", fields, names + list(spellings))
+
+    def add_alias(self, spelling, canonical_name):
+        """
+        Links a spelling to a team known by canonical name; unknown names get
+        a "name:<normalized>" id so manual corrections are kept too.
+        """
+        key = normalize_team_name(canonical_name)
+        if not key:
+            return None
+        with self._lock:
+            self._reload_if_changed()
+            team_id = self.aliases.get(key) or f"name:{key}"
+            fields = {"name": canonical_name} if team_id not in self.teams else {}
+            return self._upsert(team_id, fields, [canonical_name, spelling])
+
+    def set_logo_file(self, name, logo_file):
+        key = normalize_team_name(name)
+        with self._lock:
+            team_id = self.aliases.get(key)
+            if team_id:
+                self._upsert(team_id, {"logo_file": logo_file}, [])
+
+    # --- Sorgular (ağ yok) ---
+    def lookup(self, name):
+        """
+        Returns {"id", "name", "badge", "sport", "logo_file"} for a known
+        spelling, or None.
+        """
+        key = normalize_team_name(name)
+        with self._lock:
+            self._reload_if_changed()
+            team_id = self.aliases.get(key) if key else None
+            entry = self.teams.get(team_id) if team_id else None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return {"id": team_id, **{k: entry.get(k) for k in ("name", "badge", "sport", "logo_file")}}
+
+    def canonical_name(self, name):
+        entry = self.lookup(name)
+        return entry["name"] if entry else None
+
+    # --- Toplu dışa/içe aktarma ---
+    def export(self, path):
+        with self._lock:
+            self._reload_if_changed()
+            teams = dict(self.teams)
+        save_json_atomic(os.path.abspath(path), {"version": 1, "teams": teams})
+        return len(teams)
+
+    def import_file(self, path):
+        """
+        Merges an exported registry: aliases are unioned, fields missing
+        here are filled in. Returns the number of teams merged.
+        """
+        data = load_json(path, default={}) or {}
+        count = 0
+        with self._lock:
+            self._reload_if_changed()
+            for team_id, entry in (data.get("teams") or {}).items():
+                if not isinstance(entry, dict):
+                    continue
+                current = self.teams.get(team_id, {})
+                fields = {k: entry.get(k) for k in ("name", "badge", "sport", "logo_file") if not current.get(k)}
+                self._upsert(team_id, fields, entry.get("aliases") or [])
+                count += 1
+        self.save()
+        return count
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "teams": len(self.teams),
+                "aliases": len(self.aliases),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TeamRegistry()
+    return _registry
+
+def stats():
+    return get_registry().stats()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Takım takma ad kaydı")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("export", help="Kaydı JSON dosyasına yaz").add_argument("path")
+    sub.add_parser("import", help="JSON dosyasını kayda birleştir").add_argument("path")
+    lookup = sub.add_parser("lookup", help="Bir yazımın kanonik takımını göster")
+    lookup.add_argument("name")
+    alias = sub.add_parser("alias", help="Elle takma ad ekle")
+    alias.add_argument("spelling")
+    alias.add_argument("canonical")
+    args = parser.parse_args(argv)
+
+    registry = get_registry()
+    if args.command == "export":
+        print(f"✅ {registry.export(args.path)} takım dışa aktarıldı: {args.path}")
+    elif args.command == "import":
+        print(f"✅ {registry.import_file(args.path)} takım içe aktarıldı.")
+    elif args.command == "lookup":
+        entry = registry.lookup(args.name)
+        if not entry:
+            print(f"❌ Kayıtlı değil: {args.name}")
+            return 1
+        print(f"{args.name} -> {entry['name']} ({entry['id']}, logo: {entry['logo_file']})")
+    elif args.command == "alias":
+        registry.add_alias(args.spelling, args.canonical)
+        registry.save()
+        print(f"✅ {args.spelling} -> {args.canonical}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+import os
+import glob
+import hashlib
+import threading
+from collections import namedtuple
+
+import metrics
+from local_store import BASE_DIR
+
+# PSD şablon önbelleği: render işçileri şablonun yolunu ve içerik özetini süreç ömrü
+# boyunca bellekte tutar. Dosya sadece stat değişince yeniden özetlenir.
+#
+# Ayrıştırılmış şablonun (katman ağacı, fontlar, bitmap'ler) bellekte tutulması
+# Photoshop tarafında yapılır: render'ı yapan Photoshop olduğu için Python'da
+# ayrıştırılan bir kopya kullanılamaz. JSX kalıcı "#targetengine macbot" motorunda
+# çalışır, şablonu açık tutar ve her render'ı template.duplicate() kopyasında yapar.
+# Buradaki özet (templateHash) JSX'e geçer; özet değişince şablon kapatılıp diskten
+# yeniden açılır (bkz. mac_duzenleyici.py JSX başlığı). Bu yüzden Python tarafında
+# PSD ayrıştırılmaz, yalnızca değişiklik tespiti yapılır.
+
+HASH_CHUNK = 1 << 20
+
+Template = namedtuple("Template", ["name", "path", "sha1", "size"])
+
+def file_sha1(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class TemplateCache:
+    """
+    entries: template file name -> ((mtime_ns, size), Template)
+    """
+
+    def __init__(self, base_dir=BASE_DIR):
+        self.base_dir = base_dir
+        self.entries = {}
+        self.hits = 0
+        self.rehashes = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+
+    def get(self, name):
+        """
+        Returns the Template for a file in base_dir, or None if it is missing.
+        """
+        path = os.path.join(self.base_dir, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        signature = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            cached = self.entries.get(name)
+            if cached and cached[0] == signature:
+                self.hits += 1
+                metrics.TEMPLATE_LOOKUPS_TOTAL.labels("hit").inc()
+                return cached[1]
+
+        # Dosyaya dokunulmuş ama içerik aynıysa kayıt aynen kalır
+        sha1 = file_sha1(path)
+        with self._lock:
+            self.rehashes += 1
+            metrics.TEMPLATE_LOOKUPS_TOTAL.labels("rehash").inc()
+            if cached and cached[1].sha1 == sha1:
+                self.entries[name] = (signature, cached[1])
+                return cached[1]
+        template = Template(name, path, sha1, st.st_size)
+        with self._lock:
+            self.reloads += 1
+            metrics.TEMPLATE_LOOKUPS_TOTAL.labels("reload").inc()
+            self.entries[name] = (signature, template)
+        return template
+
+    def preload(self, names=None):
+        """
+        Loads the given templates (default: every *.psd in base_dir).
+        """
+        if names is None:
+            names = [os.path.basename(p) for p in glob.glob(os.path.join(self.base_dir, "*.psd"))]
+        return [t for t in (self.get(name) for name in names) if t]
+
+    def stats(self):
+        with self._lock:
+            return {
+                "templates": {name: t.sha1[:12] for name, (_, t) in self.entries.items()},
+                "hits": self.hits,
+                "rehashes": self.rehashes,
+                "reloads": self.reloads,
+            }
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_template_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = TemplateCache()
+    return _cache
+
+def get_template(name):
+    return get_template_cache().get(name)
+
+def preload(names=None):
+    templates = get_template_cache().preload(names)
+    print(f"🗂️  Şablonlar önbellekte: {', '.join(t.name for t in templates) or 'yok'}")
+    return templates
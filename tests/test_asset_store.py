@@ -0,0 +1,50 @@
+import os
+
+import asset_store
+from asset_store import AssetStore
+
+def _store(tmp_path):
+    return AssetStore(root=str(tmp_path / "assets"), index_path=str(tmp_path / "index.json"))
+
+def _write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+def test_rebound_render_is_collected_after_grace(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    render = tmp_path / "mac.png"
+    old = store.put_file(_write(render, b"first"), "renders/mac.png")
+    os.utime(render, ns=(1, 1))
+    new = store.put_file(_write(render, b"second"), "renders/mac.png")
+    assert old != new
+    assert "orphaned" in store.blobs[old]
+
+    # Süre dolmadan silinmez
+    store.gc(grace=3600)
+    assert os.path.exists(store.blob_path(old))
+
+    monkeypatch.setattr(asset_store, "ORPHAN_GRACE_SECONDS", 0)
+    monkeypatch.setattr(asset_store, "SWEEP_INTERVAL", 0)
+    assert store.unbind("renders/mac.png")
+    assert not os.path.exists(store.blob_path(old))
+    assert _store(tmp_path).blobs == {}
+
+def test_rebinding_an_orphan_revives_it(tmp_path):
+    store = _store(tmp_path)
+    digest = store.put_bytes(b"logo", "logos/a.png", ".png")
+    store.unbind("logos/a.png")
+    assert "orphaned" in store.blobs[digest]
+    store.put_bytes(b"logo", "logos/b.png", ".png")
+    assert "orphaned" not in store.blobs[digest]
+    assert store.gc() == 0
+
+def test_batch_writes_the_index_once(tmp_path, monkeypatch):
+    store = _store(tmp_path)
+    writes = []
+    save = asset_store.save_json_atomic
+    monkeypatch.setattr(asset_store, "save_json_atomic", lambda *a: (writes.append(a[0]), save(*a)))
+    with store.batch():
+        for i in range(3):
+            store.put_file(_write(tmp_path / f"{i}.png", bytes([i])), f"renders/{i}.png")
+    assert len(writes) == 1
+    assert len(_store(tmp_path).names) == 3
@@ -0,0 +1,16 @@
+import time
+
+import fixture_store
+from fixture_store import FixtureStore
+
+EVENT = {"idEvent": "1", "idHomeTeam": "10", "idAwayTeam": "20", "idLeague": "4351", "dateEvent": "2026-01-28"}
+
+def test_event_freshness_follows_its_sources(tmp_path):
+    store = FixtureStore("http://example.test", None, path=str(tmp_path / "fixtures.json"))
+    assert not store.event_is_fresh(EVENT)
+
+    store.fetched["next:20"] = time.time()
+    assert store.event_is_fresh(EVENT)
+
+    store.fetched["next:20"] = time.time() - fixture_store.NEXT_TTL - 1
+    assert not store.event_is_fresh(EVENT)
@@ -0,0 +1,28 @@
+import pytest
+
+from logo_index import LogoIndex
+
+FILES = ["galatasaraysk.png", "Paris_Saint_Germain_PSG.png", "PSV_Eindhoven.png", "AEK_Athens.png", "Fenerbahce_SK.png"]
+
+@pytest.fixture
+def index(tmp_path):
+    logos = tmp_path / "logos"
+    logos.mkdir()
+    for name in FILES:
+        (logos / name).write_bytes(b"x" * 200)
+    return LogoIndex(str(logos), path=str(tmp_path / "index.json"))
+
+@pytest.mark.parametrize("team, filename", [
+    ("galatasaray", "galatasaraysk.png"),
+    ("PSG", "Paris_Saint_Germain_PSG.png"),
+    ("PSV", "PSV_Eindhoven.png"),
+    ("AEK", "AEK_Athens.png"),
+])
+def test_short_and_run_together_names_match(index, team, filename):
+    assert index.lookup(team)[0] == filename
+
+def test_fallback_uses_the_secondary_index_only(index):
+    # Tüm anahtar taraması yok: ne kelime ne önek paylaşan dosya aday olmaz
+    index.keys = {}
+    assert index.lookup("PSG")[0] == "Paris_Saint_Germain_PSG.png"
+    assert index.lookup("Zzz") == (None, None)
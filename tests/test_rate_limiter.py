@@ -0,0 +1,16 @@
+from rate_limiter import HostLimiter
+
+def test_only_successful_responses_restore_the_rate():
+    limiter = HostLimiter("example.test", rate=4.0, burst=4)
+    limiter.report(429)
+    throttled = limiter.rate
+    assert throttled == 2.0
+
+    for status in (500, 502, 404):
+        limiter.report(status)
+    assert limiter.rate == throttled
+    assert limiter.failures == 1
+
+    limiter.report(200)
+    assert limiter.rate > throttled
+    assert limiter.failures == 0
@@ -0,0 +1,63 @@
+import asyncio
+
+from singleflight import SingleFlight
+
+def _slow(calls, value="ok", delay=0.05):
+    async def work():
+        calls.append(value)
+        await asyncio.sleep(delay)
+        return value
+    return work
+
+def test_cancelled_follower_does_not_cancel_the_flight():
+    flight = SingleFlight("test_follower_cancel")
+    calls = []
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", _slow(calls)))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("k", _slow(calls))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        followers[0].cancel()
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader, cancelled, *others = asyncio.run(scenario())
+    assert leader == "ok"
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert others == ["ok", "ok"]
+    assert calls == ["ok"]
+    assert flight.stats()["inflight"] == 0
+
+def test_cancelled_leader_hands_the_key_to_a_follower():
+    flight = SingleFlight("test_leader_cancel")
+    calls = []
+
+    async def scenario():
+        leader = asyncio.create_task(flight.do("k", _slow(calls)))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do("k", _slow(calls))) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader, *followers = asyncio.run(scenario())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert followers == ["ok", "ok"]
+    # İlk lider + devralan tek takipçi
+    assert len(calls) == 2
+    assert flight.stats() == {"calls": 3, "executed": 2, "saved": 1, "inflight": 0}
+
+def test_leader_error_reaches_followers():
+    flight = SingleFlight("test_leader_error")
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        tasks = [asyncio.create_task(flight.do("k", fail)) for _ in range(3)]
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.stats()["executed"] == 1
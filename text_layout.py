@@ -0,0 +1,38 @@
+import re
+from functools import lru_cache
+
+# Render yolundaki metin yerleşimi önbelleği. Takım adı kısaltmaları burada bir kez
+# hesaplanıp JSX'e hazır verilir; ölçülen metin genişlikleri ise Photoshop'un kalıcı
+# script motorunda (targetengine) (font, boyut, metin) anahtarıyla LRU olarak tutulur.
+LAYOUT_CACHE_SIZE = 512      # JSX tarafında saklanan ölçüm sayısı
+
+# Özel adlar kısaltmalardan önce denenir ("Paris Saint-Germain" -> "PSG")
+SPECIAL_NAMES = [
+    (re.compile(r"Paris Saint-Germain", re.IGNORECASE), "PSG"),
+]
+ABBREVIATIONS = [
+    (re.compile(r"Football Club", re.IGNORECASE), "FC"),
+    (re.compile(r"United", re.IGNORECASE), "Utd"),
+    (re.compile(r"Sporting", re.IGNORECASE), "Sp."),
+    (re.compile(r"Olympique", re.IGNORECASE), "O."),
+    (re.compile(r"Saint", re.IGNORECASE), "St."),
+    (re.compile(r"Borussia", re.IGNORECASE), "B."),
+]
+
+@lru_cache(maxsize=2048)
+def abbreviate_team(name):
+    """
+    Shortened team name for the MacAdi text layers.
+    """
+    if not name:
+        return name
+    for pattern, short in SPECIAL_NAMES:
+        if pattern.search(name):
+            return short
+    for pattern, short in ABBREVIATIONS:
+        name = pattern.sub(short, name)
+    return name
+
+def stats():
+    info = abbreviate_team.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize}
@@ -0,0 +1,387 @@
+import re
+import unicodedata
+from collections import namedtuple, defaultdict
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+
+from fixture_store import normalize_team_name
+
+# Arama sonuçlarından (DDG snippet'leri) maç tarihi/saati çıkaran yerel ayrıştırıcı.
+# - Türkçe/İngilizce/İspanyolca/Portekizce tarih ve saat kalıpları tek seferde derlenir.
+# - Her saat, kendisine en yakın "Takım - Takım" ifadesine bağlanır; başka bir maça ait
+#   saatler (fikstür listeleri, "Galatasaray ise 20:45'te...") oy alamaz.
+# - Saat dilimi (GMT, CET, UK time, TSİ ...) veya sitenin ülkesi biliniyorsa saat TSİ'ye çevrilir.
+# - Tüm snippet'lerdeki adaylar ağırlıklı oylanır; güven = kazananın oy payı.
+
+TR_MONTHS = ["OCAK", "ŞUBAT", "MART", "NİSAN", "MAYIS", "HAZİRAN", "TEMMUZ", "AĞUSTOS", "EYLÜL", "EKİM", "KASIM", "ARALIK"]
+
+# Katlanmış (küçük harf, aksansız) ay isimleri -> ay numarası
+_MONTH_NAMES = {
+    # Türkçe
+    "ocak": 1, "subat": 2, "mart": 3, "nisan": 4, "mayis": 5, "haziran": 6,
+    "temmuz": 7, "agustos": 8, "eylul": 9, "ekim": 10, "kasim": 11, "aralik": 12,
+    # İngilizce
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6,
+    "july": 7, "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+    # İspanyolca
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6,
+    "julio": 7, "agosto": 8, "septiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+    # Portekizce
+    "janeiro": 1, "fevereiro": 2, "marco": 3, "maio": 5, "junho": 6,
+    "julho": 7, "setembro": 9, "outubro": 10, "novembro": 11, "dezembro": 12,
+}
+_SPANISH_MONTHS = {"enero", "febrero", "marzo", "mayo", "junio", "julio", "septiembre", "octubre", "noviembre", "diciembre"}
+_TURKISH_MONTHS = {"ocak", "subat", "mart", "nisan", "mayis", "haziran", "temmuz", "agustos", "eylul", "ekim", "kasim", "aralik"}
+
+_MONTH_ALT = "|".join(sorted(_MONTH_NAMES, key=len, reverse=True))
+
+# Tarih: "29 Ocak", "29 de janeiro", "February 14", "Jan 29, 2026", "2026-01-29", "29.01.2026"
+DATE_RE = re.compile(
+    r"\b(?P<d1>[12]\d|3[01]|0?[1-9])(?:st|nd|rd|th)?(?:\s+de)?\s+(?P<m1>" + _MONTH_ALT + r")\b\.?(?:,?\s+(?:de\s+)?(?P<y1>20\d\d))?"
+    r"|\b(?P<m2>" + _MONTH_ALT + r")\.?\s+(?P<d2>[12]\d|3[01]|0?[1-9])(?:st|nd|rd|th)?\b(?:,?\s+(?P<y2>20\d\d))?"
+    r"|\b(?P<y3>20\d\d)-(?P<m3>0?[1-9]|1[0-2])-(?P<d3>[12]\d|3[01]|0?[1-9])\b"
+    r"|\b(?P<d4>[12]\d|3[01]|0?[1-9])[./](?P<m4>0?[1-9]|1[0-2])[./](?P<y4>20\d\d)\b"
+)
+
+# Saat: "20:00", "20h00", "19h30", "8pm", "8:30 p.m.", "23.00'te"
+TIME_RE = re.compile(
+    r"\b(?P<h1>[01]?\d|2[0-3])[:h](?P<n1>[0-5]\d)\b(?!\s*(?:am|pm|a\.m|p\.m)\b)"
+    r"|\b(?P<h2>1[0-2]|0?[1-9])(?:[:.](?P<n2>[0-5]\d))?\s*(?P<ap>am|pm|a\.m\.?|p\.m\.?)(?!\w)"
+    r"|\b(?P<h3>[01]?\d|2[0-3])\.(?P<n3>[0-5]\d)(?=\s*['’])"
+)
+
+# Saatten hemen sonra / önce gelen saat dilimi ifadeleri (katlanmış metin üzerinde)
+TZ_AFTER_RE = re.compile(
+    r"[\s(,]{0,3}(?P<tz>tsi|trt|turkiye saati|gmt|utc|bst|cest|cet|eest|eet|west|wet|edt|est|brt"
+    r"|uk time|local time|yerel saat|hora local|horario de brasilia)\b"
+)
+TZ_BEFORE_RE = re.compile(r"\b(?P<tz>tsi|trt)\s*$")
+
+# Saat dilimi -> TSİ'ye ulaşmak için eklenecek saat. "eu"/"uk": yaz saatine göre değişir.
+TZ_OFFSETS = {
+    "tsi": 0, "trt": 0, "turkiye saati": 0,
+    "gmt": 3, "utc": 3, "wet": 3, "west": 2, "bst": 2,
+    "cet": 2, "cest": 1, "eet": 1, "eest": 0,
+    "est": 8, "edt": 7,
+    "brt": 6, "horario de brasilia": 6,
+    "uk time": "uk", "cet_auto": "eu", "eet_auto": "eet",
+    "local time": None, "yerel saat": None, "hora local": None,
+}
+
+# Açık saat dilimi yoksa sitenin ülkesinden (alan adı) tahmin
+DOMAIN_ZONES = (
+    (".tr", "tsi"), (".co.uk", "uk time"), (".uk", "uk time"), (".pt", "uk time"),
+    (".es", "cet_auto"), (".it", "cet_auto"), (".fr", "cet_auto"), (".de", "cet_auto"),
+    (".nl", "cet_auto"), (".be", "cet_auto"), (".gr", "eet_auto"), (".br", "brt"),
+)
+# IGNORECASE kullanılmaz: Python'da "ı" büyük/küçük harf eşlemesi "I" ile çakışır
+_TURKISH_TEXT_RE = re.compile(r"[şğıŞĞİ]|\b(?:[Mm]aç|[Ss]aat|günü|tarihinde)\b")
+
+# Cümle / liste sınırı: ". ", "; ", " | " — "23.00'te" ve "Jan." sonrası rakam sınır sayılmaz
+BOUNDARY_RE = re.compile(r"[.!?;|](?=\s|$)")
+
+# Bizim maçımız dışındaki "Takım - Takım" ifadeleri (fikstür listeleri)
+PAIR_RE = re.compile(
+    r"(?<![\w'])[A-ZÇĞİÖŞÜ][\w']*(?:\s[A-ZÇĞİÖŞÜ][\w']*){0,2}\s?(?:-|–|\sv\s|\svs\.?\s|\sx\s)\s?"
+    r"[A-ZÇĞİÖŞÜ][\w']*(?:\s[A-ZÇĞİÖŞÜ][\w']*){0,2}"
+)
+
+GENERIC_WORDS = {"city", "united", "real", "club", "sporting", "athletic", "atletico", "town", "county",
+                 "rovers", "wanderers", "olympique", "deportivo", "racing", "inter", "sport"}
+# "UEFA Europa League - Jan 29" gibi ifadeler maç sayılmaz
+NOT_TEAM_WORDS = set(_MONTH_NAMES) | {"uefa", "league", "liga", "lig", "ligi", "cup", "kupa", "kupasi",
+                                      "premier", "fixtures", "fikstur", "hafta", "jornada", "week", "round"}
+PAIR_GAP = 20                 # iki takım ismi arasında en fazla bu kadar karakter (rakamsız) -> maç ifadesi
+BOUNDARY_COST = 60            # sınır geçen her ilişki bu kadar karakter uzak sayılır
+FOLLOWING_FACTOR = 2          # saat maç ifadesinden ÖNCE geliyorsa mesafe çarpanı
+DISTANCE_SCALE = 50.0
+DATE_LOOKBACK = 90            # saatten önce tarih arama penceresi
+DATE_LOOKAHEAD = 40
+ZONE_WEIGHTS = {"explicit": 1.0, "inferred": 0.8, "unknown": 0.3}
+DATE_ONLY_WEIGHT = 0.5
+CONFIDENT = 0.6               # bu güvenin üstünde LLM'e gerek yok
+
+Extraction = namedtuple("Extraction", ["date", "time", "confidence", "votes"])
+
+_FOLD = str.maketrans({
+    'ı': 'i', 'İ': 'i', 'ş': 's', 'Ş': 's', 'ç': 'c', 'Ç': 'c',
+    'ğ': 'g', 'Ğ': 'g', 'ü': 'u', 'Ü': 'u', 'ö': 'o', 'Ö': 'o',
+})
+
+@lru_cache(maxsize=512)
+def _fold_char(c):
+    c = c.translate(_FOLD)
+    base = unicodedata.normalize("NFKD", c)[0].lower()
+    return base[0] if base else c
+
+def fold(text):
+    """
+    Lowercase, accent-free copy of `text` with exactly the same length, so
+    match positions in the folded text index the original text too.
+    """
+    return "".join(_fold_char(c) for c in text)
+
+@lru_cache(maxsize=1024)
+def team_pattern(name):
+    """
+    Regex (on folded text) for mentions of a team: its significant words
+    ("fenerbahce", "rangers") or an abbreviated first word followed by
+    the second ("man city").
+    """
+    words = normalize_team_name(name).split()
+    if not words:
+        return None
+    alts = [w for w in words if (len(w) >= 4 or len(words) == 1) and w not in GENERIC_WORDS]
+    if len(words) > 1:
+        alts.append(re.escape(words[0][:3]) + r"\w*\s+" + re.escape(words[1]))
+    if not alts:
+        alts = [" ".join(words)]
+    return re.compile(r"\b(?:" + "|".join(sorted(set(alts), key=len, reverse=True)) + r")\w*")
+
+def _eu_summer(day):
+    """EU/UK summer time: last Sunday of March until last Sunday of October."""
+    def last_sunday(month):
+        d = date(day.year, month, 31)
+        return d - timedelta(days=(d.weekday() + 1) % 7)
+    return last_sunday(3) <= day < last_sunday(10)
+
+def _offset_hours(zone, day):
+    offset = TZ_OFFSETS.get(zone)
+    if offset == "uk":
+        return 2 if day and _eu_summer(day) else 3
+    if offset == "eu":
+        return 1 if day and _eu_summer(day) else 2
+    if offset == "eet":
+        return 0 if day and _eu_summer(day) else 1
+    return offset
+
+def _resolve_year(month, day, year, today):
+    if year:
+        try:
+            return date(int(year), month, day)
+        except ValueError:
+            return None
+    for y in (today.year, today.year + 1):
+        try:
+            candidate = date(y, month, day)
+        except ValueError:
+            return None
+        if candidate >= today - timedelta(days=1):
+            return candidate
+    return None
+
+def _parse_dates(folded, today):
+    dates = []
+    for m in DATE_RE.finditer(folded):
+        g = m.groupdict()
+        if g["m1"]:
+            month, day, year, word = _MONTH_NAMES[g["m1"]], int(g["d1"]), g["y1"], g["m1"]
+        elif g["m2"]:
+            month, day, year, word = _MONTH_NAMES[g["m2"]], int(g["d2"]), g["y2"], g["m2"]
+        elif g["y3"]:
+            month, day, year, word = int(g["m3"]), int(g["d3"]), g["y3"], None
+        else:
+            month, day, year, word = int(g["m4"]), int(g["d4"]), g["y4"], None
+        resolved = _resolve_year(month, day, year, today)
+        if resolved:
+            dates.append((m.start(), m.end(), resolved, word))
+    return dates
+
+def _parse_times(folded):
+    times = []
+    for m in TIME_RE.finditer(folded):
+        g = m.groupdict()
+        if g["h1"] is not None:
+            hour, minute = int(g["h1"]), int(g["n1"])
+        elif g["h2"] is not None:
+            hour, minute = int(g["h2"]) % 12, int(g["n2"] or 0)
+            if g["ap"].startswith("p"):
+                hour += 12
+        else:
+            hour, minute = int(g["h3"]), int(g["n3"])
+        zone = None
+        after = TZ_AFTER_RE.match(folded, m.end())
+        if after:
+            zone = after.group("tz")
+        else:
+            before = TZ_BEFORE_RE.search(folded, max(0, m.start() - 8), m.start())
+            if before:
+                zone = before.group("tz")
+        times.append((m.start(), m.end(), hour, minute, zone))
+    return times
+
+def _default_zone(text, href, dates):
+    host = re.sub(r"^https?://", "", href or "").split("/", 1)[0].lower()
+    for suffix, zone in DOMAIN_ZONES:
+        if host.endswith(suffix):
+            return zone
+    if _TURKISH_TEXT_RE.search(text):
+        return "tsi"
+    words = {word for *_, word in dates if word}
+    if words & _TURKISH_MONTHS:
+        return "tsi"
+    if words & _SPANISH_MONTHS:
+        return "cet_auto"
+    return None
+
+def _boundaries_between(bounds, a, b):
+    lo, hi = (a, b) if a <= b else (b, a)
+    return sum(1 for p in bounds if lo <= p < hi)
+
+def _anchors(text, folded, home, away):
+    """
+    Returns (ours, foreign): spans of our "home - away" mentions and of
+    other fixtures' "Team - Team" mentions.
+    """
+    mentions = []
+    for side, name in (("home", home), ("away", away)):
+        pattern = team_pattern(name) if name else None
+        if pattern:
+            mentions.extend((m.start(), m.end(), side) for m in pattern.finditer(folded))
+    mentions.sort()
+
+    ours = []
+    for i, (s1, e1, side1) in enumerate(mentions):
+        for s2, e2, side2 in mentions[i + 1:]:
+            if s2 - e1 > PAIR_GAP:
+                break
+            gap = text[e1:s2]
+            if side2 != side1 and not any(c.isdigit() for c in gap) and not BOUNDARY_RE.search(gap):
+                ours.append((s1, e2, 1.0))
+                break
+    if not ours:
+        # İki takım birlikte geçmiyorsa tek takım ismi zayıf çapa olur
+        ours = [(s, e, 0.5) for s, e, _ in mentions]
+
+    foreign = []
+    for m in PAIR_RE.finditer(text):
+        if any(s < m.end() and m.start() < e for s, e, _ in ours):
+            continue
+        # Ayracın iki yanındaki kelime maç değil başlık/tarih ise ("Europa League - Jan") atla
+        left, _, right = re.split(r"(\s?(?:-|–|\sv\s|\svs\.?\s|\sx\s)\s?)", folded[m.start():m.end()], maxsplit=1)
+        if left.split()[-1] in NOT_TEAM_WORDS or right.split()[0] in NOT_TEAM_WORDS:
+            continue
+        foreign.append((m.start(), m.end()))
+    return ours, foreign
+
+def _cost(anchor_start, anchor_end, pos_start, pos_end, bounds):
+    if anchor_end <= pos_start:
+        lo, hi, distance = anchor_end, pos_start, pos_start - anchor_end
+    elif pos_end <= anchor_start:
+        lo, hi, distance = pos_end, anchor_start, (anchor_start - pos_end) * FOLLOWING_FACTOR
+    else:
+        return 0
+    return distance + BOUNDARY_COST * _boundaries_between(bounds, lo, hi)
+
+def _ownership(start, end, ours, foreign, bounds):
+    """
+    Weight in (0, 1] when the token at [start, end) belongs to our fixture,
+    0 when another fixture is closer. Without any anchors every token
+    gets a flat weight (team names unknown).
+    """
+    if not ours:
+        return 0.5 if not foreign else 0.0
+    best_ours = min((_cost(s, e, start, end, bounds), w) for s, e, w in ours)
+    if foreign and min(_cost(s, e, start, end, bounds) for s, e in foreign) < best_ours[0]:
+        return 0.0
+    return best_ours[1] / (1.0 + best_ours[0] / DISTANCE_SCALE)
+
+def _date_for_time(t_start, t_end, dates, bounds):
+    best = None
+    for d_start, d_end, day, _ in dates:
+        if d_end <= t_start and t_start - d_end <= DATE_LOOKBACK:
+            cost = t_start - d_end
+        elif d_start >= t_end and d_start - t_end <= DATE_LOOKAHEAD:
+            # Önceki tarih tercih edilir; sonraki tarih ancak önce tarih yoksa kazanır
+            cost = (d_start - t_end) * FOLLOWING_FACTOR + DATE_LOOKAHEAD
+        else:
+            continue
+        cost += BOUNDARY_COST * _boundaries_between(bounds, min(d_end, t_start), max(d_start, t_end))
+        if best is None or cost < best[0]:
+            best = (cost, day)
+    return best[1] if best else None
+
+def snippet_votes(home, away, result, today):
+    """
+    Yields (date or None, "HH:MM" or None, weight) votes from one search
+    result, with times converted to TSİ (date shifted when they cross midnight).
+    """
+    text = f"{result.get('title') or ''} | {result.get('body') or ''}"
+    folded = fold(text)
+    dates = _parse_dates(folded, today)
+    times = _parse_times(folded)
+    if not dates and not times:
+        return
+    bounds = [m.start() for m in BOUNDARY_RE.finditer(text)]
+    ours, foreign = _anchors(text, folded, home, away)
+    default_zone = _default_zone(text, result.get("href"), dates)
+
+    used_dates = set()
+    for t_start, t_end, hour, minute, zone in times:
+        weight = _ownership(t_start, t_end, ours, foreign, bounds)
+        if not weight:
+            continue
+        day = _date_for_time(t_start, t_end, dates, bounds)
+        if zone:
+            kind = "explicit" if TZ_OFFSETS.get(zone) is not None else "unknown"
+        elif default_zone:
+            zone, kind = default_zone, "inferred"
+        else:
+            kind = "unknown"
+        offset = _offset_hours(zone, day) if zone else None
+        kickoff = datetime.combine(day or today, datetime.min.time()).replace(hour=hour, minute=minute)
+        if offset:
+            kickoff += timedelta(hours=offset)
+        used_dates.add(day)
+        yield (kickoff.date() if day else None), kickoff.strftime("%H:%M"), weight * ZONE_WEIGHTS[kind]
+
+    for d_start, d_end, day, _ in dates:
+        if day in used_dates:
+            continue
+        weight = _ownership(d_start, d_end, ours, foreign, bounds)
+        if weight:
+            yield day, None, weight * DATE_ONLY_WEIGHT
+
+def format_tr_day(day):
+    return f"{day.day} {TR_MONTHS[day.month - 1]}"
+
+def extract_match_time(home, away, search_results, today=None):
+    """
+    Votes over every search result and returns an Extraction with the TSİ
+    date ("29 OCAK"), time ("23:00"), a confidence in [0, 1] and the vote
+    count. Fields are None when nothing usable was found.
+    """
+    today = today or date.today()
+    pair_scores = defaultdict(float)
+    date_scores = defaultdict(float)
+    time_scores = defaultdict(float)
+    votes = 0
+    for result in search_results or []:
+        for day, hhmm, weight in snippet_votes(home, away, result, today):
+            votes += 1
+            if day and hhmm:
+                pair_scores[(day, hhmm)] += weight
+            if day:
+                date_scores[day] += weight
+            if hhmm:
+                time_scores[hhmm] += weight
+
+    if pair_scores:
+        # Çift puanı + aynı tarih/saati destekleyen tekil oylar
+        def support(pair):
+            return pair_scores[pair] + 0.5 * (date_scores[pair[0]] + time_scores[pair[1]])
+        (day, hhmm) = max(pair_scores, key=lambda p: (support(p), p[0] == today))
+        total = sum(support(p) for p in pair_scores)
+        confidence = support((day, hhmm)) / total if total else 0.0
+        # Tek bir kaynaktan gelen cevaba tam güvenme
+        confidence *= min(1.0, pair_scores[(day, hhmm)] / 0.8)
+        return Extraction(format_tr_day(day), hhmm, round(confidence, 3), votes)
+
+    day = max(date_scores, key=date_scores.get) if date_scores else None
+    hhmm = max(time_scores, key=time_scores.get) if time_scores else None
+    confidence = 0.0
+    if day and hhmm:
+        confidence = 0.5 * min(date_scores[day] / sum(date_scores.values()), time_scores[hhmm] / sum(time_scores.values()))
+    return Extraction(format_tr_day(day) if day else None, hhmm, round(confidence, 3), votes)
@@ -0,0 +1,229 @@
+import os
+import json
+import time
+import uuid
+import atexit
+import inspect
+import functools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from local_store import BASE_DIR
+
+# Span tabanlı zamanlama: API aramaları, AI yedeği, her logo kaynağı denemesi, görsel
+# işleme, JSX üretimi, Photoshop beklemesi ve sıkıştırma süreleri ölçülür. Span'ler
+# maç/batch etiketlerini contextvars üzerinden miras alır, JSON satırları olarak
+# traces/spans.jsonl dosyasına eklenir ve her batch sonunda aşama özeti yazdırılır.
+# Dosya TRACE_MAX_BYTES'ı geçince spans.jsonl.old olarak devredilir (tek eski kopya
+# tutulur), böylece diskte en fazla ~2 × TRACE_MAX_BYTES kalır.
+# MACBOT_TRACE=0 ile tamamen kapatılır.
+ENABLED = os.getenv("MACBOT_TRACE", "1") != "0"
+TRACE_PATH = os.getenv("MACBOT_TRACE_FILE") or os.path.join(BASE_DIR, "traces", "spans.jsonl")
+TRACE_MAX_BYTES = int(os.getenv("MACBOT_TRACE_MAX_MB", "16")) << 20
+FLUSH_EVERY = 200            # bu kadar kayıt birikince dosyaya yazılır (batch sonu ve çıkışta da)
+
+_current = contextvars.ContextVar("tracer_span", default=None)
+_tags = contextvars.ContextVar("tracer_tags", default={})
+_batch = contextvars.ContextVar("tracer_batch", default=None)
+
+class _Writer:
+    def __init__(self, path):
+        self.path = path
+        self.buffer = []
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        with self._lock:
+            self.buffer.append(json.dumps(record, ensure_ascii=False, default=str))
+            if len(self.buffer) < FLUSH_EVERY:
+                return
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            lines, self.buffer = self.buffer, []
+            if not lines:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                # O_APPEND: render işçileri ve backend aynı dosyaya satır karıştırmadan ekler
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+                    size = f.tell()
+                self.written += len(lines)
+                if size >= TRACE_MAX_BYTES:
+                    # Eşzamanlı devirde iki süreç de os.replace yapabilir; en kötü ihtimalle
+                    # bir eski kopya kaybolur, yazılan satırlar bozulmaz
+                    os.replace(self.path, self.path + ".old")
+            except OSError as e:
+                print(f"⚠️ Zamanlama kaydı yazılamadı: {e}")
+
+_writer = _Writer(TRACE_PATH)
+atexit.register(_writer.flush)
+
+class Batch:
+    """
+    One run (CLI batch, automation flow, render job). Spans finished in
+    its context are aggregated per name for the end-of-run summary.
+    """
+
+    def __init__(self, name, tags):
+        self.id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.tags = tags
+        self.started = time.time()
+        self.durations = {}          # span adı -> [sn]
+        self._lock = threading.Lock()
+        self._tokens = None
+
+    def record(self, name, duration):
+        with self._lock:
+            self.durations.setdefault(name, []).append(duration)
+
+    def summary(self):
+        """
+        Rows of {"stage", "count", "total", "mean", "p95", "max"} (seconds),
+        slowest stage first.
+        """
+        with self._lock:
+            items = [(name, sorted(values)) for name, values in self.durations.items()]
+        rows = []
+        for name, values in items:
+            total = sum(values)
+            rows.append({
+                "stage": name,
+                "count": len(values),
+                "total": round(total, 4),
+                "mean": round(total / len(values), 4),
+                "p95": round(values[min(len(values) - 1, int(len(values) * 0.95))], 4),
+                "max": round(values[-1], 4),
+            })
+        rows.sort(key=lambda row: row["total"], reverse=True)
+        return rows
+
+def _finish(name, span_id, parent, start, duration, tags, error):
+    merged = {**_tags.get(), **tags}
+    batch = _batch.get()
+    if batch is not None:
+        batch.record(name, duration)
+    record = {
+        "type": "span",
+        "name": name,
+        "id": span_id,
+        "parent": parent,
+        "batch": batch.id if batch else None,
+        "start": round(start, 6),
+        "duration_ms": round(duration * 1000, 3),
+        "pid": os.getpid(),
+        "tags": merged,
+    }
+    if error:
+        record["error"] = error
+    _writer.write(record)
+
+@contextmanager
+def span(name, **tags):
+    """
+    Times the enclosed block as `name`. Yields a dict for tags only known
+    at the end (e.g. ok=True). Nested spans record their parent;
+    exceptions are tagged on the span and re-raised.
+    """
+    tags = dict(tags)
+    if not ENABLED:
+        yield tags
+        return
+    span_id = uuid.uuid4().hex[:12]
+    parent = _current.get()
+    token = _current.set(span_id)
+    start = time.time()
+    t0 = time.perf_counter()
+    error = None
+    try:
+        yield tags
+    except BaseException as e:
+        error = type(e).__name__
+        raise
+    finally:
+        duration = time.perf_counter() - t0
+        _current.reset(token)
+        _finish(name, span_id, parent, start, duration, tags, error)
+
+def traced(name=None, **tags):
+    """
+    Decorator form of span() for sync and async functions.
+    """
+    def decorate(func):
+        span_name = name or func.__name__
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, **tags):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, **tags):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def bind(**tags):
+    """
+    Adds tags (e.g. match=..., index=...) to every span started later in
+    the current context. Returns a token for unbind().
+    """
+    return _tags.set({**_tags.get(), **tags})
+
+def unbind(token):
+    _tags.reset(token)
+
+def start_batch(name, **tags):
+    batch = Batch(name, tags)
+    batch._tokens = (_batch.set(batch), bind(**tags, run=name))
+    return batch
+
+def end_batch(batch, show=True):
+    """
+    Closes a batch: writes its summary record, flushes the trace file and
+    prints the per-stage table. Returns the summary rows.
+    """
+    elapsed = time.time() - batch.started
+    rows = batch.summary()
+    try:
+        batch_token, tags_token = batch._tokens
+        _tags.reset(tags_token)
+        _batch.reset(batch_token)
+    except (TypeError, ValueError):
+        # Farklı bir context'ten kapatılıyorsa değişkenler zaten kapsam dışı
+        pass
+    if ENABLED:
+        _writer.write({
+            "type": "summary", "batch": batch.id, "name": batch.name, "tags": batch.tags,
+            "start": round(batch.started, 6), "duration_ms": round(elapsed * 1000, 3),
+            "pid": os.getpid(), "stages": rows,
+        })
+        _writer.flush()
+        if show and rows:
+            print_summary(batch, rows, elapsed)
+    return rows
+
+@contextmanager
+def batch(name, show=True, **tags):
+    current = start_batch(name, **tags)
+    try:
+        yield current
+    finally:
+        end_batch(current, show)
+
+def print_summary(batch, rows, elapsed):
+    print(f"\n⏱️  Zamanlama özeti: {batch.name} ({batch.id}, {elapsed:.2f} sn)")
+    print(f"   {'Aşama':<24}{'Adet':>6}{'Toplam sn':>12}{'Ort ms':>10}{'p95 ms':>10}{'Maks ms':>10}")
+    for row in rows:
+        print(f"   {row['stage']:<24}{row['count']:>6}{row['total']:>12.2f}"
+              f"{row['mean'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}{row['max'] * 1000:>10.1f}")
+
+def stats():
+    return {"enabled": ENABLED, "path": TRACE_PATH, "written": _writer.written, "buffered": len(_writer.buffer)}